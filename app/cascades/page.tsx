@@ -1,7 +1,11 @@
 "use client";
 
-import { datasets, formatNumber, formatPercent, formatScore, getCityName } from "@/lib/data";
+import { formatNumber, formatPercent, formatScore, getCityName } from "@/lib/data";
+import LoadingState from "@/components/LoadingState";
 import { useRegion } from "@/lib/RegionContext";
+import { useRegionData } from "@/lib/useRegionData";
+
+const SECTIONS = ["cascades", "cities"] as const;
 
 function SeverityColor(severity: number): string {
   if (severity >= 0.7) return "var(--accent-red)";
@@ -11,8 +15,10 @@ function SeverityColor(severity: number): string {
 
 export default function CascadesPage() {
   const { region } = useRegion();
-  const data = datasets[region];
+  const data = useRegionData(SECTIONS);
   
+  if (!data) return <LoadingState />;
+
   return (
     <div>
       <div style={{ marginBottom: 8 }}>
@@ -166,6 +172,11 @@ export default function CascadesPage() {
                   >
                     {formatNumber(scenario.trade_volume_affected)}
                   </div>
+                  {scenario.trade_volume_affected_bands && (
+                    <div style={{ fontSize: 9, color: "var(--text-muted)", marginTop: 2 }}>
+                      p5–p95 {formatNumber(scenario.trade_volume_affected_bands.p5)} – {formatNumber(scenario.trade_volume_affected_bands.p95)}
+                    </div>
+                  )}
                 </div>
                 <div>
                   <div className="label-mono" style={{ marginBottom: 4 }}>
@@ -194,6 +205,11 @@ export default function CascadesPage() {
                   >
                     {scenario.isolated_cities.length}
                   </div>
+                  {scenario.isolated_cities_bands && (
+                    <div style={{ fontSize: 9, color: "var(--text-muted)", marginTop: 2 }}>
+                      p5–p95 {scenario.isolated_cities_bands.p5} – {scenario.isolated_cities_bands.p95}
+                    </div>
+                  )}
                 </div>
                 <div>
                   <div className="label-mono" style={{ marginBottom: 4 }}>
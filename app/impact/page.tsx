@@ -1,8 +1,10 @@
 "use client";
 
 import { useState, useMemo } from "react";
-import { datasets, formatScore, getCityName, getCityById } from "@/lib/data";
+import { formatScore, getCityName, getCityById } from "@/lib/data";
+import LoadingState from "@/components/LoadingState";
 import { useRegion } from "@/lib/RegionContext";
+import { useRegionData } from "@/lib/useRegionData";
 
 interface FTZRow {
   city_id: string;
@@ -18,6 +20,8 @@ interface FTZRow {
 
 type SortKey = keyof Omit<FTZRow, "city_id">;
 
+const SECTIONS = ["ftz_impact", "cities"] as const;
+
 const SCORE_COLUMNS: { key: SortKey; label: string; color: string }[] = [
   { key: "composite", label: "Composite", color: "var(--accent-purple)" },
   { key: "connectivity", label: "Connectivity", color: "var(--accent-green)" },
@@ -31,17 +35,17 @@ const SCORE_COLUMNS: { key: SortKey; label: string; color: string }[] = [
 
 export default function ImpactPage() {
   const { region } = useRegion();
-  const data = datasets[region];
+  const data = useRegionData(SECTIONS);
   const [sortKey, setSortKey] = useState<SortKey>("composite");
   const [sortAsc, setSortAsc] = useState(false);
 
   // Convert ftz_impact dict to array
   const rows: FTZRow[] = useMemo(() => {
-    return Object.entries(data.ftz_impact).map(([cityId, scores]) => ({
+    return Object.entries(data?.ftz_impact ?? {}).map(([cityId, scores]) => ({
       city_id: cityId,
       ...scores,
     }));
-  }, [data.ftz_impact]);
+  }, [data?.ftz_impact]);
 
   const sorted = useMemo(() => {
     return [...rows].sort((a, b) => {
@@ -59,6 +63,8 @@ export default function ImpactPage() {
     }
   };
 
+  if (!data) return <LoadingState />;
+
   return (
     <div>
       <div style={{ marginBottom: 8 }}>
@@ -1,35 +1,37 @@
 "use client";
 
 import { useState, useMemo } from "react";
-import { datasets, formatScore } from "@/lib/data";
-import { useRegion } from "@/lib/RegionContext";
+import { formatScore } from "@/lib/data";
+import { pageRows, sortedRows } from "@/lib/tableIndex";
+import LoadingState from "@/components/LoadingState";
+import Pager from "@/components/Pager";
+import { useRegionData } from "@/lib/useRegionData";
 
 type SortKey = "gap" | "confidence" | "model_score" | "actual_score" | "signal_type";
 
+const SECTIONS = ["opportunities", "opportunities_index"] as const;
+
+const PAGE_SIZE = 100;
+
 export default function OpportunitiesPage() {
-  const { region } = useRegion();
-  const data = datasets[region];
+  const data = useRegionData(SECTIONS);
   const [sortKey, setSortKey] = useState<SortKey>("gap");
   const [sortAsc, setSortAsc] = useState(false);
   const [filterType, setFilterType] = useState<string>("ALL");
 
-  const filtered = useMemo(() => {
-    let items = [...data.opportunities];
-    if (filterType !== "ALL") {
-      items = items.filter((o) => o.signal_type === filterType);
-    }
-    items.sort((a, b) => {
-      if (sortKey === "signal_type") {
-        return sortAsc
-          ? a.signal_type.localeCompare(b.signal_type)
-          : b.signal_type.localeCompare(a.signal_type);
-      }
-      const av = a[sortKey] as number;
-      const bv = b[sortKey] as number;
-      return sortAsc ? av - bv : bv - av;
-    });
-    return items;
-  }, [data.opportunities, sortKey, sortAsc, filterType]);
+  const [page, setPage] = useState(0);
+
+  const order = useMemo(
+    () =>
+      data
+        ? sortedRows(data.opportunities_index, sortKey, filterType === "ALL" ? null : filterType)
+        : [],
+    [data, sortKey, filterType]
+  );
+  const visible = useMemo(
+    () => (data ? pageRows(data.opportunities, order, page, PAGE_SIZE, sortAsc) : []),
+    [data, order, page, sortAsc]
+  );
 
   const handleSort = (key: SortKey) => {
     if (key === sortKey) setSortAsc(!sortAsc);
@@ -37,15 +39,12 @@ export default function OpportunitiesPage() {
       setSortKey(key);
       setSortAsc(false);
     }
+    setPage(0);
   };
 
-  const counts = useMemo(() => {
-    const c = { OPPORTUNITY: 0, RISK: 0, NEUTRAL: 0 };
-    for (const o of data.opportunities) {
-      c[o.signal_type]++;
-    }
-    return c;
-  }, [data.opportunities]);
+  if (!data) return <LoadingState />;
+
+  const counts = data.opportunities_index.counts ?? {};
 
   return (
     <div>
@@ -93,7 +92,7 @@ export default function OpportunitiesPage() {
               color: "var(--accent-green)",
             }}
           >
-            {counts.OPPORTUNITY}
+            {counts.OPPORTUNITY ?? 0}
           </div>
         </div>
         <div className="card" style={{ padding: "16px 20px" }}>
@@ -107,7 +106,7 @@ export default function OpportunitiesPage() {
               color: "var(--accent-red)",
             }}
           >
-            {counts.RISK}
+            {counts.RISK ?? 0}
           </div>
         </div>
         <div className="card" style={{ padding: "16px 20px" }}>
@@ -121,7 +120,7 @@ export default function OpportunitiesPage() {
               color: "var(--text-secondary)",
             }}
           >
-            {counts.NEUTRAL}
+            {counts.NEUTRAL ?? 0}
           </div>
         </div>
       </div>
@@ -137,7 +136,10 @@ export default function OpportunitiesPage() {
         {["ALL", "OPPORTUNITY", "RISK", "NEUTRAL"].map((type) => (
           <button
             key={type}
-            onClick={() => setFilterType(type)}
+            onClick={() => {
+              setFilterType(type);
+              setPage(0);
+            }}
             style={{
               fontSize: 10,
               fontWeight: 500,
@@ -161,7 +163,7 @@ export default function OpportunitiesPage() {
               fontFamily: "var(--font-jetbrains), monospace",
             }}
           >
-            {type === "ALL" ? `All (${data.opportunities.length})` : `${type} (${counts[type as keyof typeof counts]})`}
+            {type === "ALL" ? `All (${data.opportunities.length})` : `${type} (${counts[type] ?? 0})`}
           </button>
         ))}
       </div>
@@ -240,9 +242,9 @@ export default function OpportunitiesPage() {
             </tr>
           </thead>
           <tbody>
-            {filtered.map((opp, i) => (
+            {visible.map((opp, i) => (
               <tr key={opp.city_id}>
-                <td style={{ color: "var(--text-muted)" }}>{i + 1}</td>
+                <td style={{ color: "var(--text-muted)" }}>{page * PAGE_SIZE + i + 1}</td>
                 <td>
                   <span
                     className={`signal-badge ${opp.signal_type.toLowerCase()}`}
@@ -300,6 +302,7 @@ export default function OpportunitiesPage() {
             ))}
           </tbody>
         </table>
+        <Pager page={page} pageSize={PAGE_SIZE} total={order.length} onPage={setPage} />
       </div>
     </div>
   );
@@ -1,13 +1,18 @@
 "use client";
 
-import { datasets, formatNumber, formatScore, getBlocColor, getCityName } from "@/lib/data";
+import { formatNumber, formatScore, getBlocColor, getCityById, getCityName } from "@/lib/data";
 import StatCard from "@/components/StatCard";
+import LoadingState from "@/components/LoadingState";
 import { useRegion } from "@/lib/RegionContext";
+import { useRegionData } from "@/lib/useRegionData";
+
+const SECTIONS = ["summary", "metrics", "ftz_impact", "cities"] as const;
 
 export default function OverviewPage() {
   const { region } = useRegion();
-  const data = datasets[region];
-  const { summary, metrics, ftz_impact, cities } = data;
+  const data = useRegionData(SECTIONS);
+  if (!data) return <LoadingState />;
+  const { summary, metrics, ftz_impact } = data;
 
   // Convert betweenness dict to sorted array
   const topCentrality = Object.entries(metrics.betweenness)
@@ -130,7 +135,7 @@ export default function OverviewPage() {
             </thead>
             <tbody>
               {topCentrality.map((c, i) => {
-                const city = cities.find((ct) => ct.id === c.city_id);
+                const city = getCityById(c.city_id, region);
                 return (
                   <tr key={c.city_id}>
                     <td style={{ color: "var(--text-muted)" }}>{i + 1}</td>
@@ -192,7 +197,7 @@ export default function OverviewPage() {
             </thead>
             <tbody>
               {topFTZ.map((f, i) => {
-                const city = cities.find((ct) => ct.id === f.city_id);
+                const city = getCityById(f.city_id, region);
                 return (
                   <tr key={f.city_id}>
                     <td style={{ color: "var(--text-muted)" }}>{i + 1}</td>
@@ -1,8 +1,13 @@
 "use client";
 
 import { useState, useMemo } from "react";
-import { datasets, formatScore, getCityName, getCityById } from "@/lib/data";
+import { formatNumber, formatScore, getCityName, getCityById } from "@/lib/data";
+import LoadingState from "@/components/LoadingState";
+import Pager from "@/components/Pager";
 import { useRegion } from "@/lib/RegionContext";
+import { useRegionData } from "@/lib/useRegionData";
+import { findRoute } from "@/lib/routing";
+import { pageRows, sortedRows } from "@/lib/tableIndex";
 
 interface RouteRow {
   city_id: string;
@@ -16,33 +21,78 @@ interface RouteRow {
 
 type SortKey = keyof Omit<RouteRow, "city_id" | "shortest_path" | "min_cut_nodes">;
 
+const SECTIONS = ["trade_routes", "trade_routes_index", "cities", "route_index"] as const;
+
+const PAGE_SIZE = 50;
+
+// Redundancy above which a route is colored green / amber. Generated regions
+// count edge-disjoint paths; the West Africa dataset (lib/analysis-data.json)
+// scores redundancy on a trade-volume scale, told apart by its magnitude.
+const PATH_REDUNDANCY = { green: 2, amber: 1 };
+const VOLUME_REDUNDANCY = { green: 50000, amber: 30000 };
+const VOLUME_REDUNDANCY_MIN = 1000;
+
+type RedundancyScale = typeof PATH_REDUNDANCY;
+
+function redundancyColor(redundancy: number, scale: RedundancyScale): string {
+  if (redundancy > scale.green) return "var(--accent-green)";
+  if (redundancy > scale.amber) return "var(--accent-amber)";
+  return "var(--accent-red)";
+}
+
+const selectStyle = {
+  width: "100%",
+  padding: "8px 12px",
+  fontSize: 12,
+  fontFamily: "var(--font-jetbrains), monospace",
+  background: "var(--bg-card)",
+  border: "1px solid var(--border-card)",
+  borderRadius: 4,
+  color: "var(--text-primary)",
+  outline: "none",
+  cursor: "pointer",
+};
+
 export default function RoutesPage() {
   const { region } = useRegion();
-  const data = datasets[region];
+  const data = useRegionData(SECTIONS);
   const [sortKey, setSortKey] = useState<SortKey>("risk");
   const [sortAsc, setSortAsc] = useState(false);
+  const [origin, setOrigin] = useState("");
+  const [destination, setDestination] = useState("");
+
+  const cityOptions = useMemo(
+    () => [...(data?.cities ?? [])].sort((a, b) => a.name.localeCompare(b.name)),
+    [data?.cities],
+  );
+
+  // Arbitrary origin/destination queries against the shipped landmark index
+  const query = useMemo(() => {
+    if (!data || !origin || !destination) return null;
+    const start = performance.now();
+    const route = findRoute(data.route_index, origin, destination);
+    return { route, ms: performance.now() - start };
+  }, [data, origin, destination]);
 
-  // Convert trade_routes dict to array
+  // Convert trade_routes dict to array, in the row order of trade_routes_index
   const rows: RouteRow[] = useMemo(() => {
-    return Object.entries(data.trade_routes).map(([cityId, route]) => ({
+    return Object.entries(data?.trade_routes ?? {}).map(([cityId, route]) => ({
       city_id: cityId,
       ...route,
     }));
-  }, [data.trade_routes]);
+  }, [data?.trade_routes]);
 
-  const sorted = useMemo(() => {
-    return [...rows].sort((a, b) => {
-      const av = a[sortKey];
-      const bv = b[sortKey];
-      // Handle null values for shortest_cost
-      if (av === null || bv === null) {
-        if (av === null && bv === null) return 0;
-        if (av === null) return sortAsc ? -1 : 1;
-        if (bv === null) return sortAsc ? 1 : -1;
-      }
-      return sortAsc ? (av as number) - (bv as number) : (bv as number) - (av as number);
-    });
-  }, [rows, sortKey, sortAsc]);
+  const redundancyScale = useMemo(
+    () => (rows.some((route) => route.redundancy > VOLUME_REDUNDANCY_MIN) ? VOLUME_REDUNDANCY : PATH_REDUNDANCY),
+    [rows]
+  );
+
+  const [page, setPage] = useState(0);
+  const order = useMemo(
+    () => (data ? sortedRows(data.trade_routes_index, sortKey) : []),
+    [data, sortKey]
+  );
+  const sorted = useMemo(() => pageRows(rows, order, page, PAGE_SIZE, sortAsc), [rows, order, page, sortAsc]);
 
   const handleSort = (key: SortKey) => {
     if (key === sortKey) setSortAsc(!sortAsc);
@@ -50,8 +100,11 @@ export default function RoutesPage() {
       setSortKey(key);
       setSortAsc(false);
     }
+    setPage(0);
   };
 
+  if (!data) return <LoadingState />;
+
   return (
     <div>
       <div style={{ marginBottom: 8 }}>
@@ -77,6 +130,59 @@ export default function RoutesPage() {
         Critical trade routes, risk assessment, and network redundancy metrics.
       </p>
 
+      {/* Route finder */}
+      <div className="card" style={{ padding: 24, marginBottom: 32 }}>
+        <div className="label-mono" style={{ marginBottom: 16 }}>Route Finder</div>
+        <div style={{ display: "grid", gridTemplateColumns: "1fr 1fr", gap: 12, marginBottom: 16 }}>
+          {([["From", origin, setOrigin], ["To", destination, setDestination]] as const).map(([label, value, setValue]) => (
+            <div key={label}>
+              <div className="label-mono" style={{ marginBottom: 8, fontSize: 10 }}>{label}</div>
+              <select value={value} onChange={(e) => setValue(e.target.value)} style={selectStyle}>
+                <option value="">Select a city</option>
+                {cityOptions.map((c) => (
+                  <option key={c.id} value={c.id}>
+                    {c.name} ({c.country})
+                  </option>
+                ))}
+              </select>
+            </div>
+          ))}
+        </div>
+        {query && (query.route ? (
+          <div>
+            <div style={{ display: "flex", alignItems: "center", gap: 4, flexWrap: "wrap", marginBottom: 8 }}>
+              {query.route.path.map((cityId, idx) => (
+                <div key={idx} style={{ display: "flex", alignItems: "center" }}>
+                  <span
+                    style={{
+                      fontSize: 10,
+                      padding: "3px 8px",
+                      borderRadius: 4,
+                      background: "rgba(129, 140, 248, 0.12)",
+                      color: "var(--accent-purple)",
+                      border: "1px solid rgba(129, 140, 248, 0.2)",
+                    }}
+                  >
+                    {getCityName(cityId, region)}
+                  </span>
+                  {idx < query.route!.path.length - 1 && (
+                    <span style={{ fontSize: 10, color: "var(--text-muted)", margin: "0 4px" }}>→</span>
+                  )}
+                </div>
+              ))}
+            </div>
+            <div style={{ fontSize: 10, color: "var(--text-muted)" }}>
+              Cost {formatNumber(query.route.cost)} · {query.route.path.length - 1} hops ·{" "}
+              {query.route.settled.toLocaleString()} cities searched in {query.ms.toFixed(1)} ms
+            </div>
+          </div>
+        ) : (
+          <div style={{ fontSize: 12, color: "var(--accent-red)" }}>
+            No active route between these cities.
+          </div>
+        ))}
+      </div>
+
       {/* Route cards */}
       <div
         style={{
@@ -89,7 +195,7 @@ export default function RoutesPage() {
         {sorted.map((route) => {
           const city = getCityById(route.city_id, region);
           const riskColor = route.risk < 0.3 ? "var(--accent-green)" : route.risk < 0.6 ? "var(--accent-amber)" : "var(--accent-red)";
-          const redundancyColor = route.redundancy > 50000 ? "var(--accent-green)" : route.redundancy > 30000 ? "var(--accent-amber)" : "var(--accent-red)";
+          const redundancyTint = redundancyColor(route.redundancy, redundancyScale);
           
           return (
             <div key={route.city_id} className="card card-hover" style={{ padding: 20 }}>
@@ -114,7 +220,7 @@ export default function RoutesPage() {
               <div style={{ display: "grid", gridTemplateColumns: "1fr 1fr", gap: 12, marginBottom: 16 }}>
                 <div>
                   <div className="label-mono" style={{ marginBottom: 4 }}>Redundancy</div>
-                  <div style={{ fontSize: 16, fontWeight: 600, color: redundancyColor }}>
+                  <div style={{ fontSize: 16, fontWeight: 600, color: redundancyTint }}>
                     {route.redundancy.toLocaleString()}
                   </div>
                 </div>
@@ -152,7 +258,7 @@ export default function RoutesPage() {
                     ))}
                     {route.shortest_cost !== null && route.shortest_cost > 0 && (
                       <span style={{ fontSize: 10, color: "var(--text-muted)", marginLeft: 8 }}>
-                        ({formatScore(route.shortest_cost)})
+                        ({formatNumber(route.shortest_cost)})
                       </span>
                     )}
                   </div>
@@ -234,11 +340,11 @@ export default function RoutesPage() {
             {sorted.map((route, i) => {
               const city = getCityById(route.city_id, region);
               const riskColor = route.risk < 0.3 ? "var(--accent-green)" : route.risk < 0.6 ? "var(--accent-amber)" : "var(--accent-red)";
-              const redundancyColor = route.redundancy > 50000 ? "var(--accent-green)" : route.redundancy > 30000 ? "var(--accent-amber)" : "var(--accent-red)";
+              const redundancyTint = redundancyColor(route.redundancy, redundancyScale);
               
               return (
                 <tr key={route.city_id}>
-                  <td style={{ color: "var(--text-muted)" }}>{i + 1}</td>
+                  <td style={{ color: "var(--text-muted)" }}>{page * PAGE_SIZE + i + 1}</td>
                   <td style={{ color: "var(--text-primary)", fontWeight: 500 }}>
                     {getCityName(route.city_id, region)}
                   </td>
@@ -260,7 +366,7 @@ export default function RoutesPage() {
                     </div>
                   </td>
                   <td>
-                    <span style={{ color: redundancyColor, fontWeight: 500 }}>
+                    <span style={{ color: redundancyTint, fontWeight: 500 }}>
                       {route.redundancy.toLocaleString()}
                     </span>
                   </td>
@@ -268,7 +374,7 @@ export default function RoutesPage() {
                   <td>
                     <div style={{ fontSize: 10, color: "var(--text-secondary)" }}>
                       {route.shortest_path.map(id => getCityName(id, region)).join(" → ")}
-                      {route.shortest_cost !== null && route.shortest_cost > 0 && ` (${formatScore(route.shortest_cost)})`}
+                      {route.shortest_cost !== null && route.shortest_cost > 0 && ` (${formatNumber(route.shortest_cost)})`}
                     </div>
                   </td>
                   <td>
@@ -281,6 +387,7 @@ export default function RoutesPage() {
             })}
           </tbody>
         </table>
+        <Pager page={page} pageSize={PAGE_SIZE} total={order.length} onPage={setPage} />
       </div>
     </div>
   );
@@ -0,0 +1,17 @@
+export default function LoadingState({ label = "Loading data..." }: { label?: string }) {
+  return (
+    <div
+      style={{
+        padding: 48,
+        display: "flex",
+        alignItems: "center",
+        justifyContent: "center",
+        color: "var(--text-muted)",
+        fontFamily: "var(--font-jetbrains), monospace",
+        fontSize: 12,
+      }}
+    >
+      {label}
+    </div>
+  );
+}
@@ -1,17 +1,29 @@
 "use client";
 
-import { useState, useMemo } from "react";
+import { useEffect, useState, useMemo } from "react";
 import {
   MapContainer,
   TileLayer,
   CircleMarker,
   Polyline,
   Popup,
+  useMap,
+  useMapEvents,
 } from "react-leaflet";
+import type { Map as LeafletMap } from "leaflet";
 import "leaflet/dist/leaflet.css";
-import { datasets, getBlocColor, getEdgeTypeColor, formatNumber, Region } from "@/lib/data";
+import {
+  getBlocColor,
+  getEdgeTypeColor,
+  formatNumber,
+  loadTile,
+  loadTileIndex,
+  visibleTiles,
+  Region,
+} from "@/lib/data";
 import { useRegion } from "@/lib/RegionContext";
-import type { City, Edge } from "@/lib/types";
+import LoadingState from "@/components/LoadingState";
+import type { City, MapTile, TileCluster, TileEdge, TileIndex } from "@/lib/types";
 
 const EDGE_TYPES = ["TRADE", "POLITICAL", "CULTURAL", "MIGRATORY", "LABOUR", "INFRASTRUCTURE", "FINANCIAL"];
 
@@ -116,9 +128,168 @@ function CityPopup({ city, region }: { city: City; region: Region }) {
   );
 }
 
+function ClusterPopup({ cluster }: { cluster: TileCluster }) {
+  return (
+    <div style={{ minWidth: 160 }}>
+      <div style={{ fontSize: 13, fontWeight: 600, color: "#e2e8f0", marginBottom: 8 }}>
+        {cluster.count.toLocaleString()} cities around {cluster.name}
+      </div>
+      <div
+        style={{
+          display: "grid",
+          gridTemplateColumns: "1fr 1fr",
+          gap: "4px 12px",
+          fontSize: 10,
+        }}
+      >
+        <div style={{ color: "#64748b" }}>Population</div>
+        <div style={{ color: "#e2e8f0", textAlign: "right" }}>
+          {formatNumber(cluster.population)}
+        </div>
+        <div style={{ color: "#64748b" }}>FTZ Targets</div>
+        <div style={{ color: "#e2e8f0", textAlign: "right" }}>{cluster.ftz_targets}</div>
+      </div>
+      <div style={{ marginTop: 8, fontSize: 9, color: "#64748b" }}>Zoom in to see individual cities</div>
+    </div>
+  );
+}
+
+function viewOf(map: LeafletMap) {
+  const bounds = map.getBounds();
+  return {
+    south: bounds.getSouth(),
+    west: bounds.getWest(),
+    north: bounds.getNorth(),
+    east: bounds.getEast(),
+    zoom: map.getZoom(),
+  };
+}
+
+// Draws the level-of-detail tiles covering the current viewport, refetching on pan/zoom
+function TiledNetwork({
+  region,
+  index,
+  activeEdgeTypes,
+}: {
+  region: Region;
+  index: TileIndex;
+  activeEdgeTypes: Set<string>;
+}) {
+  const map = useMap();
+  const [view, setView] = useState(() => viewOf(map));
+  useMapEvents({ moveend: () => setView(viewOf(map)) });
+
+  const keys = useMemo(
+    () => visibleTiles(index, view.south, view.west, view.north, view.east, view.zoom),
+    [index, view],
+  );
+  const keyList = keys.join(",");
+
+  const [tiles, setTiles] = useState<MapTile[]>([]);
+  useEffect(() => {
+    let cancelled = false;
+    Promise.all(keys.map((key) => loadTile(region, key))).then(
+      (loaded) => {
+        if (!cancelled) setTiles(loaded);
+      },
+      (err) => console.error(err),
+    );
+    return () => {
+      cancelled = true;
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [region, keyList]);
+
+  // Edges are stored in the tiles of both endpoints; draw each once
+  const { edges, clusters, cities } = useMemo(() => {
+    const edgeMap = new Map<string, TileEdge>();
+    const clusterMap = new Map<string, TileCluster>();
+    const cityMap = new Map<string, City>();
+    for (const tile of tiles) {
+      for (const e of tile.edges) {
+        if (activeEdgeTypes.has(e.edge_type)) edgeMap.set(e.id, e);
+      }
+      for (const c of tile.clusters ?? []) clusterMap.set(c.id, c);
+      for (const c of tile.cities ?? []) cityMap.set(c.id, c);
+    }
+    return {
+      edges: [...edgeMap.values()],
+      clusters: [...clusterMap.values()],
+      cities: [...cityMap.values()],
+    };
+  }, [tiles, activeEdgeTypes]);
+
+  return (
+    <>
+      {/* Edges, bundled between clusters when zoomed out */}
+      {edges.map((edge) => (
+        <Polyline
+          key={edge.id}
+          positions={[edge.from, edge.to]}
+          pathOptions={{
+            color: getEdgeTypeColor(edge.edge_type, region),
+            weight: Math.max(1, Math.min(8, edge.weight * 2.5 * Math.sqrt(edge.count))),
+            opacity: 0.35,
+          }}
+        />
+      ))}
+
+      {/* Clusters */}
+      {clusters.map((cluster) => (
+        <CircleMarker
+          key={cluster.id}
+          center={[cluster.lat, cluster.lng]}
+          radius={Math.min(18, 4 + 2 * Math.log2(cluster.count))}
+          pathOptions={{
+            fillColor: getBlocColor(cluster.bloc, region),
+            fillOpacity: 0.6,
+            color: cluster.ftz_targets > 0 ? "#fbbf24" : getBlocColor(cluster.bloc, region),
+            weight: cluster.ftz_targets > 0 ? 2 : 1,
+            opacity: 0.8,
+          }}
+        >
+          <Popup>
+            <ClusterPopup cluster={cluster} />
+          </Popup>
+        </CircleMarker>
+      ))}
+
+      {/* Cities */}
+      {cities.map((city) => {
+        const radius = city.is_ftz_target
+          ? 7
+          : city.is_port
+          ? 5
+          : city.is_capital
+          ? 4
+          : 3;
+
+        return (
+          <CircleMarker
+            key={city.id}
+            center={[city.lat, city.lng]}
+            radius={radius}
+            pathOptions={{
+              fillColor: getBlocColor(city.bloc, region),
+              fillOpacity: city.is_ftz_target ? 0.9 : 0.7,
+              color: city.is_ftz_target ? "#fbbf24" : getBlocColor(city.bloc, region),
+              weight: city.is_ftz_target ? 2 : 1,
+              opacity: 0.8,
+            }}
+          >
+            <Popup>
+              <CityPopup city={city} region={region} />
+            </Popup>
+          </CircleMarker>
+        );
+      })}
+    </>
+  );
+}
+
 export default function MapView() {
   const { region } = useRegion();
-  const data = datasets[region];
+  const [tileIndex, setTileIndex] = useState<{ region: Region; index: TileIndex } | null>(null);
   const [activeEdgeTypes, setActiveEdgeTypes] = useState<Set<string>>(
     new Set(EDGE_TYPES)
   );
@@ -152,17 +323,18 @@ export default function MapView() {
     }
   };
 
-  const cityMap = useMemo(() => {
-    const m = new Map<string, City>();
-    for (const c of data.cities) m.set(c.id, c);
-    return m;
-  }, [data.cities]);
-
-  const filteredEdges = useMemo(() => {
-    return data.edges.filter(
-      (e) => e.is_active && activeEdgeTypes.has(e.edge_type)
+  useEffect(() => {
+    let cancelled = false;
+    loadTileIndex(region).then(
+      (index) => {
+        if (!cancelled) setTileIndex({ region, index });
+      },
+      (err) => console.error(err),
     );
-  }, [data.edges, activeEdgeTypes]);
+    return () => {
+      cancelled = true;
+    };
+  }, [region]);
 
   const toggleEdgeType = (type: string) => {
     setActiveEdgeTypes((prev) => {
@@ -173,6 +345,8 @@ export default function MapView() {
     });
   };
 
+  if (tileIndex?.region !== region) return <LoadingState label="Loading map..." />;
+
   return (
     <div style={{ position: "relative", width: "100%", height: "100%" }}>
       {/* Edge type filter */}
@@ -271,62 +445,14 @@ export default function MapView() {
         zoom={getMapZoom()}
         style={{ width: "100%", height: "100%" }}
         zoomControl={true}
+        preferCanvas={true}
       >
         <TileLayer
           attribution='&copy; <a href="https://carto.com">CARTO</a>'
           url="https://{s}.basemaps.cartocdn.com/dark_all/{z}/{x}/{y}{r}.png"
         />
 
-        {/* Edges */}
-        {filteredEdges.map((edge: Edge, i: number) => {
-          const src = cityMap.get(edge.source);
-          const tgt = cityMap.get(edge.target);
-          if (!src || !tgt) return null;
-          return (
-            <Polyline
-              key={`${edge.source}-${edge.target}-${edge.edge_type}-${i}`}
-              positions={[
-                [src.lat, src.lng],
-                [tgt.lat, tgt.lng],
-              ]}
-              pathOptions={{
-                color: getEdgeTypeColor(edge.edge_type, region),
-                weight: Math.max(1, edge.weight * 2.5),
-                opacity: 0.35,
-              }}
-            />
-          );
-        })}
-
-        {/* Cities */}
-        {data.cities.map((city: City) => {
-          const radius = city.is_ftz_target
-            ? 7
-            : city.is_port
-            ? 5
-            : city.is_capital
-            ? 4
-            : 3;
-
-          return (
-            <CircleMarker
-              key={city.id}
-              center={[city.lat, city.lng]}
-              radius={radius}
-              pathOptions={{
-                fillColor: getBlocColor(city.bloc, region),
-                fillOpacity: city.is_ftz_target ? 0.9 : 0.7,
-                color: city.is_ftz_target ? "#fbbf24" : getBlocColor(city.bloc, region),
-                weight: city.is_ftz_target ? 2 : 1,
-                opacity: 0.8,
-              }}
-            >
-              <Popup>
-                <CityPopup city={city} region={region} />
-              </Popup>
-            </CircleMarker>
-          );
-        })}
+        <TiledNetwork region={region} index={tileIndex.index} activeEdgeTypes={activeEdgeTypes} />
       </MapContainer>
     </div>
   );
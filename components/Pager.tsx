@@ -0,0 +1,55 @@
+export default function Pager({
+  page,
+  pageSize,
+  total,
+  onPage,
+}: {
+  page: number;
+  pageSize: number;
+  total: number;
+  onPage: (page: number) => void;
+}) {
+  const pages = Math.max(1, Math.ceil(total / pageSize));
+  const buttonStyle = (enabled: boolean) => ({
+    fontSize: 10,
+    fontWeight: 500,
+    letterSpacing: "0.06em",
+    textTransform: "uppercase" as const,
+    padding: "6px 14px",
+    borderRadius: 4,
+    border: "1px solid rgba(255,255,255,0.06)",
+    background: "transparent",
+    color: enabled ? "var(--text-primary)" : "var(--text-muted)",
+    cursor: enabled ? "pointer" : "default",
+    fontFamily: "var(--font-jetbrains), monospace",
+  });
+
+  return (
+    <div
+      style={{
+        display: "flex",
+        alignItems: "center",
+        justifyContent: "flex-end",
+        gap: 12,
+        marginTop: 16,
+        fontSize: 11,
+        color: "var(--text-muted)",
+        fontFamily: "var(--font-jetbrains), monospace",
+      }}
+    >
+      <button disabled={page === 0} onClick={() => onPage(page - 1)} style={buttonStyle(page > 0)}>
+        Prev
+      </button>
+      <span>
+        {total === 0 ? 0 : page * pageSize + 1}-{Math.min(total, (page + 1) * pageSize)} of {total}
+      </span>
+      <button
+        disabled={page >= pages - 1}
+        onClick={() => onPage(page + 1)}
+        style={buttonStyle(page < pages - 1)}
+      >
+        Next
+      </button>
+    </div>
+  );
+}
@@ -175,10 +175,7 @@ export function Sidebar() {
             color: "var(--text-muted)",
           }}
         >
-          {region === "west-africa" ? "analysis-data.json" :
-           region === "europe" ? "europe-data.json" :
-           region === "world" ? "world-data.json" :
-           "regions-data.json"}
+          {`data/${region}/*.json`}
         </div>
       </div>
     </nav>
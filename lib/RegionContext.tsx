@@ -2,9 +2,9 @@
 
 import { createContext, useContext, useState, ReactNode, useEffect } from "react";
 import { useSearchParams, useRouter, usePathname } from "next/navigation";
-import { Region } from "./data";
+import { Region, REGIONS } from "./data";
 
-export const REGIONS: Region[] = ["west-africa", "europe", "world", "regions"];
+export { REGIONS };
 
 interface RegionContextType {
   region: Region;
@@ -22,7 +22,7 @@ export function RegionProvider({ children }: { children: ReactNode }) {
   // Initialize from URL query param
   useEffect(() => {
     const regionParam = searchParams.get("region") as Region;
-    if (regionParam && REGIONS.includes(regionParam)) {
+    if (regionParam && (REGIONS as readonly string[]).includes(regionParam)) {
       setRegionState(regionParam);
     }
   }, [searchParams]);
@@ -0,0 +1,69 @@
+// ── Dictionary-encoded sections ──
+// Decoder for shards written with --shard-encoding dict (see
+// scripts/dataset_codec.py): strings are positions in a per-section string
+// table, record lists are stored column by column and edge descriptions as a
+// template plus its arguments.
+
+export interface EncodedSection {
+  format: "dict-v1";
+  strings: string[];
+  templates: string[][];
+  data: unknown;
+}
+
+type Encoded = Record<string, unknown>;
+
+export function decodeSection(encoded: EncodedSection): unknown {
+  if (encoded.format !== "dict-v1") throw new Error(`Unknown section format ${encoded.format}`);
+  const { strings, templates } = encoded;
+
+  const decode = (value: unknown): unknown => {
+    if (Array.isArray(value)) return value.map(decode);
+    if (value === null || typeof value !== "object") return value;
+    const v = value as Encoded;
+    if ("$rows" in v) {
+      const columns = Object.entries(v.$cols as Encoded).map(([field, column]) => [field, decode(column) as unknown[]] as const);
+      return Array.from({ length: v.$rows as number }, (_, i) => {
+        const row: Encoded = {};
+        for (const [field, column] of columns) row[field] = column[i];
+        return row;
+      });
+    }
+    if ("$ls" in v) {
+      const flat = v.$s as number[];
+      let start = 0;
+      return (v.$ls as number[]).map((length) => {
+        const list = flat.slice(start, start + length).map((i) => strings[i]);
+        start += length;
+        return list;
+      });
+    }
+    if ("$s" in v) {
+      const refs = v.$s as number | number[];
+      return typeof refs === "number" ? strings[refs] : refs.map((i) => strings[i]);
+    }
+    if ("$t" in v) {
+      const args = v.$a as number[];
+      let next = 0;
+      return (v.$t as number[]).map((template) => {
+        const parts = templates[template];
+        let text = parts[0];
+        for (let k = 1; k < parts.length; k++) text += strings[args[next++]] + parts[k];
+        return text;
+      });
+    }
+    if ("$b" in v) return Array.from(v.$b as string, (flag) => flag === "1");
+    if ("$f" in v) {
+      const scale = 10 ** (v.$f as number);
+      return (v.$v as number[]).map((n) => n / scale);
+    }
+    if ("$keys" in v) {
+      const keys = decode(v.$keys) as string[];
+      const values = decode(v.$values) as unknown[];
+      return Object.fromEntries(keys.map((key, i) => [key, values[i]]));
+    }
+    return Object.fromEntries(Object.entries(v).map(([key, entry]) => [key, decode(entry)]));
+  };
+
+  return decode(encoded.data);
+}
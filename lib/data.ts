@@ -1,18 +1,225 @@
-import type { AnalysisData, City } from "./types";
-import westAfricaRaw from "./analysis-data.json";
-import europeRaw from "./europe-data.json";
-import worldRaw from "./world-data.json";
-import regionsRaw from "./regions-data.json";
-
-export const datasets = {
-  "west-africa": westAfricaRaw as unknown as AnalysisData,
-  "europe": europeRaw as unknown as AnalysisData,
-  "world": worldRaw as unknown as AnalysisData,
-  "regions": regionsRaw as unknown as AnalysisData,
-};
+import { decodeSection, EncodedSection } from "./codec";
+import { applyPatch, patchChain } from "./delta";
+import type { AnalysisData, City, DatasetPatch, MapTile, ShardFile, ShardIndex, TileIndex } from "./types";
+
+// Region utilities
+export const REGIONS = ["west-africa", "europe", "world", "regions"] as const;
+export type Region = (typeof REGIONS)[number];
+export type Section = keyof AnalysisData;
+
+// ── Lazy per-section loading ──
+// Each region is published as one JSON shard per section under public/data/
+// (see scripts/generate_data.py --shard-dir); pages fetch only what they render.
+// public/data/index.json names each section's file and, for compressed or
+// dictionary-encoded shards, how to decode it. NEXT_PUBLIC_DATA_URL points the
+// dashboard at another origin, e.g. http://127.0.0.1:8787/data for the local
+// data service (scripts/data_service.py).
+const DATA_BASE_URL = process.env.NEXT_PUBLIC_DATA_URL ?? "/data";
+
+const jsonCache = new Map<string, Promise<unknown>>();
+const cityIndex = new Map<Region, Map<string, City>>();
+
+function loadJson(
+  key: string,
+  onLoad?: (value: unknown) => void,
+  load: () => Promise<unknown> = () => fetchShard({ file: `${key}.json`, bytes: 0 }),
+): Promise<unknown> {
+  let pending = jsonCache.get(key);
+  if (!pending) {
+    pending = load().then((value) => {
+      onLoad?.(value);
+      return value;
+    });
+    // Drop failed loads so the next request retries
+    pending.catch(() => jsonCache.delete(key));
+    jsonCache.set(key, pending);
+  }
+  return pending;
+}
+
+// DecompressionStream formats per shard compression; every browser has gzip
+const DECOMPRESSION_FORMATS = { gzip: "gzip", brotli: "brotli", zstd: "zstd" } as const;
+
+/** Fetches a published file, decompressing and decoding it as its shard index entry says. */
+async function fetchShard(shard: ShardFile): Promise<unknown> {
+  const res = await fetch(`${DATA_BASE_URL}/${shard.file}`);
+  if (!res.ok) throw new Error(`Failed to load ${shard.file}: ${res.status}`);
+  let value: unknown;
+  if (shard.compression && res.body) {
+    let stream: DecompressionStream;
+    try {
+      stream = new DecompressionStream(DECOMPRESSION_FORMATS[shard.compression] as CompressionFormat);
+    } catch {
+      throw new Error(`This browser cannot decompress ${shard.compression} (${shard.file})`);
+    }
+    value = await new Response(res.body.pipeThrough(stream)).json();
+  } else {
+    value = await res.json();
+  }
+  return shard.encoding === "dict" ? decodeSection(value as EncodedSection) : value;
+}
+
+function loadShardIndex(): Promise<ShardIndex> {
+  return loadJson("index") as Promise<ShardIndex>;
+}
+
+export function loadSection<K extends Section>(region: Region, section: K): Promise<AnalysisData[K]> {
+  trackVersion(region);
+  return loadJson(
+    `${region}/${section}`,
+    (value) => {
+      if (section === "cities") {
+        cityIndex.set(region, new Map((value as City[]).map((c) => [c.id, c])));
+      }
+    },
+    async () => {
+      // The shard index says which file holds the section and how it is encoded
+      const shard = (await loadShardIndex()).regions[region]?.sections[section];
+      return fetchShard(shard ?? { file: `${region}/${section}.json`, bytes: 0 });
+    },
+  ) as Promise<AnalysisData[K]>;
+}
+
+export async function loadSections<K extends Section>(
+  region: Region,
+  sections: readonly K[],
+): Promise<Pick<AnalysisData, K>> {
+  const values = await Promise.all(sections.map((section) => loadSection(region, section)));
+  return Object.fromEntries(sections.map((section, i) => [section, values[i]])) as Pick<AnalysisData, K>;
+}
+
+// ── Incremental updates ──
+// Generated with --delta, the shard index carries each region's dataset
+// version and the chain of patches from earlier versions. syncRegion brings
+// the sections already loaded up to date by applying the patches since the
+// version they were loaded at, and drops them (to be refetched) only when the
+// chain does not reach back that far.
+const regionVersions = new Map<Region, Promise<string | undefined>>();
+const updateListeners = new Set<(region: Region) => void>();
+const pendingSyncs = new Map<Region, Promise<boolean>>();
+
+async function fetchShardIndex(): Promise<ShardIndex> {
+  const res = await fetch(`${DATA_BASE_URL}/index.json`, { cache: "no-cache" });
+  if (!res.ok) throw new Error(`Failed to load the shard index: ${res.status}`);
+  return res.json();
+}
 
-// Keep backward compat
-export const data: AnalysisData = datasets["west-africa"];
+// Version of a region's sections, read when its first section is requested
+function trackVersion(region: Region): void {
+  if (regionVersions.has(region)) return;
+  regionVersions.set(
+    region,
+    fetchShardIndex().then(
+      (index) => index.regions[region]?.version,
+      () => undefined,
+    ),
+  );
+}
+
+/** Calls listener with every region syncRegion updated; returns the unsubscribe function. */
+export function onRegionUpdate(listener: (region: Region) => void): () => void {
+  updateListeners.add(listener);
+  return () => updateListeners.delete(listener);
+}
+
+/** Brings the region's loaded sections up to the published version; resolves to whether anything changed. */
+export function syncRegion(region: Region): Promise<boolean> {
+  // Concurrent callers share one sync so no patch is applied twice
+  let pending = pendingSyncs.get(region);
+  if (!pending) {
+    pending = applyUpdates(region).finally(() => pendingSyncs.delete(region));
+    pendingSyncs.set(region, pending);
+  }
+  return pending;
+}
+
+async function applyUpdates(region: Region): Promise<boolean> {
+  const loaded = regionVersions.get(region);
+  if (!loaded) return false;
+  const [from, index] = await Promise.all([loaded, fetchShardIndex()]);
+  const entry = index.regions[region];
+  if (!from || !entry?.version || entry.version === from) return false;
+
+  const prefix = `${region}/`;
+  const keys = [...jsonCache.keys()].filter((key) => key.startsWith(prefix));
+  const chain = patchChain(entry.patches ?? [], from, entry.version);
+  const patches = chain
+    ? await Promise.all(chain.map((link) => loadJson(link.file.replace(/\.json$/, "")) as Promise<DatasetPatch>))
+    : null;
+  for (const key of keys) {
+    const section = key.slice(prefix.length);
+    if (!patches || section.startsWith("tiles/") || section.startsWith("patches/")) {
+      // Tiles are rebuilt on every run; without a chain the section is refetched
+      if (!section.startsWith("patches/")) jsonCache.delete(key);
+      continue;
+    }
+    let value = await jsonCache.get(key)!.catch(() => undefined);
+    for (const patch of patches) {
+      const sectionPatch = patch.sections[section];
+      if (sectionPatch && value !== undefined) value = applyPatch(value, sectionPatch);
+    }
+    if (value === undefined) jsonCache.delete(key);
+    else jsonCache.set(key, Promise.resolve(value));
+  }
+  const cities = jsonCache.get(`${prefix}cities`);
+  if (cities) cityIndex.set(region, new Map(((await cities) as City[]).map((c) => [c.id, c])));
+  else cityIndex.delete(region);
+
+  jsonCache.set("index", Promise.resolve(index));
+  regionVersions.set(region, Promise.resolve(entry.version));
+  updateListeners.forEach((listener) => listener(region));
+  return true;
+}
+
+// ── Map tiles ──
+// Quadtree of level-of-detail tiles: split tiles hold city clusters, leaves the
+// cities themselves. The map only fetches the tiles covering its viewport.
+export function loadTileIndex(region: Region): Promise<TileIndex> {
+  return loadJson(`${region}/tiles/index`) as Promise<TileIndex>;
+}
+
+export function loadTile(region: Region, key: string): Promise<MapTile> {
+  return loadJson(`${region}/tiles/${key}`) as Promise<MapTile>;
+}
+
+// Web Mercator position as fractions of the world width and height
+function project(lat: number, lng: number): [number, number] {
+  const clamped = Math.max(-85.05112878, Math.min(85.05112878, lat));
+  const s = Math.sin((clamped * Math.PI) / 180);
+  return [(lng + 180) / 360, 0.5 - Math.log((1 + s) / (1 - s)) / (4 * Math.PI)];
+}
+
+/**
+ * Keys ("z/x/y") of the tiles to draw for a viewport at the given map zoom:
+ * the quadtree is descended until the tiles reach that zoom or are leaves.
+ */
+export function visibleTiles(
+  index: TileIndex,
+  south: number,
+  west: number,
+  north: number,
+  east: number,
+  zoom: number,
+): string[] {
+  const wrapped = east - west >= 360;
+  const [x0, y0] = project(north, wrapped ? -180 : Math.max(-180, west));
+  const [x1, y1] = project(south, wrapped ? 180 : Math.min(180, east));
+  const keys: string[] = [];
+  const visit = (z: number, x: number, y: number) => {
+    const key = `${z}/${x}/${y}`;
+    const count = index.tiles[key];
+    if (count === undefined) return;
+    const size = 1 / 2 ** z;
+    if (x * size > x1 || (x + 1) * size < x0 || y * size > y1 || (y + 1) * size < y0) return;
+    if (z >= zoom || z >= index.max_zoom || count <= index.leaf_cities) {
+      keys.push(key);
+      return;
+    }
+    for (const [dx, dy] of [[0, 0], [1, 0], [0, 1], [1, 1]]) visit(z + 1, 2 * x + dx, 2 * y + dy);
+  };
+  visit(0, 0, 0);
+  return keys;
+}
 
 // ── Region-specific bloc colors ──
 export const BLOC_COLORS: Record<string, Record<string, string>> = {
@@ -102,8 +309,9 @@ export function getEdgeTypeColor(type: string, region: Region = "west-africa"):
   return EDGE_TYPE_COLORS[region]?.[type] ?? EDGE_TYPE_COLORS["west-africa"]?.[type] ?? "#64748b";
 }
 
+// City lookups resolve against the region's cities shard once it has loaded
 export function getCityById(id: string, region: Region = "west-africa"): City | undefined {
-  return datasets[region]?.cities.find((c) => c.id === id);
+  return cityIndex.get(region)?.get(id);
 }
 
 export function getCityName(id: string, region: Region = "west-africa"): string {
@@ -111,6 +319,8 @@ export function getCityName(id: string, region: Region = "west-africa"): string
 }
 
 export function formatNumber(n: number): string {
+  if (n >= 1_000_000_000_000) return `${(n / 1_000_000_000_000).toFixed(1)}T`;
+  if (n >= 1_000_000_000) return `${(n / 1_000_000_000).toFixed(1)}B`;
   if (n >= 1_000_000) return `${(n / 1_000_000).toFixed(1)}M`;
   if (n >= 1_000) return `${(n / 1_000).toFixed(1)}K`;
   return n.toString();
@@ -123,7 +333,3 @@ export function formatPercent(n: number): string {
 export function formatScore(n: number): string {
   return n.toFixed(2);
 }
-
-// Region utilities
-export type Region = keyof typeof datasets;
-export const REGIONS = Object.keys(datasets) as Region[];
@@ -0,0 +1,77 @@
+import type { PatchLink, SectionPatch } from "./types";
+
+// ── Applying dataset patches ──
+// Counterpart of scripts/dataset_delta.py apply_patch: records are matched by
+// their key fields joined with "|" ("#n" added for the n-th repeat of a key),
+// mappings by key, and a patch lists the full key order only when the
+// survivors followed by the added entries would come out in the wrong order.
+
+type Row = Record<string, unknown>;
+
+function recordKeys(records: Row[], fields: string[]): string[] {
+  const seen = new Map<string, number>();
+  return records.map((record) => {
+    const key = fields.map((field) => String(record[field])).join("|");
+    const repeat = seen.get(key) ?? 0;
+    seen.set(key, repeat + 1);
+    return repeat ? `${key}#${repeat}` : key;
+  });
+}
+
+function reorder<T>(entries: [string, T][], order: string[] | undefined): [string, T][] {
+  if (!order) return entries;
+  const lookup = new Map(entries);
+  return order.map((key) => [key, lookup.get(key) as T]);
+}
+
+/** The section value with patch applied; value itself is left untouched. */
+export function applyPatch(value: unknown, patch: SectionPatch): unknown {
+  switch (patch.kind) {
+    case "set":
+      return patch.value;
+    case "drop":
+      return undefined;
+    case "nested": {
+      const result: Row = {};
+      for (const [key, entry] of Object.entries(value as Row)) {
+        result[key] = key in patch.entries ? applyPatch(entry, patch.entries[key]) : entry;
+      }
+      return result;
+    }
+    case "records": {
+      const rows = value as Row[];
+      const removed = new Set(patch.removed);
+      const keys = recordKeys(rows, patch.key);
+      const entries: [string, Row][] = [];
+      rows.forEach((row, i) => {
+        const key = keys[i];
+        if (removed.has(key)) return;
+        entries.push([key, key in patch.changed ? { ...row, ...patch.changed[key] } : row]);
+      });
+      entries.push(...Object.entries(patch.added));
+      return reorder(entries, patch.order).map(([, row]) => row);
+    }
+    case "mapping": {
+      const removed = new Set(patch.removed);
+      const entries: [string, unknown][] = Object.entries(value as Row)
+        .filter(([key]) => !removed.has(key))
+        .map(([key, entry]) => [key, key in patch.changed ? patch.changed[key] : entry]);
+      entries.push(...Object.entries(patch.added));
+      return Object.fromEntries(reorder(entries, patch.order));
+    }
+  }
+}
+
+/** The links leading from one version to another, or null if the chain does not connect them. */
+export function patchChain(links: PatchLink[], from: string, to: string): PatchLink[] | null {
+  const next = new Map(links.map((link) => [link.from, link]));
+  const chain: PatchLink[] = [];
+  let version = from;
+  while (version !== to) {
+    const link = next.get(version);
+    if (!link || chain.length >= links.length) return null;
+    chain.push(link);
+    version = link.to;
+  }
+  return chain;
+}
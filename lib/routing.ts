@@ -0,0 +1,117 @@
+import type { RouteIndex } from "./types";
+
+// ── Route queries over a region's shipped ALT index ──
+// A* whose heuristic is the landmark lower bound |d(L, t) - d(L, v)|, so a query
+// only settles the nodes between origin and destination instead of the graph.
+
+export interface RouteResult {
+  cost: number;
+  path: string[];
+  settled: number;
+}
+
+const positions = new WeakMap<RouteIndex, Map<string, number>>();
+
+function positionOf(index: RouteIndex, id: string): number | undefined {
+  let map = positions.get(index);
+  if (!map) {
+    map = new Map(index.nodes.map((node, i) => [node, i]));
+    positions.set(index, map);
+  }
+  return map.get(id);
+}
+
+// Binary min-heap of [priority, node] pairs
+class Heap {
+  private items: [number, number][] = [];
+
+  get size(): number {
+    return this.items.length;
+  }
+
+  push(priority: number, node: number): void {
+    const items = this.items;
+    items.push([priority, node]);
+    let i = items.length - 1;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (items[parent][0] <= items[i][0]) break;
+      [items[parent], items[i]] = [items[i], items[parent]];
+      i = parent;
+    }
+  }
+
+  pop(): [number, number] {
+    const items = this.items;
+    const top = items[0];
+    const last = items.pop()!;
+    if (items.length > 0) {
+      items[0] = last;
+      let i = 0;
+      for (;;) {
+        const left = 2 * i + 1;
+        const right = left + 1;
+        let smallest = i;
+        if (left < items.length && items[left][0] < items[smallest][0]) smallest = left;
+        if (right < items.length && items[right][0] < items[smallest][0]) smallest = right;
+        if (smallest === i) break;
+        [items[smallest], items[i]] = [items[i], items[smallest]];
+        i = smallest;
+      }
+    }
+    return top;
+  }
+}
+
+/**
+ * Cheapest route between two cities, or null if none exists.
+ * Costs are edge distances marked up by their tariffs, as in trade_routes.
+ */
+export function findRoute(index: RouteIndex, originId: string, destinationId: string): RouteResult | null {
+  const source = positionOf(index, originId);
+  const target = positionOf(index, destinationId);
+  if (source === undefined || target === undefined) return null;
+
+  const { offsets, neighbors, costs, distances } = index;
+  // A landmark that reaches exactly one endpoint proves they are disconnected
+  for (const row of distances) {
+    if ((row[source] < 0) !== (row[target] < 0)) return null;
+  }
+  const useful = distances.filter((row) => row[target] >= 0);
+  const heuristic = (v: number): number => {
+    let bound = 0;
+    for (const row of useful) {
+      const d = Math.abs(row[target] - row[v]);
+      if (d > bound) bound = d;
+    }
+    return bound;
+  };
+
+  const dist = new Map<number, number>([[source, 0]]);
+  const parent = new Map<number, number>([[source, source]]);
+  const closed = new Set<number>();
+  const heap = new Heap();
+  heap.push(heuristic(source), source);
+  while (heap.size > 0) {
+    const [, v] = heap.pop();
+    if (closed.has(v)) continue;
+    closed.add(v);
+    if (v === target) {
+      const path = [v];
+      while (path[path.length - 1] !== source) path.push(parent.get(path[path.length - 1])!);
+      path.reverse();
+      return { cost: dist.get(v)!, path: path.map((i) => index.nodes[i]), settled: closed.size };
+    }
+    const d = dist.get(v)!;
+    for (let i = offsets[v]; i < offsets[v + 1]; i++) {
+      const w = neighbors[i];
+      const next = d + costs[i];
+      if (!closed.has(w) && next < (dist.get(w) ?? Infinity)) {
+        dist.set(w, next);
+        parent.set(w, v);
+        heap.push(next + heuristic(w), w);
+      }
+    }
+  }
+  return null;
+}
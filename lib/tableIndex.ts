@@ -0,0 +1,54 @@
+import type { TableIndex } from "./types";
+
+// ── Paging through precomputed table indexes ──
+// Sorting reads a shipped permutation (backwards for ascending) and filtering
+// walks it against a category bitmap, so an interaction never copies or
+// sorts the rows; a filtered permutation is built once and then reused.
+
+const bitmaps = new WeakMap<TableIndex, Map<string, Uint8Array>>();
+const filteredOrders = new WeakMap<TableIndex, Map<string, number[]>>();
+
+function bitmapOf(index: TableIndex, category: string): Uint8Array {
+  let decoded = bitmaps.get(index);
+  if (!decoded) {
+    decoded = new Map();
+    bitmaps.set(index, decoded);
+  }
+  let bits = decoded.get(category);
+  if (!bits) {
+    const raw = atob(index.bitmaps?.[category] ?? "");
+    bits = Uint8Array.from(raw, (c) => c.charCodeAt(0));
+    decoded.set(category, bits);
+  }
+  return bits;
+}
+
+/** Row positions in descending order of column, restricted to a category (null: all rows). */
+export function sortedRows(index: TableIndex, column: string, category: string | null = null): number[] {
+  const order = index.order[column] ?? [];
+  if (category === null) return order;
+  let cache = filteredOrders.get(index);
+  if (!cache) {
+    cache = new Map();
+    filteredOrders.set(index, cache);
+  }
+  const key = `${column}/${category}`;
+  let filtered = cache.get(key);
+  if (!filtered) {
+    const bits = bitmapOf(index, category);
+    filtered = order.filter((i) => (bits[i >> 3] >> (i & 7)) & 1);
+    cache.set(key, filtered);
+  }
+  return filtered;
+}
+
+/** The rows of one page of an order, read from the end when ascending. */
+export function pageRows<T>(rows: T[], order: number[], page: number, pageSize: number, ascending: boolean): T[] {
+  const start = page * pageSize;
+  const end = Math.min(order.length, start + pageSize);
+  const result: T[] = [];
+  for (let k = start; k < end; k++) {
+    result.push(rows[order[ascending ? order.length - 1 - k : k]]);
+  }
+  return result;
+}
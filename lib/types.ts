@@ -72,6 +72,25 @@ export interface TradeRouteData {
   min_cut_nodes: string[];
 }
 
+// ALT (A*, landmarks, triangle inequality) index over the active edges:
+// a CSR graph plus each landmark's distance to every node (-1 if unreachable)
+export interface RouteIndex {
+  nodes: string[];
+  offsets: number[];
+  neighbors: number[];
+  costs: number[];
+  landmarks: string[];
+  distances: number[][];
+}
+
+export interface PercentileBands {
+  p5: number;
+  p25: number;
+  p50: number;
+  p75: number;
+  p95: number;
+}
+
 export interface CascadeScenario {
   name: string;
   trigger: string;
@@ -82,6 +101,10 @@ export interface CascadeScenario {
   new_components: number;
   trade_volume_affected: number;
   severity: number;
+  // Present when the generator ran Monte Carlo trials (--cascade-trials)
+  trials?: number;
+  isolated_cities_bands?: PercentileBands;
+  trade_volume_affected_bands?: PercentileBands;
 }
 
 export interface OpportunitySignal {
@@ -95,6 +118,116 @@ export interface OpportunitySignal {
   confidence: number;
 }
 
+// Map tiles (public/data/<region>/tiles, see scripts/map_tiles.py)
+export interface TileIndex {
+  tile_px: number;
+  cell_px: number;
+  leaf_cities: number;
+  max_zoom: number;
+  // "z/x/y" -> number of cities in the tile
+  tiles: Record<string, number>;
+}
+
+export interface TileCluster {
+  id: string;
+  lat: number;
+  lng: number;
+  count: number;
+  population: number;
+  ftz_targets: number;
+  city: string;
+  name: string;
+  bloc: string;
+}
+
+// Edges bundled per edge type between two clusters (or two cities in leaf tiles)
+export interface TileEdge {
+  id: string;
+  from: [number, number];
+  to: [number, number];
+  edge_type: string;
+  count: number;
+  volume: number;
+  weight: number;
+}
+
+export interface MapTile {
+  zoom: number;
+  x: number;
+  y: number;
+  leaf: boolean;
+  cities?: City[];
+  clusters?: TileCluster[];
+  edges: TileEdge[];
+}
+
+// Precomputed table indexes (see scripts/table_index.py): per column the row
+// positions in descending order, and per category a base64 bitmap of its rows
+export interface TableIndex {
+  rows: number;
+  order: Record<string, number[]>;
+  bitmaps?: Record<string, string>;
+  counts?: Record<string, number>;
+}
+
+// Patches between generation runs (see scripts/dataset_delta.py)
+export type SectionPatch =
+  | { kind: "set"; value: unknown }
+  | { kind: "drop" }
+  | {
+      kind: "records";
+      key: string[];
+      removed: string[];
+      changed: Record<string, Record<string, unknown>>;
+      added: Record<string, Record<string, unknown>>;
+      order?: string[];
+    }
+  | {
+      kind: "mapping";
+      removed: string[];
+      changed: Record<string, unknown>;
+      added: Record<string, unknown>;
+      order?: string[];
+    }
+  | { kind: "nested"; entries: Record<string, SectionPatch> };
+
+export interface DatasetPatch {
+  from: string;
+  to: string;
+  generated_at: string;
+  sections: Record<string, SectionPatch>;
+}
+
+export interface PatchLink {
+  from: string;
+  to: string;
+  file: string;
+  bytes: number;
+}
+
+// A section's file; encoding and compression are set for --shard-encoding dict
+// and --shard-compression shards
+export interface ShardFile {
+  file: string;
+  bytes: number;
+  encoding?: "dict";
+  compression?: "gzip" | "brotli" | "zstd";
+}
+
+// public/data/index.json; version and patches are only published with --delta
+export interface ShardIndex {
+  regions: Record<
+    string,
+    {
+      generated_at: string;
+      sections: Record<string, ShardFile>;
+      tiles?: { index: string; tiles: number; max_zoom: number };
+      version?: string;
+      patches?: PatchLink[];
+    }
+  >;
+}
+
 export interface AnalysisData {
   generated_at: string;
   summary: NetworkSummary;
@@ -103,6 +236,9 @@ export interface AnalysisData {
   metrics: NetworkMetrics;
   ftz_impact: Record<string, FTZImpactScore>;
   trade_routes: Record<string, TradeRouteData>;
+  trade_routes_index: TableIndex;
+  route_index: RouteIndex;
   cascades: CascadeScenario[];
   opportunities: OpportunitySignal[];
+  opportunities_index: TableIndex;
 }
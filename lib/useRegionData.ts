@@ -0,0 +1,51 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import { loadSections, onRegionUpdate, Region, Section, syncRegion } from "./data";
+import { useRegion } from "./RegionContext";
+import type { AnalysisData } from "./types";
+
+/**
+ * Loads the given sections of the selected region's dataset.
+ * Returns null until every section has arrived (and again while switching regions).
+ * When the tab becomes visible again the region is synced with the published
+ * dataset, and the sections reload (patched in place) if it changed.
+ */
+export function useRegionData<K extends Section>(
+  sections: readonly K[],
+): Pick<AnalysisData, K> | null {
+  const { region } = useRegion();
+  const [loaded, setLoaded] = useState<{ region: Region; data: Pick<AnalysisData, K> } | null>(null);
+  const key = sections.join(",");
+  const [revision, setRevision] = useState(0);
+
+  useEffect(() => {
+    const unsubscribe = onRegionUpdate((updated) => {
+      if (updated === region) setRevision((r) => r + 1);
+    });
+    const onVisible = () => {
+      if (document.visibilityState === "visible") syncRegion(region).catch((err) => console.error(err));
+    };
+    document.addEventListener("visibilitychange", onVisible);
+    return () => {
+      unsubscribe();
+      document.removeEventListener("visibilitychange", onVisible);
+    };
+  }, [region]);
+
+  useEffect(() => {
+    let cancelled = false;
+    loadSections(region, sections).then(
+      (data) => {
+        if (!cancelled) setLoaded({ region, data });
+      },
+      (err) => console.error(err),
+    );
+    return () => {
+      cancelled = true;
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [region, key, revision]);
+
+  return loaded?.region === region ? loaded.data : null;
+}
@@ -0,0 +1,234 @@
+"""
+Benchmark the data generation pipeline across a sweep of sizes.
+
+Runs each stage (city synthesis, city index, edge synthesis, metrics, FTZ
+scoring, trade routes, route index, cascades, opportunities, compact JSON write)
+for every combination of --cities and --edges-per-city and records
+wall time, peak traced memory and output bytes in a JSON results file. Given a
+baseline results file, stages that got slower or bigger than the tolerance
+allows are reported as regressions and the exit status is 1.
+
+Every size runs in a fresh worker process, timed without tracemalloc and then
+measured again with it, so neither memory tracing nor earlier sizes skew the
+timings.
+
+    python scripts/benchmark.py --cities 1000 10000 100000
+    python scripts/benchmark.py --baseline scripts/benchmark-baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from dataset_io import write_dataset
+from generate_data import (BASE_SEED, EDGE_SAMPLERS, REGIONS, CityIndex, derive_seed, generate_cascades,
+                           generate_edges, generate_ftz_impact, generate_metrics, generate_opportunities,
+                           generate_route_index, generate_scaled_city_data, generate_trade_routes)
+from graph_engine import CSRGraph
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark-baseline.json")
+
+DEFAULT_CITY_COUNTS = [1000, 10000, 100000]
+DEFAULT_EDGES_PER_CITY = [10]
+
+# Relative slowdown / growth over the baseline that counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Stages faster than this (in both runs) are too noisy to flag
+MIN_FLAGGED_SECONDS = 0.05
+
+STAGES = ["cities", "index", "edges", "metrics", "ftz_impact", "trade_routes", "route_index", "cascades",
+          "opportunities", "write"]
+
+
+def run_stages(region: str, num_cities: int, num_edges: int, seed: int, sampler: str,
+               measure: Callable[[str, Callable], object]) -> Dict[str, int]:
+    """Run the pipeline once, passing each stage to measure; returns output bytes per stage."""
+    random.seed(derive_seed(seed, region, "cities"))
+    cities = measure("cities", lambda: generate_scaled_city_data(region, num_cities))
+    index = measure("index", lambda: CityIndex(cities))
+    random.seed(derive_seed(seed, region, "edges"))
+    edges = measure("edges", lambda: generate_edges(index, region, num_edges, sampler))
+
+    graphs = []
+
+    def metrics():
+        graphs.append(CSRGraph(len(index), edges.source, edges.target))
+        return generate_metrics(index, graphs[0], region)
+
+    random.seed(derive_seed(seed, region, "metrics"))
+    metrics_value = measure("metrics", metrics)
+
+    # The remaining sections in iter_dataset order, each from its own seed as there
+    later = {
+        "ftz_impact": lambda: generate_ftz_impact(index, edges, metrics_value, region),
+        "trade_routes": lambda: generate_trade_routes(index, edges, region),
+        "route_index": lambda: generate_route_index(index, edges, region),
+        "cascades": lambda: generate_cascades(index, edges, graphs[0], region),
+        "opportunities": lambda: generate_opportunities(index, edges, metrics_value, region),
+    }
+    for stage, build in later.items():
+        random.seed(derive_seed(seed, region, stage))
+        measure(stage, build)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sections = {"cities": cities, "edges": edges, "metrics": metrics_value}
+        written = measure("write", lambda: write_dataset(sections, os.path.join(tmp, "data.json"), indent=None))
+    return {"write": written}
+
+
+def benchmark_size(region: str, num_cities: int, num_edges: int, seed: int, sampler: str,
+                   trace_memory: bool) -> List[Dict]:
+    """Time every stage for one size, then (optionally) rerun it under tracemalloc for peak memory."""
+    wall = {}
+
+    def timed(stage, fn):
+        start = time.perf_counter()
+        value = fn()
+        wall[stage] = time.perf_counter() - start
+        return value
+
+    output_bytes = run_stages(region, num_cities, num_edges, seed, sampler, timed)
+
+    peak = {}
+    if trace_memory:
+        def traced(stage, fn):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            value = fn()
+            peak[stage] = tracemalloc.get_traced_memory()[1] - before
+            return value
+
+        tracemalloc.start()
+        try:
+            run_stages(region, num_cities, num_edges, seed, sampler, traced)
+        finally:
+            tracemalloc.stop()
+
+    return [{
+        "stage": stage,
+        "cities": num_cities,
+        "edges": num_edges,
+        "wall_s": round(wall[stage], 4),
+        "peak_mb": round(peak[stage] / 2**20, 2) if stage in peak else None,
+        "output_bytes": output_bytes.get(stage),
+    } for stage in STAGES]
+
+
+def find_regressions(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[Dict]:
+    """Compare results with baseline rows of the same stage and size."""
+    previous = {(row["stage"], row["cities"], row["edges"]): row for row in baseline}
+    regressions = []
+    for row in results:
+        base = previous.get((row["stage"], row["cities"], row["edges"]))
+        if base is None:
+            continue
+        for metric in ("wall_s", "peak_mb", "output_bytes"):
+            new, old = row.get(metric), base.get(metric)
+            if new is None or old is None or new <= old * (1 + tolerance):
+                continue
+            if metric == "wall_s" and new < MIN_FLAGGED_SECONDS:
+                continue
+            regressions.append({
+                "stage": row["stage"], "cities": row["cities"], "edges": row["edges"],
+                "metric": metric, "baseline": old, "current": new,
+                "change": round(new / old - 1, 3) if old else None,
+            })
+    return regressions
+
+
+def format_table(results: List[Dict]) -> str:
+    """Plain-text summary of the results."""
+    lines = [f"{'stage':<13} {'cities':>9} {'edges':>10} {'wall s':>9} {'peak MB':>9} {'bytes':>12}"]
+    for row in results:
+        peak = "-" if row["peak_mb"] is None else f"{row['peak_mb']:.2f}"
+        size = "-" if row["output_bytes"] is None else str(row["output_bytes"])
+        lines.append(f"{row['stage']:<13} {row['cities']:>9} {row['edges']:>10} "
+                     f"{row['wall_s']:>9.3f} {peak:>9} {size:>12}")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Benchmark the data generation pipeline.")
+    parser.add_argument("--cities", type=int, nargs="+", default=DEFAULT_CITY_COUNTS, metavar="N",
+                        help=f"city counts to sweep (default: {' '.join(map(str, DEFAULT_CITY_COUNTS))})")
+    parser.add_argument("--edges-per-city", type=int, nargs="+", default=DEFAULT_EDGES_PER_CITY, metavar="K",
+                        help="edge densities to sweep; each size gets N*K edges (default: 10)")
+    parser.add_argument("--region", choices=REGIONS, default="world",
+                        help="region template the cities are synthesized from (default: world)")
+    parser.add_argument("--edge-sampler", choices=EDGE_SAMPLERS, default="uniform",
+                        help="how edge endpoints are drawn (default: uniform, as in the baseline)")
+    parser.add_argument("--seed", type=int, default=BASE_SEED,
+                        help=f"base seed (default: {BASE_SEED})")
+    parser.add_argument("--no-memory", dest="trace_memory", action="store_false",
+                        help="skip the tracemalloc pass (halves the run time; no peak_mb)")
+    parser.add_argument("--output", metavar="FILE",
+                        help="write the results JSON to FILE (default: stdout summary only)")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="flag regressions against a previous results file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"also store the results as the baseline ({os.path.relpath(DEFAULT_BASELINE)})")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"relative increase allowed before a regression is flagged (default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args(argv)
+    if min(args.cities) < 2:
+        parser.error("--cities must be at least 2")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the sweep; returns the exit status (1 if regressions were found)."""
+    args = parse_args(argv)
+
+    results = []
+    for num_cities in args.cities:
+        for per_city in args.edges_per_city:
+            num_edges = num_cities * per_city
+            print(f"Benchmarking {num_cities} cities, {num_edges} edges...", file=sys.stderr)
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                results.extend(pool.submit(benchmark_size, args.region, num_cities, num_edges,
+                                           args.seed, args.edge_sampler, args.trace_memory).result())
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {"region": args.region, "seed": args.seed, "edge_sampler": args.edge_sampler,
+                   "tolerance": args.tolerance},
+        "results": results,
+    }
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["baseline"] = args.baseline
+            report["regressions"] = find_regressions(results, json.load(f)["results"], args.tolerance)
+
+    print(format_table(results))
+    for regression in report.get("regressions", []):
+        print(f"REGRESSION {regression['stage']} @ {regression['cities']} cities/{regression['edges']} edges: "
+              f"{regression['metric']} {regression['baseline']} -> {regression['current']}")
+
+    for path in filter(None, [args.output, DEFAULT_BASELINE if args.save_baseline else None]):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to: {path}")
+
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""
+Cascade propagation over the generated trade network.
+
+A scenario removes seed cities and/or degrades edge types. Every edge carries its
+trade volume; a city's load is the volume over its active edges and its capacity
+is (1 + tolerance) times its initial load. Volume shed by a failed or degraded
+edge is rerouted over the surviving city's other healthy edges in proportion to
+their current flow, which raises its partners' loads; partners pushed over
+capacity fail in the next round, until no city is overloaded. Volume with no
+edge left to take it is lost.
+
+Connectivity after the cascade is updated incrementally: only the components
+that lost cities are searched, with one interleaved BFS per surviving neighbor of
+a failed city. Searches that meet are merged, and the last search left in a
+component stops as soon as it outgrows every piece that broke off, so the work
+is proportional to those pieces rather than to the graph.
+"""
+
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from graph_engine import CSRGraph
+
+# Spare capacity every city has over its initial load
+CASCADE_TOLERANCE = 0.25
+
+# Relative slack on capacity checks so float rounding never fails a city
+CAPACITY_EPSILON = 1e-9
+
+
+class CascadeEngine:
+    """Runs cascade scenarios on one graph; build once, call run per scenario.
+
+    sources/targets/edge_types/volumes/active are the edge columns (city
+    positions, edge type codes, volumes, 0/1 activity); graph is the CSRGraph of
+    the same edges, used for connectivity. Inactive edges carry no volume.
+    """
+
+    def __init__(self, graph: CSRGraph, sources: Sequence[int], targets: Sequence[int],
+                 edge_types: Sequence[int], volumes: Sequence[int], active: Sequence[int],
+                 tolerance: float = CASCADE_TOLERANCE):
+        n = graph.num_nodes
+        self.graph = graph
+        self.sources = sources
+        self.targets = targets
+        self.edge_types = edge_types
+
+        # Incidence lists (edge ids per city) of the active edges, in CSR form
+        counts = [0] * (n + 1)
+        live = [e for e in range(len(sources)) if active[e]]
+        for e in live:
+            counts[sources[e] + 1] += 1
+            counts[targets[e] + 1] += 1
+        for v in range(n):
+            counts[v + 1] += counts[v]
+        cursor = counts[:-1]
+        incident = array("l", bytes(8 * counts[-1]))
+        for e in live:
+            for v in (sources[e], targets[e]):
+                incident[cursor[v]] = e
+                cursor[v] += 1
+        self.offsets = counts
+        self.incident = incident
+
+        self.flow = array("d", [float(volumes[e]) if active[e] else 0.0 for e in range(len(sources))])
+        self.active = bytearray(1 if active[e] else 0 for e in range(len(sources)))
+        self.load = array("d", bytes(8 * n))
+        for e in live:
+            self.load[sources[e]] += self.flow[e]
+            self.load[targets[e]] += self.flow[e]
+        self.capacity = array("d", [(1.0 + tolerance) * (1.0 + CAPACITY_EPSILON) * x for x in self.load])
+
+        self.edges_by_type: Dict[int, List[int]] = {}
+        for e in live:
+            self.edges_by_type.setdefault(edge_types[e], []).append(e)
+
+        # Connected components of the intact graph
+        self.component = array("l", [-1]) * n
+        self.component_size = []
+        neighbors, offsets = graph.neighbors, graph.offsets
+        for root in range(n):
+            if self.component[root] >= 0:
+                continue
+            label = len(self.component_size)
+            self.component[root] = label
+            queue = [root]
+            for v in queue:
+                for w in neighbors[offsets[v]:offsets[v + 1]]:
+                    if self.component[w] < 0:
+                        self.component[w] = label
+                        queue.append(w)
+            self.component_size.append(len(queue))
+
+    def run(self, seeds: Iterable[int], degraded_types: Iterable[int] = (), severity: float = 0.0,
+            tolerance: Optional[float] = None) -> Dict:
+        """Propagate one scenario to its fixed point.
+
+        seeds fail outright; edges of degraded_types lose a severity fraction of
+        their volume and take no rerouted volume. Returns the failed cities in
+        failure order (seeds first), the surviving cities cut off from their
+        component's main piece (isolated), the surviving cities that lost or
+        shed volume (disrupted), the number of rounds, the change in component
+        count and the volume lost. tolerance overrides the engine's spare
+        capacity for this run.
+        """
+        n = self.graph.num_nodes
+        sources, targets, incident, offsets = self.sources, self.targets, self.incident, self.offsets
+        flow = array("d", self.flow)
+        load = array("d", self.load)
+        capacity = self.capacity
+        if tolerance is not None:
+            factor = (1.0 + tolerance) * (1.0 + CAPACITY_EPSILON)
+            capacity = array("d", [factor * x for x in self.load])
+        edge_alive = bytearray(self.active)
+        alive = bytearray(b"\x01") * n
+        impaired = set(degraded_types)
+        edge_types = self.edge_types
+        disrupted = set()
+        lost = 0.0
+
+        def reroute(pending: Dict[int, float]) -> List[int]:
+            """Spread each city's shed volume over its healthy edges; returns overloaded partners."""
+            nonlocal lost
+            overloaded = []
+            for v, amount in pending.items():
+                healthy = [e for e in incident[offsets[v]:offsets[v + 1]]
+                           if edge_alive[e] and edge_types[e] not in impaired]
+                total = sum(flow[e] for e in healthy)
+                if total <= 0.0:
+                    lost += amount
+                    continue
+                load[v] += amount
+                scale = amount / total
+                for e in healthy:
+                    extra = flow[e] * scale
+                    flow[e] += extra
+                    w = targets[e] if sources[e] == v else sources[e]
+                    load[w] += extra
+                    if load[w] > capacity[w]:
+                        overloaded.append(w)
+            return overloaded
+
+        # Degrade the impaired edge types; each endpoint reroutes half the shed volume
+        pending: Dict[int, float] = {}
+        for edge_type in impaired:
+            for e in self.edges_by_type.get(edge_type, ()):
+                shed = flow[e] * severity
+                if shed <= 0.0:
+                    continue
+                flow[e] -= shed
+                for v in (sources[e], targets[e]):
+                    load[v] -= shed
+                    pending[v] = pending.get(v, 0.0) + shed / 2
+                    disrupted.add(v)
+
+        failed = []
+        failing = [v for v in seeds if 0 <= v < n]
+        failing = list(dict.fromkeys(failing + [w for w in reroute(pending) if load[w] > capacity[w]]))
+        rounds = 0
+        while failing:
+            rounds += 1
+            for u in failing:
+                alive[u] = 0
+            failed.extend(failing)
+
+            # Every edge of a failed city goes down; survivors reroute its volume
+            pending = {}
+            for u in failing:
+                for e in incident[offsets[u]:offsets[u + 1]]:
+                    if not edge_alive[e]:
+                        continue
+                    edge_alive[e] = 0
+                    v = targets[e] if sources[e] == u else sources[e]
+                    if alive[v]:
+                        load[v] -= flow[e]
+                        pending[v] = pending.get(v, 0.0) + flow[e]
+                        disrupted.add(v)
+                    else:
+                        lost += flow[e]
+            failing = list(dict.fromkeys(w for w in reroute(pending) if alive[w] and load[w] > capacity[w]))
+
+        isolated, new_components = self._split(alive, failed)
+        isolated_set = set(isolated)
+        return {
+            "failed": failed,
+            "isolated": isolated,
+            "disrupted": sorted(v for v in disrupted if alive[v] and v not in isolated_set),
+            "rounds": rounds,
+            "new_components": new_components,
+            "volume_lost": lost,
+        }
+
+    def _split(self, alive: bytearray, failed: List[int]):
+        """Isolated survivors and component count change after removing the failed cities."""
+        neighbors, offsets = self.graph.neighbors, self.graph.offsets
+        component = self.component
+
+        # Surviving neighbors of failed cities, grouped by their original component
+        failed_per_component: Dict[int, int] = {}
+        starts: Dict[int, List[int]] = {}
+        seen = set()
+        for u in failed:
+            failed_per_component[component[u]] = failed_per_component.get(component[u], 0) + 1
+            for w in neighbors[offsets[u]:offsets[u + 1]]:
+                if alive[w] and w not in seen:
+                    seen.add(w)
+                    starts.setdefault(component[w], []).append(w)
+
+        change = 0
+        isolated = []
+        for label, count in failed_per_component.items():
+            if count == self.component_size[label]:
+                change -= 1  # the whole component failed
+            elif label in starts:
+                pieces, remainder = _interleaved_search(neighbors, offsets, alive, starts[label])
+                if remainder is None:
+                    # Every piece was explored; the largest one is the component's main piece
+                    pieces.sort(key=len, reverse=True)
+                    pieces = pieces[1:]
+                change += len(pieces)
+                for piece in pieces:
+                    isolated.extend(piece)
+        return sorted(isolated), change
+
+
+def _interleaved_search(neighbors, offsets, alive: bytearray, starts: List[int]):
+    """Split the survivors reachable from starts (all in one component) into pieces.
+
+    Runs one BFS per start, a node at a time in turn. Searches that reach each
+    other's nodes are merged; a search whose queue runs dry has found a whole
+    piece. Once a single search is left it only continues until it is larger
+    than every finished piece. Returns the finished pieces and the unfinished
+    remainder's members (None if every piece finished); the remainder, if any,
+    is the largest piece.
+    """
+    owner = {}
+    parent = list(range(len(starts)))
+    queues = []
+    members = []
+    for i, s in enumerate(starts):
+        owner[s] = i
+        queues.append(deque([s]))
+        members.append([s])
+    active = set(range(len(starts)))
+    pieces = []
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def expand(i):
+        """Visit the next node of search i; returns the search it ends up part of."""
+        v = queues[i].popleft()
+        for w in neighbors[offsets[v]:offsets[v + 1]]:
+            if not alive[w]:
+                continue
+            j = owner.get(w)
+            if j is None:
+                owner[w] = i
+                queues[i].append(w)
+                members[i].append(w)
+                continue
+            j = find(j)
+            if j != i:
+                # Merge the smaller search into the larger one
+                big, small = (i, j) if len(members[i]) >= len(members[j]) else (j, i)
+                parent[small] = big
+                queues[big].extend(queues[small])
+                members[big].extend(members[small])
+                queues[small] = deque()
+                members[small] = []
+                active.discard(small)
+                i = big
+        if not queues[i]:
+            pieces.append(members[i])
+            active.discard(i)
+        return i
+
+    while len(active) > 1:
+        for i in list(active):
+            if i in active and len(active) > 1:
+                expand(i)
+
+    if not active:
+        return pieces, None
+    last = active.pop()
+    active.add(last)
+    largest = max(map(len, pieces), default=0)
+    while last in active and len(members[last]) <= largest:
+        expand(last)
+    return pieces, members[last] if last in active else None
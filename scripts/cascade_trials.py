@@ -0,0 +1,141 @@
+"""
+Monte Carlo batch runs of cascade scenarios.
+
+Each trial reruns a scenario with its severity and the cities' spare capacity
+drawn at random from the trial's own seed, so any trial can be reproduced alone
+and results do not depend on how trials are spread over workers. Trials run in
+chunks across a process pool (every worker holds its own copy of the
+CascadeEngine), per-trial results are streamed to a JSON Lines file as chunks
+complete, and only the numbers needed for the percentile bands stay in memory.
+"""
+
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from cascade_engine import CascadeEngine
+
+# Percentiles reported for each banded outcome
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Standard deviation of a trial's severity around the template severity
+TRIAL_SEVERITY_SD = 0.1
+
+# Range a trial's spare capacity (cascade tolerance) is drawn from
+TRIAL_TOLERANCE_RANGE = (0.1, 0.4)
+
+# Trials handed to a worker at a time
+TRIAL_CHUNK_SIZE = 64
+
+_engine: Optional[CascadeEngine] = None
+
+
+def _init_worker(engine: CascadeEngine) -> None:
+    global _engine
+    _engine = engine
+
+
+def _run_chunk(scenario_no: int, scenario: Dict, seeds: Sequence[int], first_trial: int) -> List[Dict]:
+    """Run consecutive trials of one scenario in a worker."""
+    records = []
+    for offset, seed in enumerate(seeds):
+        rng = random.Random(seed)
+        severity = min(1.0, max(0.0, rng.gauss(scenario["severity"], TRIAL_SEVERITY_SD)))
+        tolerance = rng.uniform(*TRIAL_TOLERANCE_RANGE)
+        result = _engine.run(scenario["seeds"], scenario["degraded"], severity, tolerance)
+        records.append({
+            "scenario": scenario_no,
+            "trial": first_trial + offset,
+            "seed": seed,
+            "severity": round(severity, 4),
+            "tolerance": round(tolerance, 4),
+            "affected": len(result["failed"]),
+            "isolated": len(result["isolated"]),
+            "disrupted": len(result["disrupted"]),
+            "new_components": max(0, result["new_components"]),
+            "rounds": result["rounds"],
+            "volume_lost": round(result["volume_lost"]),
+        })
+    return records
+
+
+def percentile_bands(values: List[float]) -> Dict[str, float]:
+    """PERCENTILES of values, linearly interpolated between order statistics."""
+    ordered = sorted(values)
+    bands = {}
+    for p in PERCENTILES:
+        if not ordered:
+            bands[f"p{p}"] = 0
+            continue
+        rank = (len(ordered) - 1) * p / 100
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        bands[f"p{p}"] = round(ordered[low] + (ordered[high] - ordered[low]) * (rank - low), 3)
+    return bands
+
+
+def _chunks(scenarios: List[Dict], trial_seeds: List[List[int]]) -> Iterator[Tuple[int, Dict, List[int], int]]:
+    for scenario_no, (scenario, seeds) in enumerate(zip(scenarios, trial_seeds)):
+        for start in range(0, len(seeds), TRIAL_CHUNK_SIZE):
+            yield scenario_no, scenario, seeds[start:start + TRIAL_CHUNK_SIZE], start
+
+
+def run_trials(engine: CascadeEngine, scenarios: List[Dict], trial_seeds: List[List[int]],
+               out_path: Optional[str] = None, workers: Optional[int] = None) -> List[Dict]:
+    """Run len(trial_seeds[i]) trials of every scenario and band the outcomes.
+
+    scenarios are dicts with seeds (city positions), degraded (edge type codes)
+    and severity. Per-trial records are written to out_path (JSON Lines) in
+    trial order when given. Returns, per scenario, the trial count and the
+    percentile bands of isolated cities and volume lost.
+
+    workers defaults to the CPU count, or to 1 when already running inside a
+    worker process (e.g. one region of a generate_data pool), so nested pools
+    do not multiply into CPU count squared processes.
+    """
+    if not workers:
+        workers = 1 if multiprocessing.parent_process() else os.cpu_count() or 1
+    workers = max(1, workers)
+    isolated = [[] for _ in scenarios]
+    volume = [[] for _ in scenarios]
+    out = open(out_path, "w") if out_path else None
+    start = time.perf_counter()
+    try:
+        chunks = list(_chunks(scenarios, trial_seeds))
+        workers = min(workers, max(1, len(chunks)))
+        if workers == 1:
+            _init_worker(engine)
+            results = (_run_chunk(*chunk) for chunk in chunks)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine,))
+            results = pool.map(_run_chunk, *zip(*chunks))
+        try:
+            for records in results:
+                for record in records:
+                    isolated[record["scenario"]].append(record["isolated"])
+                    volume[record["scenario"]].append(record["volume_lost"])
+                    if out:
+                        out.write(json.dumps(record) + "\n")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    finally:
+        if out:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    total = sum(map(len, trial_seeds))
+    if total:
+        print(f"  Cascade trials: {total} in {elapsed:.1f}s "
+              f"({total / elapsed / workers:.1f} trials/s/core on {workers} workers)")
+
+    return [{
+        "trials": len(seeds),
+        "isolated_cities_bands": percentile_bands(isolated[i]),
+        "trade_volume_affected_bands": percentile_bands(volume[i]),
+    } for i, seeds in enumerate(trial_seeds)]
@@ -0,0 +1,524 @@
+"""
+Local HTTP service over the generated datasets.
+
+Loads each region's dataset file once into indexed structures (cities by id
+and sorted by latitude, edges by type and by city, keyed records and mappings)
+and answers queries from them:
+
+    GET /api/regions                              regions, versions, section sizes
+    GET /api/<region>/<section>?offset=&limit=    a page of a list or mapping section,
+                                                  or the whole value of any other section
+    GET /api/<region>/cities?bbox=W,S,E,N&bloc=&ids=a,b
+    GET /api/<region>/edges?bbox=W,S,E,N&edge_type=A,B&city=<id>
+    GET /api/<region>/<section>/<id>              one city, cascade, opportunity signal,
+                                                  FTZ score, trade route or city's metrics
+
+Pages come as {"total", "offset", "limit", "items"}. A bbox selects the cities
+inside it (west > east crosses the antimeridian) and the edges with an end in
+it. GET /data/... serves the published shards (public/data) as static files,
+so the dashboard can load from the service by setting NEXT_PUBLIC_DATA_URL.
+
+Every response carries an ETag; requests with a matching If-None-Match get an
+empty 304. API ETags are derived from the dataset version (see dataset_delta)
+and the query, so a revalidation is answered without building the response.
+Responses of at least GZIP_MIN_BYTES are gzipped for clients that accept it.
+A dataset file that changes on disk is reloaded on the next request.
+
+    python scripts/data_service.py --port 8787
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import time
+import traceback
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from dataset_delta import MAPPING_SECTIONS, dataset_version
+
+LIB_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib"))
+DEFAULT_SHARD_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public",
+                                                  "data"))
+
+# Dataset file of every region the dashboard knows
+DEFAULT_DATASETS = {
+    "west-africa": os.path.join(LIB_DIR, "analysis-data.json"),
+    "europe": os.path.join(LIB_DIR, "europe-data.json"),
+    "world": os.path.join(LIB_DIR, "world-data.json"),
+    "regions": os.path.join(LIB_DIR, "regions-data.json"),
+}
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+
+# Page size when a request gives no limit, and the largest it may ask for
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 5000
+
+# Smallest response body worth gzipping
+GZIP_MIN_BYTES = 1024
+
+# Fast compression: responses are built per request
+GZIP_LEVEL = 6
+
+# Bodies compressed in a worker thread so the event loop keeps serving
+THREAD_GZIP_BYTES = 1 << 18
+
+# Encoded responses kept for repeated queries
+RESPONSE_CACHE_ENTRIES = 256
+
+# Record field looked up by /api/<region>/<section>/<id>
+LOOKUP_FIELDS = {"cities": "id", "cascades": "name", "opportunities": "city_id"}
+
+# Per-city mappings of the metrics section
+CITY_METRICS = ("betweenness", "degree", "closeness")
+
+# Largest request head accepted
+MAX_HEADER_BYTES = 16384
+
+STATUS_TEXT = {200: "OK", 204: "No Content", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    """A request that is answered with an error status and message."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RegionData:
+    """One region's dataset with the indexes its queries use."""
+
+    def __init__(self, name: str, dataset: Dict):
+        self.name = name
+        self.dataset = dataset
+        self.version = dataset_version(dataset)
+        cities = dataset.get("cities", [])
+        edges = dataset.get("edges", [])
+
+        self.city_pos = {city["id"]: i for i, city in enumerate(cities)}
+        # City positions by latitude, for bbox queries
+        self.by_lat = sorted(range(len(cities)), key=lambda i: cities[i]["lat"])
+        self.lats = [cities[i]["lat"] for i in self.by_lat]
+
+        self.edges_by_type: Dict[str, List[int]] = {}
+        self.edges_by_city: Dict[str, List[int]] = {}
+        for i, edge in enumerate(edges):
+            self.edges_by_type.setdefault(edge["edge_type"], []).append(i)
+            self.edges_by_city.setdefault(edge["source"], []).append(i)
+            if edge["target"] != edge["source"]:
+                self.edges_by_city.setdefault(edge["target"], []).append(i)
+
+        self.lookups = {}
+        for section, field in LOOKUP_FIELDS.items():
+            lookup = {}
+            for record in dataset.get(section, []):
+                lookup.setdefault(record[field], record)
+            self.lookups[section] = lookup
+
+    def summary(self) -> Dict:
+        sizes = {section: len(value) for section, value in self.dataset.items() if isinstance(value, (list, dict))}
+        return {"version": self.version, "generated_at": self.dataset.get("generated_at"), "sections": sizes}
+
+    def cities_in(self, west: float, south: float, east: float, north: float) -> List[int]:
+        """Positions (in dataset order) of the cities inside a bbox."""
+        cities = self.dataset["cities"]
+        start, end = bisect_left(self.lats, south), bisect_right(self.lats, north)
+        if west <= east:
+            inside = [i for i in self.by_lat[start:end] if west <= cities[i]["lng"] <= east]
+        else:
+            inside = [i for i in self.by_lat[start:end] if cities[i]["lng"] >= west or cities[i]["lng"] <= east]
+        inside.sort()
+        return inside
+
+    def lookup(self, section: str, key: str) -> Any:
+        if section in self.lookups:
+            found = self.lookups[section].get(key)
+        elif section in MAPPING_SECTIONS:
+            found = self.dataset.get(section, {}).get(key)
+        elif section == "metrics":
+            metrics = self.dataset.get("metrics", {})
+            found = ({name: metrics[name][key] for name in CITY_METRICS if key in metrics.get(name, {})}
+                     if key in self.city_pos else None)
+        else:
+            raise HttpError(404, f"{section} has no id lookups")
+        if found is None:
+            raise HttpError(404, f"no {section} entry {key!r} in {self.name}")
+        return found
+
+
+def _param(query: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _int_param(query: Dict[str, List[str]], name: str, default: int, low: int, high: int) -> int:
+    text = _param(query, name)
+    if text is None:
+        return default
+    try:
+        value = int(text)
+    except ValueError:
+        raise HttpError(400, f"{name} must be an integer") from None
+    if not low <= value <= high:
+        raise HttpError(400, f"{name} must be between {low} and {high}")
+    return value
+
+
+def _list_param(query: Dict[str, List[str]], name: str) -> Optional[List[str]]:
+    text = _param(query, name)
+    return [part for part in text.split(",") if part] if text is not None else None
+
+
+def _bbox(query: Dict[str, List[str]]) -> Optional[Tuple[float, float, float, float]]:
+    parts = _list_param(query, "bbox")
+    if parts is None:
+        return None
+    try:
+        west, south, east, north = map(float, parts)
+    except ValueError:
+        raise HttpError(400, "bbox must be west,south,east,north in degrees") from None
+    if south > north:
+        raise HttpError(400, "bbox south must not exceed north")
+    return west, south, east, north
+
+
+def _page(items: Sequence, query: Dict[str, List[str]]) -> Dict:
+    offset = _int_param(query, "offset", 0, 0, max(0, len(items)))
+    limit = _int_param(query, "limit", DEFAULT_PAGE_SIZE, 0, MAX_PAGE_SIZE)
+    return {"total": len(items), "offset": offset, "limit": limit, "items": list(items[offset:offset + limit])}
+
+
+def query_section(data: RegionData, section: str, query: Dict[str, List[str]]) -> Any:
+    """Response value of GET /api/<region>/<section>."""
+    if section not in data.dataset:
+        raise HttpError(404, f"{data.name} has no section {section!r}")
+    value = data.dataset[section]
+
+    if section == "cities":
+        positions = None
+        bbox = _bbox(query)
+        if bbox is not None:
+            positions = data.cities_in(*bbox)
+        ids = _list_param(query, "ids")
+        if ids is not None:
+            wanted = sorted({data.city_pos[i] for i in ids if i in data.city_pos})
+            positions = wanted if positions is None else sorted(set(positions) & set(wanted))
+        bloc = _param(query, "bloc")
+        if bloc is not None:
+            positions = [i for i in (range(len(value)) if positions is None else positions) if value[i]["bloc"] == bloc]
+        return _page(value if positions is None else [value[i] for i in positions], query)
+
+    if section == "edges":
+        positions = None
+        edge_types = _list_param(query, "edge_type")
+        if edge_types is not None:
+            positions = sorted(i for t in set(edge_types) for i in data.edges_by_type.get(t, []))
+        city = _param(query, "city")
+        if city is not None:
+            touching = data.edges_by_city.get(city, [])
+            positions = touching if positions is None else sorted(set(positions) & set(touching))
+        bbox = _bbox(query)
+        if bbox is not None:
+            cities = data.dataset["cities"]
+            inside = {cities[i]["id"] for i in data.cities_in(*bbox)}
+            touching = sorted({i for city_id in inside for i in data.edges_by_city.get(city_id, [])})
+            positions = touching if positions is None else sorted(set(positions) & set(touching))
+        return _page(value if positions is None else [value[i] for i in positions], query)
+
+    if isinstance(value, list):
+        return _page(value, query)
+    if section in MAPPING_SECTIONS:
+        page = _page(list(value), query)
+        page["items"] = {key: value[key] for key in page["items"]}
+        return page
+    return value
+
+
+class DataService:
+    """Regions loaded from their dataset files, reloaded when a file changes."""
+
+    def __init__(self, datasets: Dict[str, str], shard_dir: Optional[str]):
+        self.datasets = datasets
+        self.shard_dir = os.path.realpath(shard_dir) if shard_dir else None
+        self.regions: Dict[str, Tuple[int, RegionData]] = {}
+        self.locks = {name: asyncio.Lock() for name in datasets}
+        # Encoded bodies by (URL path, ETag, gzipped)
+        self.cache: "OrderedDict[Tuple, bytes]" = OrderedDict()
+
+    async def region(self, name: str) -> RegionData:
+        if name not in self.datasets:
+            raise HttpError(404, f"unknown region {name!r}")
+        path = self.datasets[name]
+        async with self.locks[name]:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                raise HttpError(404, f"no dataset file for {name}") from None
+            loaded = self.regions.get(name)
+            if loaded is None or loaded[0] != mtime:
+                start = time.perf_counter()
+                data = await asyncio.to_thread(_load_region, name, path)
+                self.regions[name] = loaded = (mtime, data)
+                print(f"  Loaded {name}: {len(data.dataset.get('cities', []))} cities, "
+                      f"{len(data.dataset.get('edges', []))} edges in {time.perf_counter() - start:.2f}s "
+                      f"(version {data.version})")
+            return loaded[1]
+
+    def cached(self, key: Tuple, build) -> bytes:
+        body = self.cache.get(key)
+        if body is None:
+            body = build()
+            self.cache[key] = body
+            while len(self.cache) > RESPONSE_CACHE_ENTRIES:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return body
+
+    async def api(self, parts: List[str], query: Dict[str, List[str]], raw_query: str) -> Tuple[str, Any]:
+        """(ETag, value or a callable building it) of an /api request."""
+        if parts == ["regions"]:
+            regions = {name: (await self.region(name)).summary() for name in self.datasets
+                       if os.path.exists(self.datasets[name])}
+            tag = hashlib.sha1(json.dumps([[n, r["version"]] for n, r in regions.items()]).encode()).hexdigest()
+            return f'W/"{tag[:16]}"', lambda: {"regions": regions}
+        if len(parts) not in (2, 3):
+            raise HttpError(404, "expected /api/<region>/<section>[/<id>]")
+        data = await self.region(parts[0])
+        normalized = "&".join(sorted(raw_query.split("&"))) if raw_query else ""
+        digest = hashlib.sha1(f"{'/'.join(parts)}?{normalized}".encode()).hexdigest()[:12]
+        tag = f'W/"{data.version}-{digest}"'
+        if len(parts) == 3:
+            return tag, lambda: data.lookup(parts[1], parts[2])
+        return tag, lambda: query_section(data, parts[1], query)
+
+    def static(self, relative: str) -> Tuple[str, str, str]:
+        """(path, ETag, content type) of a published file under the shard dir."""
+        if self.shard_dir is None:
+            raise HttpError(404, "no shard dir is served")
+        path = os.path.realpath(os.path.join(self.shard_dir, relative))
+        if not path.startswith(self.shard_dir + os.sep) or not os.path.isfile(path):
+            raise HttpError(404, f"no published file {relative!r}")
+        stat = os.stat(path)
+        if path.endswith(".json"):
+            content_type = "application/json"
+        else:
+            # Compressed shards are decompressed by the dashboard itself
+            content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            if path.endswith((".gz", ".br", ".zst")):
+                content_type = "application/octet-stream"
+        return path, f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"', content_type
+
+
+def _load_region(name: str, path: str) -> RegionData:
+    with open(path) as f:
+        return RegionData(name, json.load(f))
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == bare:
+            return True
+    return False
+
+
+def _accepts_gzip(header: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (a q-value that does not parse is ignored)."""
+    for part in (header or "").split(","):
+        coding, *params = part.split(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    pass
+        return True
+    return False
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(431, "request head too large") from None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "malformed request line") from None
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise HttpError(400, "malformed Content-Length") from None
+    if length < 0:
+        raise HttpError(400, "malformed Content-Length")
+    if length:
+        await reader.readexactly(length)
+    return method, target, headers
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+    lines += [f"{key}: {value}" for key, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _common_headers() -> Dict[str, str]:
+    return {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Expose-Headers": "ETag",
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+
+
+async def _respond(service: DataService, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, Dict, bytes]:
+    """Status, headers and body of one request."""
+    if method == "OPTIONS":
+        return 204, {**_common_headers(), "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS",
+                     "Access-Control-Allow-Headers": "If-None-Match", "Content-Length": "0"}, b""
+    if method not in ("GET", "HEAD"):
+        raise HttpError(405, f"{method} is not supported")
+
+    url = urlsplit(target)
+    parts = [unquote(part) for part in url.path.split("/") if part]
+    if parts and parts[0] == "api":
+        etag, build = await service.api(parts[1:], parse_qs(url.query), url.query)
+        content_type = "application/json"
+        load = lambda: json.dumps(build(), separators=(",", ":")).encode()
+    elif parts and parts[0] == "data":
+        path, etag, content_type = service.static("/".join(parts[1:]))
+
+        def load():
+            with open(path, "rb") as f:
+                return f.read()
+    else:
+        raise HttpError(404, "expected /api/... or /data/...")
+
+    response_headers = {**_common_headers(), "ETag": etag}
+    if _etag_matches(headers.get("if-none-match"), etag):
+        return 304, response_headers, b""
+
+    body = service.cached((url.path, etag, False), load)
+    if (len(body) >= GZIP_MIN_BYTES and _accepts_gzip(headers.get("accept-encoding"))
+            and content_type == "application/json"):
+        key = (url.path, etag, True)
+        compressed = service.cache.get(key)
+        if compressed is None:
+            if len(body) >= THREAD_GZIP_BYTES:
+                compressed = await asyncio.to_thread(gzip.compress, body, GZIP_LEVEL)
+            else:
+                compressed = gzip.compress(body, GZIP_LEVEL)
+        body = service.cached(key, lambda: compressed)
+        response_headers["Content-Encoding"] = "gzip"
+    response_headers["Content-Type"] = content_type + ("; charset=utf-8" if content_type.endswith("json") else "")
+    return 200, response_headers, body
+
+
+async def _serve_connection(service: DataService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            request = None
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                status, response_headers, body = await _respond(service, *request)
+            except HttpError as e:
+                status, body = e.status, json.dumps({"error": str(e)}).encode()
+                response_headers = {**_common_headers(), "Content-Type": "application/json; charset=utf-8"}
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception:
+                # A bug must not leave the client without an answer
+                traceback.print_exc()
+                status, body = 500, json.dumps({"error": "internal error"}).encode()
+                response_headers = {**_common_headers(), "Content-Type": "application/json; charset=utf-8"}
+            method, _, headers = request or ("GET", "", {})
+            response_headers["Content-Length"] = str(len(body))
+            # A request that could not be read leaves the stream in an unknown state
+            keep_alive = request is not None and headers.get("connection", "").lower() != "close"
+            if not keep_alive:
+                response_headers["Connection"] = "close"
+            writer.write(_head(status, response_headers))
+            if method != "HEAD" and status != 304:
+                writer.write(body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(datasets: Dict[str, str], shard_dir: Optional[str], host: str = DEFAULT_HOST,
+                port: int = DEFAULT_PORT) -> None:
+    """Load the datasets and serve them until cancelled."""
+    service = DataService(datasets, shard_dir)
+    for name, path in datasets.items():
+        if os.path.exists(path):
+            await service.region(name)
+    server = await asyncio.start_server(lambda r, w: _serve_connection(service, r, w), host, port,
+                                        limit=MAX_HEADER_BYTES)
+    print(f"Serving {', '.join(service.regions)} on http://{host}:{port}/api/regions")
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the generated datasets over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data", action="append", default=[], metavar="REGION=FILE",
+                        help="serve FILE as REGION (repeatable; default: the dashboard's four datasets in lib/)")
+    parser.add_argument("--shard-dir", default=DEFAULT_SHARD_DIR,
+                        help="published shards served under /data (default: public/data)")
+    args = parser.parse_args(argv)
+    datasets = {}
+    for spec in args.data:
+        region, sep, path = spec.partition("=")
+        if not sep or not region or not path:
+            parser.error(f"--data expects REGION=FILE, got {spec!r}")
+        datasets[region] = os.path.abspath(path)
+    args.datasets = datasets or dict(DEFAULT_DATASETS)
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args.datasets, args.shard_dir, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Dictionary-encoded form of dataset sections.
+
+Generated sections repeat a few hundred strings thousands of times: city ids
+in every edge's source and target, edge types, blocs, countries, and edge
+descriptions that are one of a dozen sentences around two city names.
+encode_section replaces every string with its position in a string table
+stored once per section, and lays out lists of records column by column:
+
+    {"format": "dict-v1", "strings": [...], "templates": [...], "data": ...}
+
+where data is the section with these substitutions (objects with a "$" key
+are encodings; no section has "$" keys of its own):
+
+- {"$s": i} is strings[i]; {"$s": [i, ...]} a list of strings.
+- {"$rows": n, "$cols": {field: column}} is a list of n records with the same
+  fields, each column an encoded list of the field's values.
+- {"$b": "0110"} is a list of booleans.
+- {"$f": k, "$v": [n, ...]} is a list of floats with at most k decimals,
+  each n / 10^k (exactly the float the decimal would parse to).
+- {"$ls": [lengths], "$s": [i, ...]} is a list of lists of strings.
+- {"$t": [template ids], "$a": [i, ...]} is a list of strings built from
+  templates: a template is its literal parts, between which its arguments
+  (strings, taken in turn from $a) go. A value matching no template is
+  stored through the template ["", ""], i.e. as its own single argument.
+- {"$keys": keys, "$values": values} is an object with many keys.
+
+decode_section reverses it exactly; lib/codec.ts is the dashboard's decoder.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+DICT_FORMAT = "dict-v1"
+
+# Objects with at least this many keys store their keys as one string list
+KEYED_MIN_ENTRIES = 16
+
+# Most decimals a float column is scaled to integers for
+MAX_FIXED_DECIMALS = 6
+
+_PLACEHOLDER = re.compile(r"\{[A-Za-z_][A-Za-z0-9_]*\}")
+
+
+def template_parts(template: str) -> List[str]:
+    """Literal parts of a str.format template with named fields, e.g. "A {x} B" -> ["A ", " B"]."""
+    return _PLACEHOLDER.split(template)
+
+
+def fixed_point(values: Sequence[float]) -> Optional[Dict]:
+    """{"$f": k, "$v": integers} for the fewest decimals k that represent every value exactly, if any."""
+    for k in range(MAX_FIXED_DECIMALS + 1):
+        scale = 10 ** k
+        scaled = []
+        for v in values:
+            if v != v or v in (float("inf"), float("-inf")):
+                return None
+            n = round(v * scale)
+            if n / scale != v:
+                break
+            scaled.append(n)
+        else:
+            return {"$f": k, "$v": scaled}
+    return None
+
+
+class _Encoder:
+    def __init__(self, templates: Dict[str, Sequence[str]]):
+        self.strings: List[str] = []
+        self.refs: Dict[str, int] = {}
+        self.templates: List[List[str]] = [["", ""]]
+        self.used = set()
+        self.templated_columns: List[Dict] = []
+        self.matchers: Dict[str, List[tuple]] = {}
+        for field, sentences in templates.items():
+            matchers = []
+            for sentence in sentences:
+                parts = template_parts(sentence)
+                self.templates.append(parts)
+                pattern = "(.+)".join(re.escape(part) for part in parts)
+                matchers.append((len(self.templates) - 1, re.compile(pattern, re.DOTALL)))
+            self.matchers[field] = matchers
+
+    def ref(self, text: str) -> int:
+        i = self.refs.get(text)
+        if i is None:
+            i = self.refs[text] = len(self.strings)
+            self.strings.append(text)
+        return i
+
+    def templated(self, values: List[str], matchers: List[tuple]) -> Dict:
+        ids, args = [], []
+        for text in values:
+            for template, pattern in matchers:
+                match = pattern.fullmatch(text)
+                if match:
+                    ids.append(template)
+                    args.extend(self.ref(arg) for arg in match.groups())
+                    break
+            else:
+                ids.append(0)
+                args.append(self.ref(text))
+        self.used.update(ids)
+        column = {"$t": ids, "$a": args}
+        self.templated_columns.append(column)
+        return column
+
+    def column(self, field: str, values: List[Any]) -> Any:
+        if all(isinstance(v, str) for v in values):
+            if field in self.matchers:
+                return self.templated(values, self.matchers[field])
+            return {"$s": [self.ref(v) for v in values]}
+        if all(isinstance(v, bool) for v in values):
+            return {"$b": "".join("1" if v else "0" for v in values)}
+        if all(isinstance(v, float) for v in values):
+            fixed = fixed_point(values)
+            if fixed is not None:
+                return fixed
+        if all(isinstance(v, list) and all(isinstance(s, str) for s in v) for v in values):
+            return {"$ls": [len(v) for v in values], "$s": [self.ref(s) for v in values for s in v]}
+        return self.value(values)
+
+    def value(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return {"$s": self.ref(value)}
+        if isinstance(value, list):
+            if not value:
+                return value
+            if all(isinstance(v, str) for v in value):
+                return {"$s": [self.ref(v) for v in value]}
+            first = value[0]
+            if (len(value) > 1 and isinstance(first, dict) and first
+                    and all(isinstance(v, dict) and list(v) == list(first) for v in value)):
+                return {"$rows": len(value),
+                        "$cols": {field: self.column(field, [v[field] for v in value]) for field in first}}
+            return [self.value(v) for v in value]
+        if isinstance(value, dict):
+            if len(value) >= KEYED_MIN_ENTRIES:
+                return {"$keys": {"$s": [self.ref(k) for k in value]}, "$values": self.value(list(value.values()))}
+            return {key: self.value(v) for key, v in value.items()}
+        return value
+
+
+def encode_section(value: Any, templates: Optional[Dict[str, Sequence[str]]] = None) -> Dict:
+    """Dictionary-encoded form of a section value.
+
+    templates maps record fields (e.g. "description") to the str.format
+    sentences their values are built from.
+    """
+    encoder = _Encoder(templates or {})
+    data = encoder.value(value)
+    # Keep only the templates in use, renumbered in order
+    used = sorted(encoder.used)
+    renumber = {template: i for i, template in enumerate(used)}
+    for column in encoder.templated_columns:
+        column["$t"] = [renumber[t] for t in column["$t"]]
+    return {"format": DICT_FORMAT, "strings": encoder.strings,
+            "templates": [encoder.templates[t] for t in used], "data": data}
+
+
+def decode_section(encoded: Dict) -> Any:
+    """The section value an encode_section result was built from."""
+    if encoded.get("format") != DICT_FORMAT:
+        raise ValueError(f"unknown section format {encoded.get('format')!r}")
+    strings, templates = encoded["strings"], encoded["templates"]
+
+    def decode(value: Any) -> Any:
+        if isinstance(value, list):
+            return [decode(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        if "$rows" in value:
+            columns = {field: decode(column) for field, column in value["$cols"].items()}
+            return [{field: column[i] for field, column in columns.items()} for i in range(value["$rows"])]
+        if "$ls" in value:
+            flat, lists, start = value["$s"], [], 0
+            for length in value["$ls"]:
+                lists.append([strings[i] for i in flat[start:start + length]])
+                start += length
+            return lists
+        if "$s" in value:
+            refs = value["$s"]
+            return strings[refs] if isinstance(refs, int) else [strings[i] for i in refs]
+        if "$t" in value:
+            args, texts = iter(value["$a"]), []
+            for template in value["$t"]:
+                parts = templates[template]
+                pieces = [parts[0]]
+                for part in parts[1:]:
+                    pieces.append(strings[next(args)])
+                    pieces.append(part)
+                texts.append("".join(pieces))
+            return texts
+        if "$b" in value:
+            return [flag == "1" for flag in value["$b"]]
+        if "$f" in value:
+            scale = 10 ** value["$f"]
+            return [n / scale for n in value["$v"]]
+        if "$keys" in value:
+            return dict(zip(decode(value["$keys"]), decode(value["$values"])))
+        return {key: decode(v) for key, v in value.items()}
+
+    return decode(encoded["data"])
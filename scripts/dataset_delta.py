@@ -0,0 +1,252 @@
+"""
+Patches between two generated versions of a dataset.
+
+diff_dataset compares a new dataset against the previous one section by
+section and keeps only what changed, in one of four forms:
+
+- "records": a list of records keyed by some of their fields (cities by id,
+  edges by source, target and edge type). The patch lists the removed keys,
+  the changed fields of surviving records and the added records. A key that
+  occurs more than once (parallel edges of one type) gets "#<n>" appended for
+  its n-th repeat, so repeats are matched in order.
+- "mapping": a dict keyed by city id (trade routes, FTZ impact); removed keys,
+  and the new values of changed and added keys.
+- "nested": a dict of mappings (the metrics), patched per mapping; its
+  other entries are set whole when they change.
+- "set": the whole new value, for every other section and whenever the patch
+  would not be smaller than the section itself.
+
+A records or mapping patch also carries the full key order when the patched
+section would not otherwise come out in the new order (the table indexes
+refer to row positions). apply_patch replays a patch; lib/delta.ts is its
+counterpart in the dashboard.
+
+publish_patch writes the patch between two runs next to a region's shards and
+keeps a version chain in the shard index, so a dashboard holding an older
+version fetches the patches since then instead of the changed sections.
+
+dataset_version names a dataset by a digest of its content without
+generated_at, so a rerun that reproduces the same data keeps its version and
+publishes no patch.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Fields identifying a record, per list section
+RECORD_KEYS = {
+    "cities": ("id",),
+    "edges": ("source", "target", "edge_type"),
+    "cascades": ("name",),
+    "opportunities": ("city_id",),
+}
+
+# Dict sections keyed by city id
+MAPPING_SECTIONS = ("ftz_impact", "trade_routes")
+
+# Dict sections made of several city-keyed mappings
+NESTED_SECTIONS = ("metrics",)
+
+# Sections left out of the version digest
+UNVERSIONED_SECTIONS = ("generated_at",)
+
+# Hex digits of a dataset version
+VERSION_LENGTH = 16
+
+# Patches kept in a region's version chain
+MAX_PATCH_CHAIN = 16
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def dataset_version(dataset: Dict) -> str:
+    """Content digest of a dataset, ignoring generated_at."""
+    digest = hashlib.sha256()
+    for section, value in dataset.items():
+        if section not in UNVERSIONED_SECTIONS:
+            digest.update(_compact([section, value]).encode())
+    return digest.hexdigest()[:VERSION_LENGTH]
+
+
+def record_keys(records: Sequence[Dict], fields: Sequence[str]) -> List[str]:
+    """Key of every record: its key fields joined by "|", "#<n>" added for the n-th repeat."""
+    seen: Dict[str, int] = {}
+    keys = []
+    for record in records:
+        key = "|".join(str(record[field]) for field in fields)
+        repeat = seen.get(key, 0)
+        seen[key] = repeat + 1
+        keys.append(f"{key}#{repeat}" if repeat else key)
+    return keys
+
+
+def _order(patch: Dict, old_keys: Sequence[str], new_keys: List[str]) -> None:
+    """Add the new key order to patch unless survivors-then-added already gives it."""
+    removed = set(patch["removed"])
+    replayed = [key for key in old_keys if key not in removed] + list(patch["added"])
+    if replayed != new_keys:
+        patch["order"] = new_keys
+
+
+def diff_records(old: Sequence[Dict], new: Sequence[Dict], fields: Sequence[str]) -> Dict:
+    """Records patch from old to new."""
+    old_keys, new_keys = record_keys(old, fields), record_keys(new, fields)
+    before = dict(zip(old_keys, old))
+    patch = {"kind": "records", "key": list(fields), "removed": [], "changed": {}, "added": {}}
+    for key, record in zip(new_keys, new):
+        previous = before.pop(key, None)
+        if previous is None:
+            patch["added"][key] = record
+        elif previous.keys() - record.keys():
+            # A field was dropped: replace the record rather than patch it
+            patch["removed"].append(key)
+            patch["added"][key] = record
+        else:
+            changed = {field: value for field, value in record.items()
+                       if field not in previous or previous[field] != value}
+            if changed:
+                patch["changed"][key] = changed
+    patch["removed"] = [key for key in old_keys if key in before] + patch["removed"]
+    _order(patch, old_keys, new_keys)
+    return patch
+
+
+def diff_mapping(old: Dict, new: Dict) -> Dict:
+    """Mapping patch from old to new."""
+    patch = {"kind": "mapping", "removed": [key for key in old if key not in new], "changed": {}, "added": {}}
+    for key, value in new.items():
+        if key not in old:
+            patch["added"][key] = value
+        elif old[key] != value:
+            patch["changed"][key] = value
+    _order(patch, list(old), list(new))
+    return patch
+
+
+def _is_empty(patch: Dict) -> bool:
+    if patch["kind"] == "nested":
+        return not patch["entries"]
+    return not (patch["removed"] or patch["changed"] or patch["added"] or "order" in patch)
+
+
+def diff_section(section: str, old: Any, new: Any) -> Optional[Dict]:
+    """Patch turning old into new (None if they are equal)."""
+    if old == new and _compact(old) == _compact(new):
+        return None
+    patch = None
+    if section in RECORD_KEYS and isinstance(old, list) and isinstance(new, list):
+        fields = RECORD_KEYS[section]
+        if all(field in record for record in old + new for field in fields):
+            patch = diff_records(old, new, fields)
+    elif section in MAPPING_SECTIONS and isinstance(old, dict) and isinstance(new, dict):
+        patch = diff_mapping(old, new)
+    elif section in NESTED_SECTIONS and isinstance(old, dict) and isinstance(new, dict) and list(old) == list(new):
+        entries = {}
+        for key, value in new.items():
+            if isinstance(old[key], dict) and isinstance(value, dict):
+                entry = diff_mapping(old[key], value)
+                if not _is_empty(entry):
+                    entries[key] = entry
+            elif _compact(old[key]) != _compact(value):
+                entries[key] = {"kind": "set", "value": value}
+        patch = {"kind": "nested", "entries": entries}
+    if patch is not None and len(_compact(patch)) < len(_compact(new)):
+        return patch
+    return {"kind": "set", "value": new}
+
+
+def diff_dataset(old: Dict, new: Dict) -> Dict[str, Dict]:
+    """Patches of every section that differs between old and new; sections missing from new are dropped."""
+    patches = {}
+    for section, value in new.items():
+        patch = diff_section(section, old.get(section), value) if section in old else {"kind": "set", "value": value}
+        if patch is not None:
+            patches[section] = patch
+    for section in old:
+        if section not in new:
+            patches[section] = {"kind": "drop"}
+    return patches
+
+
+def _reorder(entries: List[Tuple[str, Any]], order: Optional[List[str]]) -> List[Tuple[str, Any]]:
+    if order is None:
+        return entries
+    lookup = dict(entries)
+    return [(key, lookup[key]) for key in order]
+
+
+def apply_patch(value: Any, patch: Dict) -> Any:
+    """Section value with patch applied (value itself is not modified)."""
+    kind = patch["kind"]
+    if kind == "set":
+        return patch["value"]
+    if kind == "nested":
+        return {key: apply_patch(entry, patch["entries"][key]) if key in patch["entries"] else entry
+                for key, entry in value.items()}
+    removed = set(patch["removed"])
+    changed = patch["changed"]
+    if kind == "records":
+        entries = list(zip(record_keys(value, patch["key"]), value))
+        entries = [(key, {**record, **changed[key]} if key in changed else record)
+                   for key, record in entries if key not in removed]
+    else:
+        entries = [(key, changed.get(key, entry)) for key, entry in value.items() if key not in removed]
+    entries = _reorder(entries + list(patch["added"].items()), patch.get("order"))
+    if kind == "records":
+        return [record for _, record in entries]
+    return dict(entries)
+
+
+def apply_dataset(dataset: Dict, patches: Dict[str, Dict]) -> Dict:
+    """Dataset with a diff_dataset result applied; sections new to the dataset are appended."""
+    result = {}
+    for section, value in dataset.items():
+        patch = patches.get(section)
+        if patch is None:
+            result[section] = value
+        elif patch["kind"] != "drop":
+            result[section] = apply_patch(value, patch)
+    for section, patch in patches.items():
+        if section not in dataset and patch["kind"] == "set":
+            result[section] = patch["value"]
+    return result
+
+
+def publish_patch(shard_dir: str, region: str, old: Optional[Dict], new: Dict,
+                  chain: Optional[Dict] = None) -> Dict:
+    """Publish the patch from old to new and return the region's version chain.
+
+    The patch is written to shard_dir/<region>/patches/<from>-<to>.json; chain
+    is the region's previous {"version", "patches"} (from the shard index) and
+    is extended when it ends at old's version, else restarted. The newest
+    MAX_PATCH_CHAIN patches are kept and older patch files deleted.
+    """
+    version = dataset_version(new)
+    patches = list((chain or {}).get("patches", []))
+    if old is None:
+        patches = []
+    else:
+        base = dataset_version(old)
+        if (chain or {}).get("version") != base:
+            patches = []
+        if base != version:
+            relative = f"{region}/patches/{base}-{version}.json"
+            os.makedirs(os.path.join(shard_dir, region, "patches"), exist_ok=True)
+            body = _compact({"from": base, "to": version, "generated_at": new.get("generated_at"),
+                             "sections": diff_dataset(old, new)})
+            with open(os.path.join(shard_dir, relative), "w") as f:
+                f.write(body)
+            patches.append({"from": base, "to": version, "file": relative, "bytes": len(body.encode())})
+    patches = patches[-MAX_PATCH_CHAIN:]
+
+    patch_dir = os.path.join(shard_dir, region, "patches")
+    if os.path.isdir(patch_dir):
+        kept = {os.path.basename(patch["file"]) for patch in patches}
+        for name in os.listdir(patch_dir):
+            if name not in kept:
+                os.remove(os.path.join(patch_dir, name))
+    return {"version": version, "patches": patches}
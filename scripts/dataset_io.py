@@ -0,0 +1,405 @@
+"""
+Serialization helpers for generated AnalysisData datasets.
+
+write_dataset streams a dataset to disk section by section: large containers
+(and generators, which have no length) are written one entry at a time, and only
+small leaf containers are handed to json.dumps whole. The pretty form is
+byte-identical to json.dump(dataset, f, indent=2); the compact form drops all
+optional whitespace.
+
+write_shard splits a dataset into one compact file per section
+(<shard_dir>/<region>/<section>.json) listed in <shard_dir>/index.json, so the
+dashboard only fetches the sections a page actually shows. Shards can be
+dictionary encoded (see dataset_codec) and gzip, brotli or zstd compressed;
+the index entry of each section records how, and brotli and zstd need the
+optional brotli and zstandard packages.
+
+export_columnar writes the tabular sections as Arrow IPC (or Parquet) files for
+analysts, and ColumnarExport does the same section by section as a dataset
+streams past; both need the optional pyarrow package.
+"""
+
+import gzip
+import json
+import os
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # only needed for columnar exports
+    pa = None
+
+try:
+    import brotli
+except ImportError:  # only needed for brotli-compressed shards
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # only needed for zstd-compressed shards
+    zstandard = None
+
+from dataset_codec import encode_section
+
+# Containers with fewer entries than this are encoded in one json.dumps call
+STREAM_MIN_ITEMS = 256
+
+# Bytes buffered in memory before each write to the output file
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Rows per record batch in columnar exports
+COLUMNAR_BATCH_ROWS = 65536
+
+COLUMNAR_FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+SHARD_ENCODINGS = ("json", "dict")
+
+# File suffix per shard compression
+SHARD_COMPRESSIONS = {"gzip": ".gz", "brotli": ".br", "zstd": ".zst"}
+
+# Compression levels: size matters more than speed for files published once
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+ZSTD_LEVEL = 19
+
+Sections = Union[Dict[str, Any], Iterable[Tuple[str, Any]]]
+
+
+def _encode(value: Any, depth: int, indent: Optional[int]) -> str:
+    """Encode a value in one call, re-indented to sit at the given depth."""
+    if indent is None:
+        return json.dumps(value, separators=(",", ":"))
+    text = json.dumps(value, indent=indent)
+    if depth and "\n" in text:
+        text = text.replace("\n", "\n" + " " * (indent * depth))
+    return text
+
+
+def _stream(write: Callable[[str], Any], value: Any, depth: int, indent: Optional[int]) -> None:
+    """Write value, descending into large or unsized containers entry by entry."""
+    if value is None or isinstance(value, (str, bytes, int, float, bool)):
+        write(_encode(value, depth, indent))
+        return
+
+    is_mapping = isinstance(value, dict)
+    if hasattr(value, "__len__") and len(value) < STREAM_MIN_ITEMS:
+        if not is_mapping and not isinstance(value, (list, tuple)):
+            value = list(value)
+        write(_encode(value, depth, indent))
+        return
+
+    _stream_entries(write, value.items() if is_mapping else value, is_mapping, depth, indent)
+
+
+def _stream_entries(write: Callable[[str], Any], entries: Iterable, is_mapping: bool,
+                    depth: int, indent: Optional[int]) -> None:
+    """Write an object (entries are (key, value) pairs) or array one entry at a time."""
+    if indent is None:
+        inner, outer, key_sep = "", "", ":"
+    else:
+        inner = "\n" + " " * (indent * (depth + 1))
+        outer = "\n" + " " * (indent * depth)
+        key_sep = ": "
+
+    write("{" if is_mapping else "[")
+    empty = True
+    for entry in entries:
+        write(inner if empty else "," + inner)
+        empty = False
+        if is_mapping:
+            key, entry = entry
+            write(json.dumps(str(key)) + key_sep)
+        _stream(write, entry, depth + 1, indent)
+    if not empty:
+        write(outer)
+    write("}" if is_mapping else "]")
+
+
+class _BufferedWriter:
+    """Collects small strings and writes them to the file in WRITE_BUFFER_SIZE chunks."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = []
+        self.buffered = 0
+        self.written = 0
+
+    def write(self, text: str) -> None:
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= WRITE_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        data = "".join(self.buffer).encode()
+        self.f.write(data)
+        self.written += len(data)
+        self.buffer.clear()
+        self.buffered = 0
+
+
+def write_dataset(sections: Sections, filename: str, indent: Optional[int] = 2) -> int:
+    """Stream a dataset to filename as JSON, returning the number of bytes written.
+
+    sections is either a dataset dict or an iterable of (section, value) pairs,
+    e.g. generate_data.iter_dataset, in which case each section is written as soon
+    as it is produced. Values may be dicts, lists or any iterable of records (an
+    EdgeTable or a generator). indent=None writes compact JSON.
+    """
+    if isinstance(sections, dict):
+        sections = sections.items()
+
+    with open(filename, "wb") as f:
+        out = _BufferedWriter(f)
+        _stream_entries(out.write, sections, True, 0, indent)
+        out.flush()
+    return out.written
+
+
+def write_json(value: Any, filename: str, indent: Optional[int] = None) -> int:
+    """Stream a single JSON value to filename, returning the number of bytes written."""
+    with open(filename, "wb") as f:
+        out = _BufferedWriter(f)
+        _stream(out.write, value, 0, indent)
+        out.flush()
+    return out.written
+
+
+def compress(data: bytes, method: str) -> bytes:
+    """data compressed with one of SHARD_COMPRESSIONS."""
+    if method == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if method == "brotli":
+        if brotli is None:
+            raise ImportError("brotli-compressed shards require brotli (pip install brotli)")
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if method == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd-compressed shards require zstandard (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    raise ValueError(f"unknown compression {method!r}")
+
+
+def write_shard(shard_dir: str, region: str, section: str, value: Any, encoding: str = "json",
+                compression: Optional[str] = None, templates: Optional[Dict[str, List[str]]] = None) -> Dict:
+    """Write one section of a region as compact JSON to shard_dir/<region>/<section>.json.
+
+    With encoding="dict" the section is dictionary encoded (templates as for
+    dataset_codec.encode_section) unless that does not make it smaller; with a
+    compression the file gets its suffix. Returns the section's entry for the
+    shard index: file path relative to shard_dir, size in bytes and, when used,
+    the encoding and compression.
+    """
+    os.makedirs(os.path.join(shard_dir, region), exist_ok=True)
+    entry = {}
+    if encoding == "json" and compression is None:
+        relative = f"{region}/{section}.json"
+        size = write_json(value, os.path.join(shard_dir, relative))
+    else:
+        if not isinstance(value, (dict, list, str, int, float, bool, type(None))):
+            value = list(value)  # e.g. an EdgeTable
+        text = json.dumps(value, separators=(",", ":"))
+        if encoding == "dict":
+            packed = json.dumps(encode_section(value, templates), separators=(",", ":"))
+            if len(packed) < len(text):
+                text = packed
+                entry["encoding"] = "dict"
+        data = text.encode()
+        relative = f"{region}/{section}.json"
+        if compression is not None:
+            data = compress(data, compression)
+            relative += SHARD_COMPRESSIONS[compression]
+            entry["compression"] = compression
+        with open(os.path.join(shard_dir, relative), "wb") as f:
+            f.write(data)
+        size = len(data)
+
+    # Drop the section's files from runs with another compression
+    for suffix in ("", *SHARD_COMPRESSIONS.values()):
+        other = f"{region}/{section}.json{suffix}"
+        if other != relative and os.path.exists(os.path.join(shard_dir, other)):
+            os.remove(os.path.join(shard_dir, other))
+    return {"file": relative, "bytes": size, **entry}
+
+
+def shard_dataset(sections: Sections, shard_dir: str, region: str, encoding: str = "json",
+                  compression: Optional[str] = None, templates: Optional[Dict[str, List[str]]] = None) -> Dict:
+    """Shard a whole dataset (dict or (section, value) pairs); returns its index entry.
+
+    encoding, compression and templates are as for write_shard.
+    """
+    if isinstance(sections, dict):
+        sections = sections.items()
+    entry = {"generated_at": None, "sections": {}}
+    for section, value in sections:
+        if section == "generated_at":
+            entry["generated_at"] = value
+        entry["sections"][section] = write_shard(shard_dir, region, section, value, encoding, compression, templates)
+    return entry
+
+
+def load_shard_index(shard_dir: str) -> Dict:
+    """Contents of shard_dir/index.json (no regions if it does not exist yet)."""
+    path = os.path.join(shard_dir, "index.json")
+    if not os.path.exists(path):
+        return {"regions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def update_shard_index(shard_dir: str, entries: Dict[str, Dict]) -> str:
+    """Merge per-region shard entries into shard_dir/index.json, keeping other regions."""
+    path = os.path.join(shard_dir, "index.json")
+    index = load_shard_index(shard_dir)
+    index["regions"].update(entries)
+    index["regions"] = dict(sorted(index["regions"].items()))
+    with open(path, "w") as f:
+        json.dump(index, f, indent=2)
+    return path
+
+
+def _columnar_schemas() -> Dict[str, "pa.Schema"]:
+    """Arrow schemas of the exported tables, mirroring the interfaces in lib/types.ts."""
+    string, float64, int64, bool_ = pa.string(), pa.float64(), pa.int64(), pa.bool_()
+    return {
+        "cities": pa.schema([
+            ("id", string), ("name", string), ("lat", float64), ("lng", float64),
+            ("country", string), ("country_iso3", string), ("bloc", string),
+            ("population", int64), ("is_port", bool_), ("is_capital", bool_),
+            ("gdp_per_capita", float64), ("trade_openness", float64), ("ease_of_business", float64),
+            ("cfa_zone", bool_), ("is_ftz_target", bool_), ("tags", pa.list_(string)),
+        ]),
+        "edges": pa.schema([
+            ("source", string), ("target", string), ("edge_type", string), ("weight", float64),
+            ("volume", int64), ("distance_km", int64), ("is_active", bool_),
+            ("tariff_rate", float64), ("description", string),
+        ]),
+        "metrics": pa.schema([
+            ("city_id", string), ("degree", float64), ("betweenness", float64), ("closeness", float64),
+            ("is_articulation_point", bool_), ("is_ecowas_cut_vertex", bool_),
+        ]),
+        "bridges": pa.schema([("source", string), ("target", string)]),
+        "ftz_impact": pa.schema([
+            ("city_id", string), ("composite", float64), ("connectivity", float64),
+            ("port_access", float64), ("tariff_exposure", float64), ("trade_volume", float64),
+            ("diversification", float64), ("border_proximity", float64), ("stability", float64),
+        ]),
+        "opportunities": pa.schema([
+            ("city_id", string), ("city_name", string), ("country", string), ("signal_type", string),
+            ("gap", float64), ("model_score", float64), ("actual_score", float64), ("confidence", float64),
+        ]),
+    }
+
+
+def _metric_rows(metrics: Dict) -> Iterator[Dict]:
+    """Flatten NetworkMetrics into one row per city."""
+    articulation_points = set(metrics["articulation_points"])
+    cut_vertices = set(metrics["ecowas_cut_vertices"])
+    betweenness, closeness = metrics["betweenness"], metrics["closeness"]
+    for city_id, degree in metrics["degree"].items():
+        yield {
+            "city_id": city_id,
+            "degree": degree,
+            "betweenness": betweenness.get(city_id),
+            "closeness": closeness.get(city_id),
+            "is_articulation_point": city_id in articulation_points,
+            "is_ecowas_cut_vertex": city_id in cut_vertices,
+        }
+
+
+def _write_table(path: str, schema: "pa.Schema", rows: Iterable[Dict], fmt: str) -> int:
+    """Write rows to a columnar file in COLUMNAR_BATCH_ROWS record batches; returns the row count."""
+    rows = iter(rows)
+    count = 0
+    if fmt == "arrow":
+        sink = pa.OSFile(path, "wb")
+        writer = pa.ipc.new_file(sink, schema)
+    else:
+        import pyarrow.parquet as pq
+        sink = None
+        writer = pq.ParquetWriter(path, schema)
+    try:
+        while True:
+            chunk = list(islice(rows, COLUMNAR_BATCH_ROWS))
+            if not chunk:
+                break
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    finally:
+        writer.close()
+        if sink is not None:
+            sink.close()
+    return count
+
+
+class ColumnarExport:
+    """Columnar export of a dataset fed one section at a time.
+
+    add writes a section's tables as soon as it is given, so a generator can
+    export each section as it streams to the JSON writer and drop it afterwards;
+    between sections only the manifest fields (generated_at, summary,
+    component_count) are kept. close writes manifest.json and returns its path.
+    """
+
+    def __init__(self, out_dir: str, fmt: str = "arrow"):
+        if pa is None:
+            raise RuntimeError("columnar export needs pyarrow (pip install pyarrow)")
+        if fmt not in COLUMNAR_FORMATS:
+            raise ValueError(f"unknown columnar format {fmt!r}")
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.schemas = _columnar_schemas()
+        self.tables: Dict[str, Dict] = {}
+        self.manifest = {
+            "generated_at": None,
+            "format": "arrow-ipc" if fmt == "arrow" else "parquet",
+            "summary": None,
+            "component_count": None,
+            "tables": self.tables,
+        }
+
+    def add(self, section: str, value: Any) -> None:
+        """Export one dataset section: write its tables or keep its manifest field."""
+        if section in ("generated_at", "summary"):
+            self.manifest[section] = value
+        elif section in ("cities", "edges", "opportunities"):
+            self._write(section, value)
+        elif section == "metrics":
+            self.manifest["component_count"] = value["component_count"]
+            self._write("metrics", _metric_rows(value))
+            self._write("bridges", ({"source": s, "target": t} for s, t in value["bridges"]))
+        elif section == "ftz_impact":
+            self._write(section, ({"city_id": city_id, **scores} for city_id, scores in value.items()))
+
+    def _write(self, name: str, rows: Iterable[Dict]) -> None:
+        filename = name + COLUMNAR_FORMATS[self.fmt]
+        schema = self.schemas[name]
+        self.tables[name] = {
+            "file": filename,
+            "rows": _write_table(os.path.join(self.out_dir, filename), schema, rows, self.fmt),
+            "columns": {field.name: str(field.type) for field in schema},
+        }
+
+    def close(self) -> str:
+        """Write manifest.json; returns its path."""
+        manifest_path = os.path.join(self.out_dir, "manifest.json")
+        with open(manifest_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        return manifest_path
+
+
+def export_columnar(dataset: Dict, out_dir: str, fmt: str = "arrow") -> str:
+    """Export the tabular sections of a dataset as columnar files plus manifest.json.
+
+    Writes cities, edges, opportunities, ftz_impact and the per-city metrics (with
+    bridges as their own table) to out_dir, one file per table. Arrow IPC files are
+    uncompressed so pyarrow.memory_map + pyarrow.ipc.open_file reads them zero-copy.
+    Returns the manifest path.
+    """
+    export = ColumnarExport(out_dir, fmt)
+    for section, value in dataset.items():
+        export.add(section, value)
+    return export.close()
@@ -0,0 +1,739 @@
+"""
+Check generated datasets against the dashboard's types.
+
+The schema is read from the interfaces in lib/types.ts, so the check follows
+the dashboard's types rather than a copy of them: AnalysisData names every
+section and its type. validate_file streams a dataset file section by section
+and never holds more than one record (a city, an edge, a route) plus a read
+buffer: arrays and records are walked entry by entry, arrays of numbers are
+parsed in batches, and only their elements are decoded whole.
+
+Besides types, it checks that every city id a section refers to (CITY_REFERENCES)
+is the id of a city and that the metrics' per-city mappings (CITY_COVERAGE)
+cover every city. City ids are kept as a sorted array of 64-bit string hashes,
+8 bytes per city; references read before the cities are collected the same way
+and checked at the end. Violations are counted per schema path and only the
+first max_reported are kept as messages.
+
+    python scripts/dataset_schema.py lib/world-data.json lib/europe-data.json
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_TYPES_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib",
+                                                   "types.ts"))
+
+# Interface a dataset file is checked against
+ROOT_TYPE = "AnalysisData"
+
+# Schema paths whose strings (or, for "{}" paths, the mapping keys) are city ids;
+# "[]" steps into an array's elements and "{}" into a mapping's entries
+CITY_REFERENCES = (
+    "edges[].source",
+    "edges[].target",
+    "metrics.betweenness{}",
+    "metrics.degree{}",
+    "metrics.closeness{}",
+    "metrics.articulation_points[]",
+    "metrics.bridges[][]",
+    "metrics.ecowas_cut_vertices[]",
+    "ftz_impact{}",
+    "trade_routes{}",
+    "trade_routes{}.shortest_path[]",
+    "trade_routes{}.min_cut_nodes[]",
+    "route_index.nodes[]",
+    "route_index.landmarks[]",
+    "cascades[].affected_cities[]",
+    "cascades[].isolated_cities[]",
+    "cascades[].trade_disrupted_cities[]",
+    "opportunities[].city_id",
+)
+
+# Mappings whose keys must include every city id
+CITY_COVERAGE = ("metrics.betweenness{}", "metrics.degree{}", "metrics.closeness{}")
+
+# Schema path of the city ids
+CITY_IDS = "cities[].id"
+
+# Violation messages kept per file
+MAX_REPORTED = 20
+
+# Characters read from the file at a time
+READ_SIZE = 1 << 20
+
+# Characters that may continue a JSON number
+_NUMBER_CHARS = "0123456789+-.eE"
+
+_TOKEN = re.compile(r'\s*(?:(?P<str>"[^"]*")|(?P<word>[A-Za-z_][A-Za-z0-9_]*)|(?P<punct>[\[\]<>{}|;:?,()]))')
+
+
+class SchemaError(ValueError):
+    """Raised for types.ts constructs the schema reader does not support."""
+
+
+# ── Schema from lib/types.ts ──
+
+def _tokens(text: str) -> List[str]:
+    tokens, pos = [], 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match:
+            raise SchemaError(f"unexpected {text[pos:pos + 20]!r}")
+        tokens.append(match.group(match.lastgroup))
+        pos = match.end()
+    return tokens
+
+
+class _TypeParser:
+    """Recursive descent over the tokens of a type expression or interface body."""
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise SchemaError(f"expected {expected or 'a token'}, got {token!r}")
+        self.pos += 1
+        return token
+
+    def fields(self, end: Optional[str]) -> Tuple:
+        fields = {}
+        while self.peek() != end:
+            name = self.take()
+            optional = self.peek() == "?"
+            if optional:
+                self.take()
+            self.take(":")
+            fields[name] = (self.union(), optional)
+            if self.peek() in (";", ","):
+                self.take()
+        return ("object", fields)
+
+    def union(self) -> Tuple:
+        if self.peek() == "|":
+            self.take()
+        options = [self.postfix()]
+        while self.peek() == "|":
+            self.take()
+            options.append(self.postfix())
+        return options[0] if len(options) == 1 else ("union", options)
+
+    def postfix(self) -> Tuple:
+        t = self.primary()
+        while self.peek() == "[" and self.tokens[self.pos + 1:self.pos + 2] == ["]"]:
+            self.pos += 2
+            t = ("array", t)
+        return t
+
+    def primary(self) -> Tuple:
+        token = self.take()
+        if token.startswith('"'):
+            return ("literal", json.loads(token))
+        if token == "(":
+            t = self.union()
+            self.take(")")
+            return t
+        if token == "[":
+            items = [self.union()]
+            while self.peek() == ",":
+                self.take()
+                items.append(self.union())
+            self.take("]")
+            return ("tuple", items)
+        if token == "{":
+            t = self.fields("}")
+            self.take("}")
+            return t
+        if token == "Record":
+            self.take("<")
+            if self.take() != "string":
+                raise SchemaError("only Record<string, T> is supported")
+            self.take(",")
+            t = self.union()
+            self.take(">")
+            return ("record", t)
+        if token in ("string", "number", "boolean", "null", "unknown"):
+            return (token,)
+        return ("ref", token)
+
+
+def _strip_comments(text: str) -> str:
+    return re.sub(r"//[^\n]*", "", text)
+
+
+def load_schema(types_path: str = DEFAULT_TYPES_PATH) -> Dict[str, Tuple]:
+    """The interfaces of a types.ts file by name, as nested type tuples.
+
+    Interfaces whose bodies use unsupported syntax are left out; referring to
+    one while validating raises SchemaError.
+    """
+    with open(types_path) as f:
+        text = _strip_comments(f.read())
+    schema = {}
+    for match in re.finditer(r"export\s+interface\s+(\w+)\s*\{", text):
+        depth, pos = 1, match.end()
+        while depth and pos < len(text):
+            depth += {"{": 1, "}": -1}.get(text[pos], 0)
+            pos += 1
+        try:
+            parser = _TypeParser(_tokens(text[match.end():pos - 1]))
+            schema[match.group(1)] = parser.fields(None)
+        except SchemaError:
+            continue
+    return schema
+
+
+def _describe(t: Tuple) -> str:
+    kind = t[0]
+    if kind == "literal":
+        return json.dumps(t[1])
+    if kind == "ref":
+        return t[1]
+    if kind == "array":
+        return _describe(t[1]) + "[]"
+    if kind == "tuple":
+        return "[" + ", ".join(map(_describe, t[1])) + "]"
+    if kind == "record":
+        return f"Record<string, {_describe(t[1])}>"
+    if kind == "union":
+        return " | ".join(map(_describe, t[1]))
+    if kind == "object":
+        return "object"
+    return kind
+
+
+def _kind(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number" if math.isfinite(value) else repr(value)
+    return {str: "string", list: "array", dict: "object"}.get(type(value), type(value).__name__)
+
+
+def _step(parent: str, step: Any) -> str:
+    return f"{parent}[{step}]" if isinstance(step, int) else f"{parent}.{step}" if parent else str(step)
+
+
+# ── Compact id sets ──
+
+class IdSet:
+    """Set of strings kept as a sorted array of 64-bit hashes (valid within one process)."""
+
+    def __init__(self):
+        self.hashes = array("q")
+        self.frozen = True
+
+    def add(self, text: str) -> None:
+        self.hashes.append(hash(text))
+        self.frozen = False
+
+    def freeze(self) -> None:
+        if not self.frozen:
+            self.hashes = array("q", sorted(self.hashes))
+            self.frozen = True
+
+    def __contains__(self, text: str) -> bool:
+        h = hash(text)
+        i = bisect_left(self.hashes, h)
+        return i < len(self.hashes) and self.hashes[i] == h
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def duplicates(self) -> int:
+        """Entries equal to the one before them (after freeze)."""
+        hashes = self.hashes
+        return sum(1 for i in range(1, len(hashes)) if hashes[i] == hashes[i - 1])
+
+    def missing_from(self, other: "IdSet") -> int:
+        """Entries (with repeats) of this set that other lacks (both frozen)."""
+        mine, theirs = self.hashes, other.hashes
+        missing, j = 0, 0
+        for h in mine:
+            while j < len(theirs) and theirs[j] < h:
+                j += 1
+            if j == len(theirs) or theirs[j] != h:
+                missing += 1
+        return missing
+
+
+# ── Streaming JSON reader ──
+
+class _Reader:
+    """Reads one JSON text from a file a value, an array entry or an object entry at a time."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.consumed = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self, size: int = READ_SIZE) -> bool:
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.consumed += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"malformed JSON near character {self.consumed + self.pos}: {message}")
+
+    def peek(self) -> str:
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self.fill():
+                return ""
+
+    def take(self, expected: str) -> None:
+        if self.peek() != expected:
+            raise self.error(f"expected {expected!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # Read on (in growing chunks) unless the value is complete and still fails
+                if self.eof or not self.fill(max(READ_SIZE, len(self.buf) - self.pos)):
+                    raise self.error(e.msg) from None
+                continue
+            # A number cut by the chunk boundary decodes to its head, leaving at most
+            # "", ".", "e" or "e-" behind; read on until something else follows it
+            if (not self.eof and len(self.buf) - end <= 2 and isinstance(value, (int, float))
+                    and not isinstance(value, bool) and not self.buf[end:].strip(_NUMBER_CHARS)
+                    and self.fill(READ_SIZE)):
+                continue
+            self.pos = end
+            return value
+
+    def entries(self, is_mapping: bool):
+        """Keys (objects) or positions (arrays) of the container at the read position; its values are read by the caller."""
+        self.take("{" if is_mapping else "[")
+        close = "}" if is_mapping else "]"
+        if self.peek() == close:
+            self.pos += 1
+            return
+        i = 0
+        while True:
+            if is_mapping:
+                key = self.value()
+                if not isinstance(key, str):
+                    raise self.error("expected an object key")
+                self.take(":")
+                yield key
+            else:
+                yield i
+            i += 1
+            token = self.peek()
+            if token == close:
+                self.pos += 1
+                return
+            if token != ",":
+                raise self.error(f"expected ',' or {close!r}")
+            self.pos += 1
+
+    def scalar_batches(self):
+        """Entries of the array at the read position, in lists, for arrays of numbers, booleans and nulls.
+
+        Stops early (leaving the read position at the next entry) if a batch does
+        not parse, e.g. because the array holds a string; the caller reads on
+        entry by entry.
+        """
+        self.take("[")
+        while True:
+            end = self.buf.find("]", self.pos)
+            cut = end if end >= 0 else self.buf.rfind(",", self.pos)
+            if cut < 0:
+                if self.fill():
+                    continue
+                return False
+            text = self.buf[self.pos:cut]
+            if '"' in text or "{" in text or "[" in text:
+                return False
+            try:
+                batch = json.loads("[" + text + "]")
+            except json.JSONDecodeError:
+                return False
+            yield batch
+            self.pos = cut + 1
+            if end >= 0:
+                return True
+
+
+# ── Validation ──
+
+class Violations:
+    """Counts of violations per schema path and the first max_reported messages."""
+
+    def __init__(self, max_reported: int = MAX_REPORTED):
+        self.max_reported = max_reported
+        self.count = 0
+        self.by_path: Dict[str, int] = {}
+        self.messages: List[str] = []
+
+    def add(self, path: str, location: str, message: str) -> None:
+        self.count += 1
+        self.by_path[path] = self.by_path.get(path, 0) + 1
+        if len(self.messages) < self.max_reported:
+            self.messages.append(f"{location}: {message}" if location else message)
+
+
+class _Validator:
+    def __init__(self, schema: Dict[str, Tuple], violations: Violations):
+        self.schema = schema
+        self.violations = violations
+        self.cities = IdSet()
+        self.cities_done = False
+        self.pending: Dict[str, IdSet] = {}
+        self.coverage: Dict[str, IdSet] = {}
+        self.checkers: Dict[Tuple[int, str], Callable] = {}
+        self.matchers: Dict[int, Callable[[Any], bool]] = {}
+
+    def resolve(self, t: Tuple) -> Tuple:
+        while t[0] == "ref":
+            if t[1] not in self.schema:
+                raise SchemaError(f"unknown or unsupported type {t[1]}")
+            t = self.schema[t[1]]
+        return t
+
+    # Reference bookkeeping
+
+    def mapping(self, key_path: str) -> bool:
+        """Note that a mapping at key_path was read; tells whether its keys are city ids."""
+        if key_path in CITY_COVERAGE:
+            self.coverage.setdefault(key_path, IdSet())
+        return key_path in CITY_REFERENCES
+
+    def reference(self, path: str, city_id: str, location: str) -> None:
+        if path in self.coverage:
+            self.coverage[path].add(city_id)
+        if self.cities_done:
+            if city_id not in self.cities:
+                self.violations.add(path, location, f"unknown city id {city_id!r}")
+        else:
+            self.pending.setdefault(path, IdSet()).add(city_id)
+
+    def finish_cities(self) -> None:
+        self.cities.freeze()
+        self.cities_done = True
+        duplicates = self.cities.duplicates()
+        if duplicates:
+            self.violations.add(CITY_IDS, "cities", f"{duplicates} duplicate city ids")
+
+    def finish(self) -> None:
+        if not self.cities_done:
+            return
+        for path, ids in self.pending.items():
+            ids.freeze()
+            unknown = ids.missing_from(self.cities)
+            if unknown:
+                self.violations.add(path, path, f"{unknown} references to unknown city ids")
+        for path, ids in self.coverage.items():
+            ids.freeze()
+            missing = self.cities.missing_from(ids)
+            if missing:
+                self.violations.add(path, path.rstrip("{}"), f"{missing} of {len(self.cities)} cities missing")
+
+    # Checks of decoded values
+
+    def matcher(self, t: Tuple) -> Callable[[Any], bool]:
+        """Predicate telling whether a decoded value has type t (used to pick union options)."""
+        key = id(t)
+        if key not in self.matchers:
+            self.matchers[key] = lambda value: True  # placeholder for recursive types
+            self.matchers[key] = self._matcher(self.resolve(t))
+        return self.matchers[key]
+
+    def _matcher(self, t: Tuple) -> Callable[[Any], bool]:
+        kind = t[0]
+        if kind == "string":
+            return lambda v: type(v) is str
+        if kind == "number":
+            return lambda v: type(v) is int or (type(v) is float and math.isfinite(v))
+        if kind == "boolean":
+            return lambda v: type(v) is bool
+        if kind == "null":
+            return lambda v: v is None
+        if kind == "unknown":
+            return lambda v: True
+        if kind == "literal":
+            literal = t[1]
+            return lambda v: type(v) is type(literal) and v == literal
+        if kind == "union":
+            options = [self.matcher(option) for option in t[1]]
+            return lambda v: any(match(v) for match in options)
+        if kind == "array":
+            item = self.matcher(t[1])
+            return lambda v: type(v) is list and all(map(item, v))
+        if kind == "tuple":
+            items = [self.matcher(item) for item in t[1]]
+            return lambda v: type(v) is list and len(v) == len(items) and all(m(x) for m, x in zip(items, v))
+        if kind == "record":
+            item = self.matcher(t[1])
+            return lambda v: type(v) is dict and all(map(item, v.values()))
+        fields = {name: (self.matcher(ft), optional) for name, (ft, optional) in t[1].items()}
+        return lambda v: (type(v) is dict and all(name in fields for name in v)
+                          and all(match(v[name]) if name in v else optional
+                                  for name, (match, optional) in fields.items()))
+
+    def checker(self, t: Tuple, path: str) -> Callable[[Any, str, Any], None]:
+        """check(value, parent location, step) reporting every violation of t in value at path."""
+        key = (id(t), path)
+        if key not in self.checkers:
+            self.checkers[key] = lambda value, parent, step: None  # placeholder for recursive types
+            self.checkers[key] = self._checker(self.resolve(t), path)
+        return self.checkers[key]
+
+    def _checker(self, t: Tuple, path: str) -> Callable[[Any, str, Any], None]:
+        kind = t[0]
+        add = self.violations.add
+        expected = _describe(t)
+        if kind == "string" and (path in CITY_REFERENCES or path == CITY_IDS):
+            reference = self.reference
+            cities = self.cities
+
+            def check(value, parent, step):
+                if type(value) is not str:
+                    add(path, _step(parent, step), f"expected string, got {_kind(value)}")
+                elif path == CITY_IDS:
+                    cities.add(value)
+                else:
+                    reference(path, value, _step(parent, step))
+            return check
+        if kind in ("string", "number", "boolean", "null", "unknown", "literal"):
+            match = self.matcher(t)
+
+            def check(value, parent, step):
+                if not match(value):
+                    add(path, _step(parent, step), f"expected {expected}, got {_kind(value)}")
+            return check
+        if kind == "union":
+            options = [(self.matcher(option), self.checker(option, path)) for option in t[1]]
+
+            def check(value, parent, step):
+                for match, option in options:
+                    if match(value):
+                        option(value, parent, step)
+                        return
+                add(path, _step(parent, step), f"expected {expected}, got {_kind(value)}")
+            return check
+        if kind in ("array", "tuple"):
+            items = None if kind == "array" else [self.checker(item, path + "[]") for item in t[1]]
+            item = self.checker(t[1], path + "[]") if kind == "array" else None
+
+            def check(value, parent, step):
+                if type(value) is not list:
+                    add(path, _step(parent, step), f"expected {expected}, got {_kind(value)}")
+                    return
+                location = _step(parent, step)
+                if items is None:
+                    for i, entry in enumerate(value):
+                        item(entry, location, i)
+                elif len(value) != len(items):
+                    add(path, location, f"expected {len(items)} entries, got {len(value)}")
+                else:
+                    for i, (entry, item_check) in enumerate(zip(value, items)):
+                        item_check(entry, location, i)
+            return check
+        if kind == "record":
+            item = self.checker(t[1], path + "{}")
+            key_path = path + "{}"
+            reference = self.reference
+            mapping = self.mapping
+
+            def check(value, parent, step):
+                if type(value) is not dict:
+                    add(path, _step(parent, step), f"expected {expected}, got {_kind(value)}")
+                    return
+                location = _step(parent, step)
+                keyed = mapping(key_path)
+                for key, entry in value.items():
+                    if keyed:
+                        reference(key_path, key, location)
+                    item(entry, location, key)
+            return check
+        fields = {name: (self.checker(ft, f"{path}.{name}" if path else name), optional)
+                  for name, (ft, optional) in t[1].items()}
+
+        def check(value, parent, step):
+            if type(value) is not dict:
+                add(path, _step(parent, step), f"expected {expected}, got {_kind(value)}")
+                return
+            location = None
+            for name, (field, optional) in fields.items():
+                if name in value:
+                    if location is None:
+                        location = _step(parent, step)
+                    field(value[name], location, name)
+                elif not optional:
+                    add(path, _step(parent, step), f"missing field {name!r}")
+            for name in value:
+                if name not in fields:
+                    add(path, _step(parent, step), f"unexpected field {name!r}")
+        return check
+
+    # Streaming walk of the file
+
+    def walk(self, reader: _Reader, t: Tuple, path: str, parent: str, step: Any, depth: int) -> None:
+        """Check the value at the read position, streaming arrays, mappings and the top two object levels."""
+        t = self.resolve(t)
+        kind = t[0]
+        token = reader.peek()
+        streamable = (kind == "array" and token == "[") or (kind == "record" and token == "{") or \
+                     (kind == "object" and token == "{" and depth <= 1)
+        if not streamable:
+            self.checker(t, path)(reader.value(), parent, step)
+            return
+
+        location = _step(parent, step)
+        if kind == "array":
+            item_type = self.resolve(t[1])
+            item_path = path + "[]"
+            batched = item_type[0] in ("number", "boolean", "null") or (
+                item_type[0] == "union" and all(self.resolve(o)[0] in ("number", "boolean", "null")
+                                                for o in item_type[1]))
+            i = 0
+            if batched:
+                item = self.checker(item_type, item_path)
+                batches = reader.scalar_batches()
+                try:
+                    while True:
+                        for entry in next(batches):
+                            item(entry, location, i)
+                            i += 1
+                except StopIteration as stop:
+                    if stop.value:
+                        return
+                # Not a plain scalar array after all: read the rest entry by entry
+                while True:
+                    if reader.peek() == "]":
+                        reader.pos += 1
+                        return
+                    self.walk(reader, item_type, item_path, location, i, depth + 1)
+                    i += 1
+                    token = reader.peek()
+                    if token == ",":
+                        reader.pos += 1
+                    elif token != "]":
+                        raise reader.error("expected ',' or ']'")
+            for i in reader.entries(False):
+                self.walk(reader, item_type, item_path, location, i, depth + 1)
+            return
+
+        if kind == "record":
+            key_path = path + "{}"
+            keyed = self.mapping(key_path)
+            for key in reader.entries(True):
+                if keyed:
+                    self.reference(key_path, key, location)
+                self.walk(reader, t[1], key_path, location, key, depth + 1)
+            return
+
+        fields = t[1]
+        seen = set()
+        for name in reader.entries(True):
+            field_path = f"{path}.{name}" if path else name
+            if name not in fields:
+                self.violations.add(path or name, location, f"unexpected {'field' if path else 'section'} {name!r}")
+                reader.value()
+                continue
+            seen.add(name)
+            self.walk(reader, fields[name][0], field_path, location, name, depth + 1)
+            if field_path == "cities":
+                self.finish_cities()
+        for name, (_, optional) in fields.items():
+            if name not in seen and not optional:
+                self.violations.add(path or name, location, f"missing {'field' if path else 'section'} {name!r}")
+
+
+def validate_file(filename: str, schema: Optional[Dict[str, Tuple]] = None,
+                  max_reported: int = MAX_REPORTED) -> Violations:
+    """Violations of a dataset file against ROOT_TYPE (schema defaults to lib/types.ts)."""
+    with open(filename, encoding="utf-8") as f:
+        return validate_stream(f, schema, max_reported)
+
+
+def validate_stream(f, schema: Optional[Dict[str, Tuple]] = None,
+                    max_reported: int = MAX_REPORTED) -> Violations:
+    """Violations of the dataset read from the text file object f (see validate_file)."""
+    schema = schema if schema is not None else load_schema()
+    violations = Violations(max_reported)
+    validator = _Validator(schema, violations)
+    reader = _Reader(f)
+    try:
+        validator.walk(reader, ("ref", ROOT_TYPE), "", "", "", 0)
+        if reader.peek():
+            raise reader.error("trailing data")
+    except ValueError as e:
+        if isinstance(e, SchemaError):
+            raise
+        violations.add("", "", str(e))
+        return violations
+    validator.finish()
+    return violations
+
+
+def format_violations(filename: str, violations: Violations) -> str:
+    """A report of violations: counts per schema path, then the kept messages."""
+    lines = [f"{filename}: {violations.count} schema violations"]
+    for path, count in sorted(violations.by_path.items(), key=lambda item: -item[1]):
+        lines.append(f"  {count:>8}  {path or '(file)'}")
+    lines.extend(f"  {message}" for message in violations.messages)
+    if violations.count > len(violations.messages):
+        lines.append(f"  ... {violations.count - len(violations.messages)} more")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check generated datasets against lib/types.ts.")
+    parser.add_argument("files", nargs="+", help="dataset JSON files (e.g. lib/world-data.json)")
+    parser.add_argument("--types", default=DEFAULT_TYPES_PATH, help="TypeScript types file (default: lib/types.ts)")
+    parser.add_argument("--max-reported", type=int, default=MAX_REPORTED, metavar="N",
+                        help=f"violation messages shown per file (default: {MAX_REPORTED})")
+    args = parser.parse_args(argv)
+
+    schema = load_schema(args.types)
+    failed = False
+    for filename in args.files:
+        start = time.perf_counter()
+        violations = validate_file(filename, schema, args.max_reported)
+        elapsed = time.perf_counter() - start
+        if violations.count:
+            failed = True
+            print(format_violations(filename, violations))
+        else:
+            print(f"{filename}: ok ({os.path.getsize(filename) / 1e6:.1f} MB in {elapsed:.2f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
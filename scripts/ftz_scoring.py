@@ -0,0 +1,189 @@
+"""
+FTZ impact scores derived from the generated network.
+
+Every component is computed for all cities at once, as one column each, from
+data the dataset already has:
+
+- connectivity: mean of the city's degree, betweenness and closeness
+  centralities, each scaled to [0, 1] by its maximum over all cities.
+- port_access: 1 for ports, else PORT_NEIGHBOR_ACCESS times the share of its
+  network neighbors that are ports.
+- tariff_exposure: volume-weighted mean tariff_rate of its active edges,
+  scaled by the highest such mean.
+- trade_volume: log of the summed volume of its active edges, scaled by the
+  largest.
+- diversification: share of the region's edge types among its active edges.
+- border_proximity: exp(-d / BORDER_DECAY_KM), d the great-circle distance to
+  the nearest city of another bloc (0 if there is none).
+- stability: ease_of_business / 100.
+
+The composite is their weighted sum under FTZ_WEIGHTS. sweep_weights re-ranks
+every city under many weight vectors drawn around FTZ_WEIGHTS: all scores
+come out of one matrix product of the weight vectors with the component
+matrix, restricted to the cities that can reach the top under some weights.
+"""
+
+import heapq
+import math
+import random
+from operator import mul
+from typing import Dict, List, Sequence, Tuple
+
+from geodesy import PointTree, UnitVectors, chord_to_km
+
+# Component weights of the composite score (they sum to 1)
+FTZ_WEIGHTS = {
+    "connectivity": 0.2,
+    "port_access": 0.15,
+    "tariff_exposure": 0.15,
+    "trade_volume": 0.15,
+    "diversification": 0.1,
+    "border_proximity": 0.1,
+    "stability": 0.15,
+}
+
+COMPONENTS = tuple(FTZ_WEIGHTS)
+
+# Port access of a city all of whose neighbors are ports
+PORT_NEIGHBOR_ACCESS = 0.7
+
+# Distance to a foreign-bloc city at which border proximity falls to 1/e
+BORDER_DECAY_KM = 250.0
+
+# Dirichlet concentration of the sweep's weight vectors around FTZ_WEIGHTS
+# (higher keeps them closer to the defaults)
+SWEEP_CONCENTRATION = 50.0
+
+# Cities a sweep ranks in every weight vector
+SWEEP_TOP_K = 20
+
+
+def _scaled(values: Sequence[float]) -> List[float]:
+    top = max(values, default=0.0)
+    return [v / top for v in values] if top > 0 else [0.0] * len(values)
+
+
+def border_distances(cities: Sequence[Dict]) -> List[float]:
+    """Great-circle km from every city to the nearest city of another bloc (inf if none).
+
+    Cities are visited in the order of a k-d tree over all of them, so consecutive
+    queries lie close together and each starts from the distance to the previous
+    answer (for its bloc) as its bound, which prunes every tree from the first node.
+    """
+    vectors = UnitVectors([c["lat"] for c in cities], [c["lng"] for c in cities])
+    points = vectors.points
+    members: Dict[str, List[int]] = {}
+    for v, city in enumerate(cities):
+        members.setdefault(city["bloc"], []).append(v)
+    trees = {bloc: PointTree(vectors, group) for bloc, group in members.items()}
+    foreign = {bloc: [(other, tree) for other, tree in trees.items() if other != bloc] for bloc in trees}
+    previous: Dict[str, int] = {}
+    distances = [math.inf] * len(cities)
+    for v in PointTree(vectors, range(len(cities))).order:
+        bloc = cities[v]["bloc"]
+        point = points[v]
+        last = previous.get(bloc, -1)
+        best, found = (math.dist(point, points[last]), last) if last >= 0 else (math.inf, -1)
+        # The bound is exclusive, so nudge it to let the previous answer win again
+        best = math.nextafter(best, math.inf)
+        for other, tree in foreign[bloc]:
+            chord, member = tree.nearest(point, best)
+            if member >= 0:
+                best, found = chord, member
+        if found >= 0:
+            previous[bloc] = found
+            distances[v] = chord_to_km(math.dist(point, points[found]))
+    return distances
+
+def ftz_components(cities: Sequence[Dict], sources: Sequence[int], targets: Sequence[int],
+                   edge_types: Sequence[int], volumes: Sequence[int], tariffs: Sequence[float],
+                   active: Sequence[int], metrics: Dict) -> Dict[str, List[float]]:
+    """Column of every component over all cities (edge columns use city positions)."""
+    n = len(cities)
+    volume = [0.0] * n
+    tariff = [0.0] * n
+    port_neighbors = [0] * n
+    neighbors = [0] * n
+    types: List[set] = [set() for _ in range(n)]
+    is_port = [bool(c["is_port"]) for c in cities]
+    for s, t, code, vol, rate, a in zip(sources, targets, edge_types, volumes, tariffs, active):
+        if s == t:
+            continue
+        neighbors[s] += 1
+        neighbors[t] += 1
+        port_neighbors[s] += is_port[t]
+        port_neighbors[t] += is_port[s]
+        if a:
+            for v in (s, t):
+                volume[v] += vol
+                tariff[v] += vol * rate
+                types[v].add(code)
+
+    ids = [c["id"] for c in cities]
+    centralities = [_scaled([metrics[name].get(i, 0.0) for i in ids]) for name in ("degree", "betweenness", "closeness")]
+    num_types = len(set(edge_types)) or 1
+    decay = BORDER_DECAY_KM
+    return {
+        "connectivity": [sum(values) / 3 for values in zip(*centralities)],
+        "port_access": [1.0 if port else (PORT_NEIGHBOR_ACCESS * p / k if k else 0.0)
+                        for port, p, k in zip(is_port, port_neighbors, neighbors)],
+        "tariff_exposure": _scaled([t / v if v > 0 else 0.0 for t, v in zip(tariff, volume)]),
+        "trade_volume": _scaled([math.log1p(v) for v in volume]),
+        "diversification": [len(seen) / num_types for seen in types],
+        "border_proximity": [math.exp(-d / decay) for d in border_distances(cities)],
+        "stability": [min(1.0, max(0.0, c["ease_of_business"] / 100)) for c in cities],
+    }
+
+
+def composite_scores(components: Dict[str, List[float]], weights: Dict[str, float] = FTZ_WEIGHTS) -> List[float]:
+    """Weighted sum of the components for every city."""
+    columns = [components[name] for name in COMPONENTS]
+    w = [weights[name] for name in COMPONENTS]
+    return [sum(map(mul, row, w)) for row in zip(*columns)]
+
+
+def weight_vectors(count: int, rng: random.Random, concentration: float = SWEEP_CONCENTRATION) -> List[Tuple[float, ...]]:
+    """count weight vectors drawn from a Dirichlet distribution with mean FTZ_WEIGHTS."""
+    alphas = [concentration * FTZ_WEIGHTS[name] for name in COMPONENTS]
+    vectors = []
+    for _ in range(count):
+        draws = [rng.gammavariate(alpha, 1.0) for alpha in alphas]
+        total = sum(draws)
+        vectors.append(tuple(d / total for d in draws))
+    return vectors
+
+
+def top_candidates(rows: Sequence[Sequence[float]], k: int) -> List[int]:
+    """Rows that can rank in the top k under some weight vector on the simplex.
+
+    Under such weights a score lies between the row's smallest and largest
+    component, so a row whose largest component is below the k-th largest
+    smallest component is outranked by k rows whatever the weights.
+    """
+    if len(rows) <= k:
+        return list(range(len(rows)))
+    floor = heapq.nlargest(k, (min(row) for row in rows))[-1]
+    return [i for i, row in enumerate(rows) if max(row) >= floor]
+
+
+def sweep_weights(components: Dict[str, List[float]], vectors: Sequence[Sequence[float]],
+                  k: int = SWEEP_TOP_K) -> Dict[int, List[int]]:
+    """Top-k rank of every city in each weight vector.
+
+    Returns, for every city that reaches the top k under at least one vector,
+    its rank (1-based) per vector, k + 1 where it is outside the top k.
+    """
+    rows = list(zip(*(components[name] for name in COMPONENTS)))
+    candidates = top_candidates(rows, k)
+    matrix = [rows[i] for i in candidates]
+    ranks: Dict[int, List[int]] = {}
+    for j, w in enumerate(vectors):
+        # One row of the candidates x vectors score matrix
+        scores = [sum(map(mul, row, w)) for row in matrix]
+        top = heapq.nlargest(k, range(len(matrix)), key=scores.__getitem__)
+        for rank, c in enumerate(top, 1):
+            city = candidates[c]
+            if city not in ranks:
+                ranks[city] = [k + 1] * len(vectors)
+            ranks[city][j] = rank
+    return ranks
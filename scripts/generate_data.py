@@ -4,17 +4,109 @@ Generate synthetic analysis data for Europe, World, and Regions datasets.
 Follows the exact AnalysisData schema from types.ts.
 """
 
+import argparse
+import hashlib
 import json
+import os
 import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from array import array
 from datetime import datetime
-from typing import Dict, List, Tuple
-import math
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-# Set random seed for reproducibility
-random.seed(42)
+from dataset_delta import dataset_version, publish_patch
+from dataset_schema import format_violations, validate_file
+from dataset_io import (COLUMNAR_FORMATS, ColumnarExport, SHARD_COMPRESSIONS, SHARD_ENCODINGS, brotli,
+                        load_shard_index, shard_dataset, update_shard_index, write_dataset, write_shard,
+                        zstandard)
+import tracing
+from cascade_engine import CascadeEngine
+from cascade_trials import run_trials
+from ftz_scoring import (COMPONENTS, FTZ_WEIGHTS, SWEEP_CONCENTRATION, SWEEP_TOP_K, composite_scores,
+                         ftz_components, sweep_weights, weight_vectors)
+from geodesy import DistanceMatrix, UnitVectors, distances_km, is_dense
+from gravity import GravitySampler
+from graph_engine import CSRGraph, biconnectivity, centrality, induced_subgraph
+from map_tiles import write_tiles
+from opportunity_model import fit_signals
+from routing import (HopTree, RouteGraph, build_route_index, edge_disjoint_paths, min_vertex_cut, route_cost,
+                     shortest_paths)
+from section_cache import CACHE_FORMAT, SectionCache, code_closure, fingerprint
+from table_index import build_table_index
 
-def generate_city_data(region: str) -> List[Dict]:
-    """Generate city data for a specific region."""
+# Base seed for reproducibility; every region, section shard and batch derives
+# its own seed from it (see derive_seed), so regions can be built independently
+BASE_SEED = 42
+
+REGIONS = ["europe", "world", "regions"]
+
+# Bloc reported in the summary's first slot; its cut vertices fill ecowas_cut_vertices
+PRIMARY_BLOCS = {"europe": "EU", "world": "G7", "regions": "NAFTA"}
+
+DEFAULT_OUT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib"))
+
+# Per-section shards the dashboard fetches lazily (served from public/data/)
+DEFAULT_SHARD_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public", "data"))
+
+# Scale mode: std-dev (degrees) of satellite cities around their template city
+SATELLITE_SPREAD_DEG = 1.5
+
+# Scale mode: edges generated per city when --edges is not given
+DEFAULT_EDGES_PER_CITY = 10
+
+# Table columns the dashboard sorts by, shipped as precomputed permutations
+OPPORTUNITY_SORT_COLUMNS = ("gap", "model_score", "actual_score", "confidence", "signal_type")
+TRADE_ROUTE_SORT_COLUMNS = ("risk", "redundancy", "min_cut", "shortest_cost")
+
+# How edge endpoints are drawn: uniformly at random, or from the gravity model (see gravity.py)
+EDGE_SAMPLERS = ("uniform", "gravity")
+
+# Edges synthesized per batch by the edge engine
+EDGE_BATCH_SIZE = 65536
+
+# Scale mode: cities synthesized per independently seeded shard
+CITY_SHARD_SIZE = 65536
+
+# Trade routes: destinations routed (sampled beyond this) and hubs they are routed from
+MAX_TRADE_ROUTES = 1000
+MAX_ROUTE_HUBS = 5
+
+# Monte Carlo trials per cascade template for the dashboard datasets
+DEFAULT_CASCADE_TRIALS = 1000
+
+EDGE_DESCRIPTIONS = {
+    "TRADE": "Trade route between {source_name} and {target_name}",
+    "POLITICAL": "Political alliance between {source_country} and {target_country}",
+    "CULTURAL": "Cultural exchange between {source_name} and {target_name}",
+    "MIGRATORY": "Migration flow from {source_name} to {target_name}",
+    "FINANCIAL": "Financial corridor {source_name}-{target_name}",
+    "INFRASTRUCTURE": "Infrastructure project connecting {source_name} and {target_name}",
+    "ENERGY": "Energy pipeline/grid between {source_name} and {target_name}",
+    "SUPPLY_CHAIN": "Supply chain link {source_name}-{target_name}",
+    "DIPLOMATIC": "Diplomatic relations {source_country}-{target_country}",
+    "AID": "Development aid from {source_country} to {target_country}",
+    "COMMODITY": "Commodity trade {source_name}-{target_name}",
+    "TECH_TRANSFER": "Technology transfer {source_name}-{target_name}"
+}
+
+# Description of edge types without one of their own
+DEFAULT_EDGE_DESCRIPTION = "Connection between {source_name} and {target_name}"
+
+# Sentences dictionary-encoded shards store edge descriptions as (template, names) of
+DESCRIPTION_TEMPLATES = {"description": [*EDGE_DESCRIPTIONS.values(), DEFAULT_EDGE_DESCRIPTION]}
+
+def derive_seed(*parts) -> int:
+    """Derive a stable 64-bit seed from a base seed and labels (region, shard, ...).
+    
+    Uses SHA-256 rather than hash() so seeds are identical across processes.
+    """
+    digest = hashlib.sha256(":".join(str(part) for part in parts).encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def get_region_template(region: str) -> Dict:
+    """Return the hand-curated city template (names, countries, blocs, coordinates) for a region."""
     if region == "europe":
         cities = [
             "London", "Paris", "Berlin", "Rome", "Madrid", "Amsterdam", "Brussels", "Vienna", 
@@ -198,208 +290,382 @@ def generate_city_data(region: str) -> List[Dict]:
         }
         ftz_targets = ["Singapore", "Dubai", "Hong Kong", "Panama", "Shenzhen", "Rotterdam", "Miami"]
     
+    return {
+        "cities": cities,
+        "countries": countries,
+        "country_codes": country_codes,
+        "blocs": blocs,
+        "bloc_assignments": bloc_assignments,
+        "coordinates": coordinates,
+        "ftz_targets": ftz_targets
+    }
+
+def build_city_record(region: str, template: Dict, template_name: str, city_name: str,
+                      city_id: str, lat: float, lng: float, rng: random.Random,
+                      is_primary: bool = True) -> Dict:
+    """Build one city record modelled on a template city.
+
+    Satellite cities (is_primary=False) inherit country, bloc and income class from
+    their template city but are never capitals, FTZ targets or financial centers.
+    """
+    country = template["countries"][template_name]
+    country_iso3 = template["country_codes"].get(country, "XXX")
+    bloc = template["bloc_assignments"].get(template_name, "OTHER")
+    
+    # Generate realistic population based on region
+    if region == "europe":
+        population = rng.randint(500000, 15000000)
+        gdp_per_capita = rng.uniform(20000, 80000)
+        trade_openness = rng.uniform(0.4, 0.8)
+        ease_of_business = rng.uniform(60, 90)
+    elif region == "world":
+        if template_name in ["New York", "London", "Tokyo", "Paris"]:
+            population = rng.randint(8000000, 20000000)
+            gdp_per_capita = rng.uniform(30000, 100000)
+        elif template_name in ["Lagos", "Nairobi", "Karachi", "Dhaka"]:
+            population = rng.randint(10000000, 25000000)
+            gdp_per_capita = rng.uniform(1000, 5000)
+        else:
+            population = rng.randint(1000000, 15000000)
+            gdp_per_capita = rng.uniform(5000, 40000)
+        trade_openness = rng.uniform(0.3, 0.9)
+        ease_of_business = rng.uniform(40, 95)
+    else:  # regions
+        population = rng.randint(1000000, 12000000)
+        gdp_per_capita = rng.uniform(5000, 60000)
+        trade_openness = rng.uniform(0.3, 0.85)
+        ease_of_business = rng.uniform(45, 90)
+    
+    # Determine if city is a port (coastal cities or major river ports)
+    is_port = rng.random() < 0.4 or template_name in ["London", "Rotterdam", "Hamburg", "Singapore", "Dubai", "Hong Kong", "Shanghai"]
+    
+    # Determine if capital (simplified)
+    is_capital = is_primary and city_name in ["London", "Paris", "Berlin", "Rome", "Madrid", "Brussels", "Vienna", "Warsaw", 
+                                             "Prague", "Stockholm", "Copenhagen", "Dublin", "Lisbon", "Helsinki", "Oslo", 
+                                             "Athens", "Budapest", "Bucharest", "Ankara", "Kyiv", "Tbilisi", "Belgrade", 
+                                             "Zagreb", "Bratislava", "Ljubljana", "Tallinn", "Riga", "Vilnius", "Tokyo",
+                                             "Beijing", "Seoul", "Jakarta", "Bangkok", "Mexico City", "Buenos Aires",
+                                             "Johannesburg", "Riyadh", "Cairo", "Nairobi", "Addis Ababa", "Accra", "Wellington"]
+    
+    # CFA zone only relevant for West Africa
+    cfa_zone = False
+    
+    # FTZ target
+    is_ftz_target = is_primary and city_name in template["ftz_targets"]
+    
+    # Tags
+    tags = []
+    if is_port:
+        tags.append("port")
+    if is_capital:
+        tags.append("capital")
+    if population > 5000000:
+        tags.append("megacity")
+    if gdp_per_capita > 30000:
+        tags.append("high_income")
+    if is_primary and ("financial" in city_name.lower() or city_name in ["London", "New York", "Singapore", "Hong Kong", "Zurich"]):
+        tags.append("financial_center")
+    if rng.random() < 0.3:
+        tags.append("manufacturing")
+    if rng.random() < 0.3:
+        tags.append("tech_hub")
+    if rng.random() < 0.2:
+        tags.append("transport_hub")
+    
+    return {
+        "id": city_id,
+        "name": city_name,
+        "lat": lat,
+        "lng": lng,
+        "country": country,
+        "country_iso3": country_iso3,
+        "bloc": bloc,
+        "population": population,
+        "is_port": is_port,
+        "is_capital": is_capital,
+        "gdp_per_capita": round(gdp_per_capita, 1),
+        "trade_openness": round(trade_openness, 2),
+        "ease_of_business": round(ease_of_business, 1),
+        "cfa_zone": cfa_zone,
+        "is_ftz_target": is_ftz_target,
+        "tags": tags
+    }
+
+def generate_city_data(region: str) -> List[Dict]:
+    """Generate city data for a specific region."""
+    template = get_region_template(region)
+    rng = random.Random(random.getrandbits(64))
+    
     cities_data = []
-    for city_name in cities:
+    for city_name in template["cities"]:
         city_id = city_name.lower().replace(" ", "-")
-        country = countries[city_name]
-        country_iso3 = country_codes.get(country, "XXX")
-        bloc = bloc_assignments.get(city_name, "OTHER")
-        lat, lng = coordinates[city_name]
-        
-        # Generate realistic population based on region
-        if region == "europe":
-            population = random.randint(500000, 15000000)
-            gdp_per_capita = random.uniform(20000, 80000)
-            trade_openness = random.uniform(0.4, 0.8)
-            ease_of_business = random.uniform(60, 90)
-        elif region == "world":
-            if city_name in ["New York", "London", "Tokyo", "Paris"]:
-                population = random.randint(8000000, 20000000)
-                gdp_per_capita = random.uniform(30000, 100000)
-            elif city_name in ["Lagos", "Nairobi", "Karachi", "Dhaka"]:
-                population = random.randint(10000000, 25000000)
-                gdp_per_capita = random.uniform(1000, 5000)
-            else:
-                population = random.randint(1000000, 15000000)
-                gdp_per_capita = random.uniform(5000, 40000)
-            trade_openness = random.uniform(0.3, 0.9)
-            ease_of_business = random.uniform(40, 95)
-        else:  # regions
-            population = random.randint(1000000, 12000000)
-            gdp_per_capita = random.uniform(5000, 60000)
-            trade_openness = random.uniform(0.3, 0.85)
-            ease_of_business = random.uniform(45, 90)
-        
-        # Determine if city is a port (coastal cities or major river ports)
-        is_port = random.random() < 0.4 or city_name in ["London", "Rotterdam", "Hamburg", "Singapore", "Dubai", "Hong Kong", "Shanghai"]
-        
-        # Determine if capital (simplified)
-        is_capital = city_name in ["London", "Paris", "Berlin", "Rome", "Madrid", "Brussels", "Vienna", "Warsaw", 
-                                  "Prague", "Stockholm", "Copenhagen", "Dublin", "Lisbon", "Helsinki", "Oslo", 
-                                  "Athens", "Budapest", "Bucharest", "Ankara", "Kyiv", "Tbilisi", "Belgrade", 
-                                  "Zagreb", "Bratislava", "Ljubljana", "Tallinn", "Riga", "Vilnius", "Tokyo",
-                                  "Beijing", "Seoul", "Jakarta", "Bangkok", "Mexico City", "Buenos Aires",
-                                  "Johannesburg", "Riyadh", "Cairo", "Nairobi", "Addis Ababa", "Accra", "Wellington"]
-        
-        # CFA zone only relevant for West Africa
-        cfa_zone = False
-        
-        # FTZ target
-        is_ftz_target = city_name in ftz_targets
+        lat, lng = template["coordinates"][city_name]
+        cities_data.append(build_city_record(region, template, city_name, city_name, city_id, lat, lng, rng))
+    
+    return cities_data
+
+def generate_scaled_city_data(region: str, num_cities: int) -> List[Dict]:
+    """Procedurally generate num_cities cities sampled from the region template.
+    
+    The first draw of each template city reproduces it verbatim; later draws become
+    satellites ("London 3") scattered around it with the same country and bloc.
+    Each CITY_SHARD_SIZE block of cities draws from its own derived seed.
+    """
+    template = get_region_template(region)
+    template_names = template["cities"]
+    copies = dict.fromkeys(template_names, 0)
+    shard_seed = random.getrandbits(64)
+    
+    cities_data = []
+    for i in range(num_cities):
+        if i % CITY_SHARD_SIZE == 0:
+            rng = random.Random(derive_seed(shard_seed, i // CITY_SHARD_SIZE))
+        template_name = rng.choice(template_names)
+        copy_number = copies[template_name]
+        copies[template_name] = copy_number + 1
+        base_lat, base_lng = template["coordinates"][template_name]
         
-        # Tags
-        tags = []
-        if is_port:
-            tags.append("port")
-        if is_capital:
-            tags.append("capital")
-        if population > 5000000:
-            tags.append("megacity")
-        if gdp_per_capita > 30000:
-            tags.append("high_income")
-        if "financial" in city_name.lower() or city_name in ["London", "New York", "Singapore", "Hong Kong", "Zurich"]:
-            tags.append("financial_center")
-        if random.random() < 0.3:
-            tags.append("manufacturing")
-        if random.random() < 0.3:
-            tags.append("tech_hub")
-        if random.random() < 0.2:
-            tags.append("transport_hub")
+        if copy_number == 0:
+            city_name = template_name
+            city_id = template_name.lower().replace(" ", "-")
+            lat, lng = base_lat, base_lng
+        else:
+            city_name = f"{template_name} {copy_number}"
+            city_id = f"{template_name.lower().replace(' ', '-')}-{copy_number}"
+            lat = round(max(-85.0, min(85.0, rng.gauss(base_lat, SATELLITE_SPREAD_DEG))), 4)
+            lng = round((rng.gauss(base_lng, SATELLITE_SPREAD_DEG) + 180.0) % 360.0 - 180.0, 4)
         
-        cities_data.append({
-            "id": city_id,
-            "name": city_name,
-            "lat": lat,
-            "lng": lng,
-            "country": country,
-            "country_iso3": country_iso3,
-            "bloc": bloc,
-            "population": population,
-            "is_port": is_port,
-            "is_capital": is_capital,
-            "gdp_per_capita": round(gdp_per_capita, 1),
-            "trade_openness": round(trade_openness, 2),
-            "ease_of_business": round(ease_of_business, 1),
-            "cfa_zone": cfa_zone,
-            "is_ftz_target": is_ftz_target,
-            "tags": tags
-        })
+        cities_data.append(build_city_record(region, template, template_name, city_name, city_id,
+                                             lat, lng, rng, is_primary=copy_number == 0))
     
     return cities_data
 
-def generate_edges(cities: List[Dict], region: str) -> List[Dict]:
-    """Generate edges between cities."""
+class CityIndex:
+    """Shared per-dataset city index.
+    
+    Maps city id to list position and keeps columnar copies of the numeric fields
+    the generators read per edge or per city, so lookups are O(1) and no stage has
+    to scan the city list. Build it once per dataset and pass it to every stage.
+    """
+    
+    def __init__(self, cities: List[Dict]):
+        self.cities = cities
+        self.ids = [city["id"] for city in cities]
+        self.position = {city_id: i for i, city_id in enumerate(self.ids)}
+        self.lat = array("d", [city["lat"] for city in cities])
+        self.lng = array("d", [city["lng"] for city in cities])
+        self.population = array("q", [city["population"] for city in cities])
+        self.gdp_per_capita = array("d", [city["gdp_per_capita"] for city in cities])
+        self._vectors = None
+        self._distances = None
+    
+    def unit_vectors(self) -> UnitVectors:
+        """Unit vectors of the cities for the great-circle kernel (built on first use)."""
+        if self._vectors is None:
+            self._vectors = UnitVectors(self.lat, self.lng)
+        return self._vectors
+    
+    def distance_matrix(self) -> DistanceMatrix:
+        """Pairwise great-circle distances, built on first use and kept for the region's later stages."""
+        if self._distances is None:
+            self._distances = DistanceMatrix(self.unit_vectors())
+        return self._distances
+    
+    def __len__(self) -> int:
+        return len(self.cities)
+    
+    def __contains__(self, city_id: str) -> bool:
+        return city_id in self.position
+    
+    def __getitem__(self, city_id: str) -> Dict:
+        return self.cities[self.position[city_id]]
+
+def get_edge_types(region: str) -> List[str]:
+    """Return the edge types used by a region."""
     if region == "europe":
-        edge_types = ["TRADE", "POLITICAL", "CULTURAL", "MIGRATORY", "FINANCIAL", "INFRASTRUCTURE", "ENERGY"]
+        return ["TRADE", "POLITICAL", "CULTURAL", "MIGRATORY", "FINANCIAL", "INFRASTRUCTURE", "ENERGY"]
     elif region == "world":
-        edge_types = ["TRADE", "POLITICAL", "CULTURAL", "MIGRATORY", "FINANCIAL", "SUPPLY_CHAIN", "DIPLOMATIC"]
+        return ["TRADE", "POLITICAL", "CULTURAL", "MIGRATORY", "FINANCIAL", "SUPPLY_CHAIN", "DIPLOMATIC"]
     else:  # regions
-        edge_types = ["TRADE", "POLITICAL", "AID", "MIGRATORY", "FINANCIAL", "COMMODITY", "TECH_TRANSFER"]
+        return ["TRADE", "POLITICAL", "AID", "MIGRATORY", "FINANCIAL", "COMMODITY", "TECH_TRANSFER"]
+
+def describe_edge(edge_type: str, source_city: Dict, target_city: Dict) -> str:
+    """Render the human-readable description for an edge."""
+    template = EDGE_DESCRIPTIONS.get(edge_type, DEFAULT_EDGE_DESCRIPTION)
+    return template.format(
+        source_name=source_city["name"], target_name=target_city["name"],
+        source_country=source_city["country"], target_country=target_city["country"]
+    )
+
+class EdgeTable:
+    """Columnar edge storage.
     
-    edges = []
-    city_ids = [city["id"] for city in cities]
+    Holds one compact array per Edge field instead of one dict per edge, so 10^7
+    edges fit in a few hundred MB. Rows (and their descriptions) are only built
+    when the table is iterated for serialization.
+    """
     
-    # Generate 80-150 edges
-    num_edges = random.randint(80, 150)
+    COLUMNS = ("source", "target", "edge_type", "weight", "volume", "distance_km", "is_active", "tariff_rate")
     
-    for _ in range(num_edges):
-        source = random.choice(city_ids)
-        target = random.choice(city_ids)
-        while target == source:
-            target = random.choice(city_ids)
-        
-        edge_type = random.choice(edge_types)
-        
-        # Calculate distance (simplified)
-        source_city = next(c for c in cities if c["id"] == source)
-        target_city = next(c for c in cities if c["id"] == target)
-        
-        # Simple distance calculation (approximate)
-        lat_diff = abs(source_city["lat"] - target_city["lat"])
-        lng_diff = abs(source_city["lng"] - target_city["lng"])
-        distance_km = int(math.sqrt(lat_diff**2 + lng_diff**2) * 111)  # Rough km per degree
-        
-        # Weight based on city size and distance
-        weight = random.uniform(0.1, 1.0)
-        
-        # Volume based on population and GDP
-        volume = int((source_city["population"] * target_city["population"] * 
-                     source_city["gdp_per_capita"] * target_city["gdp_per_capita"]) / 1e12 * random.uniform(0.1, 2.0))
-        
-        is_active = random.random() < 0.9  # 90% active
-        
-        tariff_rate = random.uniform(0.0, 0.15)  # 0-15% tariff
-        
-        descriptions = {
-            "TRADE": f"Trade route between {source_city['name']} and {target_city['name']}",
-            "POLITICAL": f"Political alliance between {source_city['country']} and {target_city['country']}",
-            "CULTURAL": f"Cultural exchange between {source_city['name']} and {target_city['name']}",
-            "MIGRATORY": f"Migration flow from {source_city['name']} to {target_city['name']}",
-            "FINANCIAL": f"Financial corridor {source_city['name']}-{target_city['name']}",
-            "INFRASTRUCTURE": f"Infrastructure project connecting {source_city['name']} and {target_city['name']}",
-            "ENERGY": f"Energy pipeline/grid between {source_city['name']} and {target_city['name']}",
-            "SUPPLY_CHAIN": f"Supply chain link {source_city['name']}-{target_city['name']}",
-            "DIPLOMATIC": f"Diplomatic relations {source_city['country']}-{target_city['country']}",
-            "AID": f"Development aid from {source_city['country']} to {target_city['country']}",
-            "COMMODITY": f"Commodity trade {source_city['name']}-{target_city['name']}",
-            "TECH_TRANSFER": f"Technology transfer {source_city['name']}-{target_city['name']}"
-        }
-        
-        description = descriptions.get(edge_type, f"Connection between {source_city['name']} and {target_city['name']}")
-        
-        edges.append({
-            "source": source,
-            "target": target,
-            "edge_type": edge_type,
-            "weight": round(weight, 3),
-            "volume": volume,
-            "distance_km": distance_km,
-            "is_active": is_active,
-            "tariff_rate": round(tariff_rate, 3),
-            "description": description
-        })
+    def __init__(self, index: CityIndex, edge_types: List[str]):
+        self.index = index
+        self.edge_types = edge_types
+        self.source = array("l")
+        self.target = array("l")
+        self.edge_type = array("B")
+        self.weight = array("d")
+        self.volume = array("q")
+        self.distance_km = array("l")
+        self.is_active = array("B")
+        self.tariff_rate = array("d")
     
-    return edges
-
-def generate_metrics(cities: List[Dict], edges: List[Dict]) -> Dict:
-    """Generate network metrics."""
-    city_ids = [city["id"] for city in cities]
-    
-    # Calculate degree centrality (simplified)
-    degree = {}
-    for city_id in city_ids:
-        # Count edges where city appears as source or target
-        edge_count = sum(1 for edge in edges if edge["source"] == city_id or edge["target"] == city_id)
-        degree[city_id] = round(edge_count / len(edges), 4)
-    
-    # Calculate betweenness centrality (simplified)
-    betweenness = {}
-    for city_id in city_ids:
-        # Simplified betweenness: random value scaled by degree
-        betweenness[city_id] = round(random.uniform(0, 0.4) * degree[city_id], 4)
-    
-    # Calculate closeness centrality (simplified)
-    closeness = {}
-    for city_id in city_ids:
-        closeness[city_id] = round(random.uniform(0.3, 0.7), 4)
-    
-    # Articulation points (simplified)
-    articulation_points = random.sample(city_ids, min(5, len(city_ids) // 10))
-    
-    # Bridges (simplified)
-    bridges = []
-    if len(edges) > 10:
-        for _ in range(random.randint(3, 8)):
-            source = random.choice(city_ids)
-            target = random.choice(city_ids)
-            if source != target:
-                bridges.append([source, target])
+    def __len__(self) -> int:
+        return len(self.source)
     
-    # Region-specific cut vertices
-    cut_vertices = random.sample(city_ids, min(3, len(city_ids) // 15))
+    @classmethod
+    def from_records(cls, index: CityIndex, records: Iterable[Dict]) -> "EdgeTable":
+        """Columns of already generated Edge records (their descriptions are not kept)."""
+        records = list(records)
+        edge_types = sorted({record["edge_type"] for record in records})
+        codes = {edge_type: i for i, edge_type in enumerate(edge_types)}
+        table = cls(index, edge_types)
+        for record in records:
+            table.source.append(index.position[record["source"]])
+            table.target.append(index.position[record["target"]])
+            table.edge_type.append(codes[record["edge_type"]])
+            table.weight.append(record["weight"])
+            table.volume.append(record["volume"])
+            table.distance_km.append(record["distance_km"])
+            table.is_active.append(1 if record["is_active"] else 0)
+            table.tariff_rate.append(record["tariff_rate"])
+        return table
+    
+    def __getstate__(self) -> Dict:
+        # The city index is rebuilt from the cities section, so only the columns are kept
+        state = {column: getattr(self, column) for column in self.COLUMNS}
+        state["edge_types"] = self.edge_types
+        return state
+    
+    def __setstate__(self, state: Dict) -> None:
+        self.index = None
+        self.__dict__.update(state)
+    
+    def __iter__(self) -> Iterator[Dict]:
+        cities = self.index.cities
+        edge_types = self.edge_types
+        for i in range(len(self.source)):
+            source_city = cities[self.source[i]]
+            target_city = cities[self.target[i]]
+            edge_type = edge_types[self.edge_type[i]]
+            yield {
+                "source": source_city["id"],
+                "target": target_city["id"],
+                "edge_type": edge_type,
+                "weight": self.weight[i],
+                "volume": self.volume[i],
+                "distance_km": self.distance_km[i],
+                "is_active": bool(self.is_active[i]),
+                "tariff_rate": self.tariff_rate[i],
+                "description": describe_edge(edge_type, source_city, target_city)
+            }
+
+def synthesize_edge_batch(table: EdgeTable, count: int, mass: List[float], rng: random.Random,
+                          matrix: Optional[DistanceMatrix] = None, pairs: Optional[GravitySampler] = None) -> None:
+    """Append count random edges to table, one column at a time.
     
-    # Component count
-    component_count = random.randint(1, 3)
+    Every random column for the batch is drawn up front, then distance and volume
+    are derived from the city columns in whole-batch passes; no per-edge dict or
+    string is built here. Endpoints are drawn from the pairs sampler when given,
+    else uniformly. Distances are great-circle km, looked up in matrix when given
+    and otherwise computed by the geodesy kernel.
+    """
+    index = table.index
+    num_cities = len(index)
+    num_types = len(table.edge_types)
+    rand = rng.random
+    draws = range(count)
+    
+    if pairs is not None:
+        sources, targets = pairs.sample(rng, count)
+    else:
+        # Targets are drawn as a non-zero offset from the source, so no rejection loop
+        sources = [int(rand() * num_cities) for _ in draws]
+        targets = [(s + 1 + int(rand() * (num_cities - 1))) % num_cities for s in sources]
+    edge_types = [int(rand() * num_types) for _ in draws]
+    weights = [round(0.1 + 0.9 * rand(), 3) for _ in draws]  # 0.1-1.0
+    volume_factors = [0.1 + 1.9 * rand() for _ in draws]  # 0.1-2.0
+    is_active = [rand() < 0.9 for _ in draws]  # 90% active
+    tariff_rates = [round(0.15 * rand(), 3) for _ in draws]  # 0-15% tariff
+    
+    if matrix is not None:
+        distances = matrix.lookup(sources, targets)
+    else:
+        distances = distances_km(index.unit_vectors(), sources, targets)
+    
+    # Volume based on population and GDP of both endpoints
+    volumes = [int(mass[s] * mass[t] / 1e12 * f) for s, t, f in zip(sources, targets, volume_factors)]
+    
+    table.source.extend(sources)
+    table.target.extend(targets)
+    table.edge_type.extend(edge_types)
+    table.weight.extend(weights)
+    table.volume.extend(volumes)
+    table.distance_km.extend(map(round, distances))
+    table.is_active.extend(is_active)
+    table.tariff_rate.extend(tariff_rates)
+
+def generate_edges(index: CityIndex, region: str, num_edges: Optional[int] = None,
+                   sampler: str = "uniform") -> EdgeTable:
+    """Generate edges between cities.
+    
+    Edges are synthesized in batches of EDGE_BATCH_SIZE into a columnar EdgeTable,
+    each batch from its own derived seed; without num_edges a regular dataset
+    gets 80-150 edges. sampler is one of EDGE_SAMPLERS: "gravity" draws
+    mostly local links between large economies instead of uniform pairs. Dense
+    graphs read their distances from the index's pairwise distance matrix.
+    """
+    if num_edges is None:
+        num_edges = random.randint(80, 150)
+    
+    table = EdgeTable(index, get_edge_types(region))
+    mass = [p * g for p, g in zip(index.population, index.gdp_per_capita)]
+    matrix = index.distance_matrix() if is_dense(len(index), num_edges) else None
+    pairs = GravitySampler(index.lat, index.lng, mass) if sampler == "gravity" else None
+    batch_seed = random.getrandbits(64)
+    for start in range(0, num_edges, EDGE_BATCH_SIZE):
+        rng = random.Random(derive_seed(batch_seed, start // EDGE_BATCH_SIZE))
+        synthesize_edge_batch(table, min(EDGE_BATCH_SIZE, num_edges - start), mass, rng, matrix, pairs)
+    
+    return table
+
+def generate_metrics(index: CityIndex, graph: CSRGraph, region: str,
+                     centrality_samples: Optional[int] = None) -> Dict:
+    """Compute network metrics on the city graph.
+    
+    Degree, betweenness and (harmonic) closeness are normalized centralities;
+    betweenness/closeness switch to a k-source sample on large graphs (see
+    graph_engine.centrality). Region-specific cut vertices are the articulation
+    points of the subgraph induced by the region's primary bloc.
+    """
+    city_ids = index.ids
+    n = len(index)
+    
+    degree_norm = 1 / (n - 1) if n > 1 else 0.0
+    degree = {city_id: round(graph.degree(i) * degree_norm, 4) for i, city_id in enumerate(city_ids)}
+    
+    betweenness_values, closeness_values = centrality(graph, centrality_samples)
+    betweenness = {city_id: round(b, 4) for city_id, b in zip(city_ids, betweenness_values)}
+    closeness = {city_id: round(c, 4) for city_id, c in zip(city_ids, closeness_values)}
+    
+    cut_points, bridge_pairs, component_count = biconnectivity(graph)
+    articulation_points = [city_ids[v] for v in cut_points]
+    bridges = [[city_ids[s], city_ids[t]] for s, t in bridge_pairs]
+    
+    # Region-specific cut vertices
+    primary_bloc = PRIMARY_BLOCS.get(region)
+    bloc_nodes = [i for i, city in enumerate(index.cities) if city["bloc"] == primary_bloc]
+    bloc_graph, bloc_mapping = induced_subgraph(graph, bloc_nodes)
+    cut_vertices = [city_ids[bloc_mapping[v]] for v in biconnectivity(bloc_graph)[0]]
     
     return {
         "betweenness": betweenness,
@@ -411,116 +677,174 @@ def generate_metrics(cities: List[Dict], edges: List[Dict]) -> Dict:
         "component_count": component_count
     }
 
-def generate_ftz_impact(cities: List[Dict], region: str) -> Dict[str, Dict]:
-    """Generate FTZ impact scores for target cities."""
+def generate_ftz_impact(index: CityIndex, edges: EdgeTable, metrics: Dict, region: str, sweep: int = 0,
+                        sweep_path: Optional[str] = None) -> Dict[str, Dict]:
+    """Score the FTZ target cities from the network (see ftz_scoring).
+    
+    The components are computed for every city and combined with FTZ_WEIGHTS;
+    the section keeps the FTZ targets. With sweep > 0, every city is also ranked
+    under that many weight vectors drawn around FTZ_WEIGHTS and the cities that
+    reach the top SWEEP_TOP_K are written to sweep_path with how often and how
+    high they rank.
+    """
+    components = ftz_components(index.cities, edges.source, edges.target, edges.edge_type, edges.volume,
+                                edges.tariff_rate, edges.is_active, metrics)
+    composite = composite_scores(components)
+    
     ftz_impact = {}
-    ftz_cities = [city for city in cities if city["is_ftz_target"]]
-    
-    for city in ftz_cities:
-        # Generate realistic scores
-        connectivity = random.uniform(0.6, 0.95)
-        port_access = 0.9 if city["is_port"] else random.uniform(0.3, 0.7)
-        tariff_exposure = random.uniform(0.7, 0.95)
-        trade_volume = random.uniform(0.5, 0.9)
-        diversification = random.uniform(0.4, 0.85)
-        border_proximity = random.uniform(0.5, 0.9)
-        stability = random.uniform(0.6, 0.95)
-        
-        # Composite score (weighted average)
-        composite = (
-            connectivity * 0.2 +
-            port_access * 0.15 +
-            tariff_exposure * 0.15 +
-            trade_volume * 0.15 +
-            diversification * 0.1 +
-            border_proximity * 0.1 +
-            stability * 0.15
-        )
-        
-        ftz_impact[city["id"]] = {
-            "composite": round(composite, 3),
-            "connectivity": round(connectivity, 3),
-            "port_access": round(port_access, 3),
-            "tariff_exposure": round(tariff_exposure, 3),
-            "trade_volume": round(trade_volume, 3),
-            "diversification": round(diversification, 3),
-            "border_proximity": round(border_proximity, 3),
-            "stability": round(stability, 3)
-        }
+    for v, city in enumerate(index.cities):
+        if city["is_ftz_target"]:
+            ftz_impact[city["id"]] = {"composite": round(composite[v], 3),
+                                      **{name: round(components[name][v], 3) for name in COMPONENTS}}
+    
+    if sweep > 0 and sweep_path:
+        rng = random.Random(random.getrandbits(64))
+        ranks = sweep_weights(components, weight_vectors(sweep, rng))
+        default_rank = {v: rank for rank, v in enumerate(sorted(range(len(index)), key=lambda v: -composite[v]), 1)}
+        outside = SWEEP_TOP_K + 1
+        rows = []
+        for v, city_ranks in ranks.items():
+            ordered = sorted(city_ranks)
+            median = ordered[(len(ordered) - 1) // 2]
+            p90 = ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+            city = index.cities[v]
+            rows.append({
+                "city_id": city["id"],
+                "city_name": city["name"],
+                "is_ftz_target": city["is_ftz_target"],
+                "composite": round(composite[v], 3),
+                "default_rank": default_rank[v],
+                "top_share": round(sum(1 for r in city_ranks if r < outside) / sweep, 4),
+                "best_rank": ordered[0],
+                "median_rank": median if median < outside else None,
+                "p90_rank": p90 if p90 < outside else None,
+            })
+        rows.sort(key=lambda row: (-row["top_share"], row["default_rank"]))
+        with open(sweep_path, "w") as f:
+            json.dump({"region": region, "weights": FTZ_WEIGHTS, "vectors": sweep,
+                       "concentration": SWEEP_CONCENTRATION, "top_k": SWEEP_TOP_K, "cities": rows}, f, indent=2)
+        print(f"  FTZ sweep: {sweep} weight vectors, {len(rows)} cities reach the top {SWEEP_TOP_K}")
     
     return ftz_impact
 
-def generate_trade_routes(cities: List[Dict], region: str) -> Dict[str, Dict]:
-    """Generate trade route data."""
-    trade_routes = {}
-    city_ids = [city["id"] for city in cities]
+def generate_trade_routes(index: CityIndex, edges: EdgeTable, region: str) -> Dict[str, Dict]:
+    """Route every city (up to MAX_TRADE_ROUTES) from its cheapest hub over the active edges.
     
-    # Generate 10-20 trade routes
-    num_routes = random.randint(10, 20)
+    Hubs are the region's FTZ targets, or its most populous cities if it has none
+    (at most MAX_ROUTE_HUBS). Edge cost is distance_km marked up by tariff_rate.
+    All hub-destination pairs go to routing.shortest_paths as one batch; for the
+    chosen hub, min_cut_nodes is the minimum vertex cut of the indirect routes,
+    redundancy the number of edge-disjoint paths, and risk 1 / (1 + number of
+    vertex-disjoint routes). The flow queries from one hub share its HopTree,
+    which seeds each of them. Routes are keyed by destination city id.
+    """
+    n = len(index)
+    costs = [route_cost(d, t) for d, t in zip(edges.distance_km, edges.tariff_rate)]
+    graph = RouteGraph(n, edges.source, edges.target, costs, edges.is_active, index.lat, index.lng)
     
-    for i in range(num_routes):
-        route_id = f"route-{i+1:03d}"
-        
-        # Select 3-8 cities for the route
-        route_length = random.randint(3, 8)
-        route_cities = random.sample(city_ids, min(route_length, len(city_ids)))
-        
-        risk = random.uniform(0.1, 0.8)
-        redundancy = random.uniform(0.2, 0.9)
-        min_cut = random.randint(1, 3)
-        
-        shortest_path = route_cities
-        shortest_cost = random.randint(1000, 10000)
-        
-        # Select some cities as critical nodes
-        min_cut_nodes = random.sample(route_cities, min(2, len(route_cities)))
+    by_population = sorted(range(n), key=lambda i: -index.population[i])
+    hubs = [i for i in by_population if index.cities[i]["is_ftz_target"]] or by_population
+    hubs = hubs[:MAX_ROUTE_HUBS]
+    if n <= MAX_TRADE_ROUTES:
+        destinations = list(range(n))
+    else:
+        destinations = sorted(random.sample(range(n), MAX_TRADE_ROUTES))
+    
+    paths = shortest_paths(graph, [(hub, d) for hub in hubs for d in destinations])
+    city_ids = index.ids
+    trees: Dict[int, HopTree] = {}
+    
+    trade_routes = {}
+    for d in destinations:
+        found = [paths[(hub, d)] for hub in hubs if paths[(hub, d)] is not None]
+        if not found:
+            trade_routes[city_ids[d]] = {
+                "risk": 1.0,
+                "redundancy": 0,
+                "min_cut": 0,
+                "shortest_path": [],
+                "shortest_cost": None,
+                "min_cut_nodes": []
+            }
+            continue
         
-        trade_routes[route_id] = {
-            "risk": round(risk, 3),
-            "redundancy": round(redundancy, 3),
-            "min_cut": min_cut,
-            "shortest_path": shortest_path,
-            "shortest_cost": shortest_cost,
-            "min_cut_nodes": min_cut_nodes
+        cost, path = min(found, key=lambda found_path: found_path[0])
+        hub = path[0]
+        if hub not in trees:
+            trees[hub] = HopTree(graph, hub)
+        cut = min_vertex_cut(graph, hub, d, trees[hub])
+        routes = len(cut) + (1 if graph.is_adjacent(hub, d) else 0)
+        trade_routes[city_ids[d]] = {
+            "risk": round(1 / (1 + routes), 3) if hub != d else 0.0,
+            "redundancy": edge_disjoint_paths(graph, hub, d, trees[hub]),
+            "min_cut": len(cut),
+            "shortest_path": [city_ids[v] for v in path],
+            "shortest_cost": round(cost, 1),
+            "min_cut_nodes": [city_ids[v] for v in cut]
         }
     
     return trade_routes
 
-def generate_cascades(cities: List[Dict], region: str) -> List[Dict]:
-    """Generate cascade scenarios."""
-    city_ids = [city["id"] for city in cities]
+def generate_route_index(index: CityIndex, edges: EdgeTable, region: str) -> Dict:
+    """ALT routing index over the active edges for arbitrary route queries (see routing.build_route_index)."""
+    costs = [round(route_cost(d, t)) for d, t in zip(edges.distance_km, edges.tariff_rate)]
+    graph = RouteGraph(len(index), edges.source, edges.target, costs, edges.is_active, index.lat, index.lng)
+    return build_route_index(graph, index.ids)
+
+def generate_cascades(index: CityIndex, edges: EdgeTable, graph: CSRGraph, region: str, trials: int = 0,
+                      trials_path: Optional[str] = None, trial_workers: Optional[int] = None) -> List[Dict]:
+    """Simulate the region's cascade scenarios on the edge graph.
     
+    Each template's trigger removes the cities of its countries and degrades its
+    edge types by its severity; the cascade_engine then propagates the load to a
+    fixed point and reports failed (affected), isolated and trade-disrupted
+    cities, the change in component count and the trade volume lost.
+    
+    With trials > 0, every template also gets that many Monte Carlo trials (see
+    cascade_trials), streamed to trials_path, and its entry gains percentile
+    bands of isolated cities and trade volume affected.
+    """
     if region == "europe":
         cascade_templates = [
             {
                 "name": "Brexit Impact Cascade",
                 "trigger": "UK trade policy shift",
                 "type": "TRADE_DISRUPTION",
-                "severity": 0.7
+                "severity": 0.7,
+                "countries": ["United Kingdom"],
+                "edge_types": ["TRADE"]
             },
             {
                 "name": "Ukraine Conflict Fallout",
                 "trigger": "Military conflict escalation",
                 "type": "SECURITY_CRISIS",
-                "severity": 0.8
+                "severity": 0.8,
+                "countries": ["Ukraine"],
+                "edge_types": ["ENERGY", "INFRASTRUCTURE"]
             },
             {
                 "name": "Energy Crisis Cascade",
                 "trigger": "Gas pipeline shutdown",
                 "type": "ENERGY_SHOCK",
-                "severity": 0.6
+                "severity": 0.6,
+                "countries": [],
+                "edge_types": ["ENERGY"]
             },
             {
                 "name": "Schengen Collapse",
                 "trigger": "Border control reinstatement",
                 "type": "MIGRATION_CRISIS",
-                "severity": 0.5
+                "severity": 0.5,
+                "countries": [],
+                "edge_types": ["MIGRATORY"]
             },
             {
                 "name": "Eurozone Debt Crisis",
                 "trigger": "Sovereign default",
                 "type": "FINANCIAL_CONTAGION",
-                "severity": 0.65
+                "severity": 0.65,
+                "countries": ["Greece"],
+                "edge_types": ["FINANCIAL"]
             }
         ]
     elif region == "world":
@@ -529,37 +853,49 @@ def generate_cascades(cities: List[Dict], region: str) -> List[Dict]:
                 "name": "US-China Decoupling",
                 "trigger": "Trade war escalation",
                 "type": "TECH_DECOUPLING",
-                "severity": 0.75
+                "severity": 0.75,
+                "countries": [],
+                "edge_types": ["SUPPLY_CHAIN", "TRADE"]
             },
             {
                 "name": "SWIFT Sanctions Cascade",
                 "trigger": "Financial system exclusion",
                 "type": "FINANCIAL_ISOLATION",
-                "severity": 0.7
+                "severity": 0.7,
+                "countries": ["Russia"],
+                "edge_types": ["FINANCIAL"]
             },
             {
                 "name": "Pandemic Supply Chain Shock",
                 "trigger": "Global health crisis",
                 "type": "SUPPLY_CHAIN_COLLAPSE",
-                "severity": 0.6
+                "severity": 0.6,
+                "countries": [],
+                "edge_types": ["SUPPLY_CHAIN", "MIGRATORY"]
             },
             {
                 "name": "Suez Blockage Ripple",
                 "trigger": "Major shipping lane closure",
                 "type": "LOGISTICS_DISRUPTION",
-                "severity": 0.55
+                "severity": 0.55,
+                "countries": ["Egypt"],
+                "edge_types": ["SUPPLY_CHAIN"]
             },
             {
                 "name": "Climate Migration Wave",
                 "trigger": "Extreme weather events",
                 "type": "MIGRATION_CRISIS",
-                "severity": 0.65
+                "severity": 0.65,
+                "countries": [],
+                "edge_types": ["MIGRATORY"]
             },
             {
                 "name": "Digital Currency War",
                 "trigger": "CBDC competition",
                 "type": "MONETARY_CONFLICT",
-                "severity": 0.5
+                "severity": 0.5,
+                "countries": [],
+                "edge_types": ["FINANCIAL"]
             }
         ]
     else:  # regions
@@ -568,103 +904,119 @@ def generate_cascades(cities: List[Dict], region: str) -> List[Dict]:
                 "name": "Regional Decoupling",
                 "trigger": "Trade bloc fragmentation",
                 "type": "REGIONAL_ISOLATION",
-                "severity": 0.6
+                "severity": 0.6,
+                "countries": [],
+                "edge_types": ["TRADE", "POLITICAL"]
             },
             {
                 "name": "Commodity Price Shock",
                 "trigger": "Resource nationalism",
                 "type": "COMMODITY_CRISIS",
-                "severity": 0.55
+                "severity": 0.55,
+                "countries": [],
+                "edge_types": ["COMMODITY"]
             },
             {
                 "name": "Migration Crisis Cascade",
                 "trigger": "Political instability",
                 "type": "DEMOGRAPHIC_SHOCK",
-                "severity": 0.5
+                "severity": 0.5,
+                "countries": [],
+                "edge_types": ["MIGRATORY"]
             },
             {
                 "name": "Infrastructure Cyber Attack",
                 "trigger": "State-sponsored hacking",
                 "type": "CYBER_WARFARE",
-                "severity": 0.65
+                "severity": 0.65,
+                "countries": [],
+                "edge_types": ["TECH_TRANSFER", "FINANCIAL"]
             },
             {
                 "name": "Climate Finance Gap",
                 "trigger": "Green investment withdrawal",
                 "type": "FINANCIAL_SHORTFALL",
-                "severity": 0.45
+                "severity": 0.45,
+                "countries": [],
+                "edge_types": ["AID", "FINANCIAL"]
             },
             {
                 "name": "Tech Sovereignty Conflict",
                 "trigger": "Digital platform bans",
                 "type": "TECH_FRAGMENTATION",
-                "severity": 0.55
+                "severity": 0.55,
+                "countries": ["Iran"],
+                "edge_types": ["TECH_TRANSFER"]
             }
         ]
     
+    engine = CascadeEngine(graph, edges.source, edges.target, edges.edge_type, edges.volume, edges.is_active)
+    type_codes = {edge_type: code for code, edge_type in enumerate(edges.edge_types)}
+    city_ids = index.ids
+    
     cascades = []
+    scenarios = []
     for template in cascade_templates:
-        # Select affected cities
-        num_affected = random.randint(5, min(15, len(city_ids)))
-        affected_cities = random.sample(city_ids, num_affected)
-        
-        # Some cities become isolated
-        num_isolated = random.randint(2, min(5, num_affected))
-        isolated_cities = random.sample(affected_cities, num_isolated)
-        
-        # Trade disrupted cities
-        trade_disrupted = random.sample(affected_cities, random.randint(3, min(8, num_affected)))
-        
-        new_components = random.randint(1, 3)
-        trade_volume_affected = random.uniform(0.2, 0.8) * 1e9  # Billions
+        countries = set(template["countries"])
+        seeds = [i for i, city in enumerate(index.cities) if city["country"] in countries]
+        degraded = [type_codes[t] for t in template["edge_types"] if t in type_codes]
+        scenarios.append({"seeds": seeds, "degraded": degraded, "severity": template["severity"]})
+        result = engine.run(seeds, degraded, template["severity"])
         
         cascades.append({
             "name": template["name"],
             "trigger": template["trigger"],
             "type": template["type"],
-            "affected_cities": affected_cities,
-            "isolated_cities": isolated_cities,
-            "trade_disrupted_cities": trade_disrupted,
-            "new_components": new_components,
-            "trade_volume_affected": round(trade_volume_affected),
+            "affected_cities": [city_ids[v] for v in result["failed"]],
+            "isolated_cities": [city_ids[v] for v in result["isolated"]],
+            "trade_disrupted_cities": [city_ids[v] for v in result["disrupted"]],
+            "new_components": max(0, result["new_components"]),
+            "trade_volume_affected": round(result["volume_lost"]),
             "severity": template["severity"]
         })
     
+    if trials > 0:
+        trial_seed = random.getrandbits(64)
+        trial_seeds = [[derive_seed(trial_seed, scenario_no, trial) for trial in range(trials)]
+                       for scenario_no in range(len(scenarios))]
+        for cascade, bands in zip(cascades, run_trials(engine, scenarios, trial_seeds, trials_path, trial_workers)):
+            cascade.update(bands)
+    
     return cascades
 
-def generate_opportunities(cities: List[Dict], region: str) -> List[Dict]:
-    """Generate opportunity signals."""
-    opportunities = []
-    
-    # Generate 15-25 opportunities
-    num_opportunities = random.randint(15, 25)
+def generate_opportunities(index: CityIndex, edges: EdgeTable, metrics: Dict, region: str,
+                           workers: Optional[int] = None) -> List[Dict]:
+    """Opportunity signals of the cities whose trade departs from their fundamentals (see opportunity_model)."""
+    degree = [metrics["degree"].get(city["id"], 0.0) for city in index.cities]
+    rng = random.Random(random.getrandbits(64))
+    signals = fit_signals(index.cities, degree, edges.source, edges.target, edges.volume, edges.is_active, rng,
+                          workers=workers)
     
-    for i in range(num_opportunities):
-        city = random.choice(cities)
-        
-        signal_types = ["OPPORTUNITY", "RISK", "NEUTRAL"]
-        weights = [0.6, 0.3, 0.1]  # More opportunities than risks
-        signal_type = random.choices(signal_types, weights=weights)[0]
-        
-        gap = random.uniform(-0.3, 0.3)
-        model_score = random.uniform(0.3, 0.9)
-        actual_score = model_score + gap
-        confidence = random.uniform(0.6, 0.95)
-        
+    opportunities = []
+    for signal in signals:
+        city = index.cities[signal["city"]]
         opportunities.append({
             "city_id": city["id"],
             "city_name": city["name"],
             "country": city["country"],
-            "signal_type": signal_type,
-            "gap": round(gap, 3),
-            "model_score": round(model_score, 3),
-            "actual_score": round(actual_score, 3),
-            "confidence": round(confidence, 3)
+            "signal_type": signal["signal_type"],
+            "gap": round(signal["gap"], 3),
+            "model_score": round(signal["model_score"], 3),
+            "actual_score": round(signal["actual_score"], 3),
+            "confidence": round(signal["confidence"], 3)
         })
     
     return opportunities
 
-def generate_summary(cities: List[Dict], edges: List[Dict], region: str) -> Dict:
+def generate_opportunities_index(opportunities: List[Dict]) -> Dict:
+    """Sort permutations of the opportunities table's columns and a bitmap per signal type."""
+    return build_table_index(opportunities, OPPORTUNITY_SORT_COLUMNS, "signal_type")
+
+def generate_trade_routes_index(trade_routes: Dict[str, Dict]) -> Dict:
+    """Sort permutations of the trade routes table's columns (rows in trade_routes order)."""
+    return build_table_index(list(trade_routes.values()), TRADE_ROUTE_SORT_COLUMNS)
+
+def generate_summary(cities: List[Dict], edges: EdgeTable, region: str) -> Dict:
     """Generate network summary."""
     ftz_targets = sum(1 for city in cities if city["is_ftz_target"])
     port_cities = sum(1 for city in cities if city["is_port"])
@@ -720,44 +1072,449 @@ def generate_summary(cities: List[Dict], edges: List[Dict], region: str) -> Dict
             "ftz_targets": ftz_targets
         }
 
-def generate_dataset(region: str) -> Dict:
-    """Generate complete dataset for a region."""
+# Entry points of the code each section is built by; section_code follows them
+# to everything they use, so editing any of it invalidates the section's cache entries
+SECTION_CODE = {
+    "cities": (generate_city_data, generate_scaled_city_data),
+    "edges": (generate_edges,),
+    "summary": (generate_summary,),
+    "metrics": (generate_metrics,),
+    "ftz_impact": (generate_ftz_impact,),
+    "trade_routes": (generate_trade_routes,),
+    "trade_routes_index": (generate_trade_routes_index,),
+    "route_index": (generate_route_index,),
+    "cascades": (generate_cascades,),
+    "opportunities": (generate_opportunities,),
+    "opportunities_index": (generate_opportunities_index,),
+}
+
+# Sections each section reads
+SECTION_INPUTS = {
+    "cities": (),
+    "edges": ("cities",),
+    "summary": ("cities", "edges"),
+    "metrics": ("cities", "edges"),
+    "ftz_impact": ("cities", "edges", "metrics"),
+    "trade_routes": ("cities", "edges"),
+    "trade_routes_index": ("trade_routes",),
+    "route_index": ("cities", "edges"),
+    "cascades": ("cities", "edges"),
+    "opportunities": ("cities", "edges", "metrics"),
+    "opportunities_index": ("opportunities",),
+}
+
+@lru_cache(maxsize=None)
+def section_code(section: str) -> str:
+    """Digest of the code a section is built by (see section_cache.code_closure).
+    
+    Besides the section's own entry points this covers what every section goes
+    through: iter_dataset itself (its build closure seeds and caches the section)
+    and the CityIndex and CSRGraph it hands the generators.
+    """
+    return fingerprint(iter_dataset, code_closure(*SECTION_CODE[section], CityIndex, CSRGraph))
+
+def iter_dataset(region: str, num_cities: Optional[int] = None, num_edges: Optional[int] = None,
+                 centrality_samples: Optional[int] = None, seed: int = BASE_SEED,
+                 cache: Optional[SectionCache] = None, trials: int = 0, trials_path: Optional[str] = None,
+                 trial_workers: Optional[int] = None, edge_sampler: str = "uniform", ftz_sweep: int = 0,
+                 ftz_sweep_path: Optional[str] = None) -> Iterator[Tuple[str, object]]:
+    """Yield (section, value) pairs of a region's dataset in AnalysisData order.
+    
+    Each section is computed only when requested, so a streaming writer can emit it
+    before the next one is produced. Edges are yielded as the columnar EdgeTable.
+    
+    Every section draws from its own seed derived from seed, region and section
+    name, so the result does not depend on which other regions or sections are
+    generated. With num_cities set, runs in scale mode: cities are synthesized from
+    the region template instead of taken from the hand-curated list.
+    
+    With a cache, sections whose seed, parameters, code and input sections are
+    unchanged are loaded from it instead of being rebuilt (see section_cache).
+    trials, trials_path and trial_workers configure the Monte Carlo cascade runs
+    (see generate_cascades); trial_workers also runs the opportunity bootstrap.
+    edge_sampler picks how edge endpoints are drawn (see generate_edges).
+    ftz_sweep and ftz_sweep_path configure the FTZ weight sweep (see
+    generate_ftz_impact).
+    """
     print(f"Generating {region} dataset...")
+    dataset = f"{region}-scale" if num_cities is not None else region
+    if num_cities is not None and num_edges is None:
+        num_edges = num_cities * DEFAULT_EDGES_PER_CITY
+    digests = {}
     
-    cities = generate_city_data(region)
-    edges = generate_edges(cities, region)
+    def build(section, params, compute):
+        """Compute one section from its own seed, or load it from the cache."""
+        with tracing.stage(section, "build") as span:
+            section_seed = derive_seed(seed, region, section)
+            if cache is None:
+                random.seed(section_seed)
+                value = compute()
+            else:
+                key = fingerprint(CACHE_FORMAT, section, section_seed, params, section_code(section),
+                                  [digests[name] for name in SECTION_INPUTS[section]])
+                cached = cache.load(dataset, section, key)
+                if cached is not None:
+                    value, digests[section] = cached
+                    span.args["cached"] = True
+                else:
+                    random.seed(section_seed)
+                    value = compute()
+                    digests[section] = cache.store(dataset, section, key, value)
+            span.items = tracing.item_count(value)
+            return value
     
-    dataset = {
-        "generated_at": datetime.now().isoformat(),
-        "summary": generate_summary(cities, edges, region),
-        "cities": cities,
-        "edges": edges,
-        "metrics": generate_metrics(cities, edges),
-        "ftz_impact": generate_ftz_impact(cities, region),
-        "trade_routes": generate_trade_routes(cities, region),
-        "cascades": generate_cascades(cities, region),
-        "opportunities": generate_opportunities(cities, region)
-    }
+    if num_cities is None:
+        cities = build("cities", None, lambda: generate_city_data(region))
+    else:
+        cities = build("cities", num_cities, lambda: generate_scaled_city_data(region, num_cities))
+    with tracing.stage("city_index", "build"):
+        index = CityIndex(cities)
+    
+    edges = build("edges", (num_edges, edge_sampler), lambda: generate_edges(index, region, num_edges, edge_sampler))
+    edges.index = index
+    
+    # Built on first use only, so cached metrics and cascades never need it
+    graphs = []
+    def graph():
+        if not graphs:
+            with tracing.stage("graph", "build"):
+                graphs.append(CSRGraph(len(index), edges.source, edges.target))
+        return graphs[0]
     
-    print(f"  Generated: {len(cities)} cities, {len(edges)} edges, {len(dataset['cascades'])} cascades, {len(dataset['opportunities'])} opportunities")
+    yield "generated_at", datetime.now().isoformat()
+    yield "summary", build("summary", None, lambda: generate_summary(cities, edges, region))
+    yield "cities", cities
+    yield "edges", edges
+    metrics = build("metrics", centrality_samples, lambda: generate_metrics(index, graph(), region, centrality_samples))
+    yield "metrics", metrics
+    yield "ftz_impact", build("ftz_impact", ftz_sweep, lambda: generate_ftz_impact(index, edges, metrics, region,
+                                                                                  ftz_sweep, ftz_sweep_path))
+    trade_routes = build("trade_routes", None, lambda: generate_trade_routes(index, edges, region))
+    yield "trade_routes", trade_routes
+    yield "trade_routes_index", build("trade_routes_index", None, lambda: generate_trade_routes_index(trade_routes))
+    yield "route_index", build("route_index", None, lambda: generate_route_index(index, edges, region))
+    cascades = build("cascades", trials, lambda: generate_cascades(index, edges, graph(), region, trials,
+                                                                    trials_path, trial_workers))
+    yield "cascades", cascades
+    opportunities = build("opportunities", None,
+                          lambda: generate_opportunities(index, edges, metrics, region, trial_workers))
+    yield "opportunities", opportunities
+    yield "opportunities_index", build("opportunities_index", None,
+                                       lambda: generate_opportunities_index(opportunities))
     
-    return dataset
+    print(f"  Generated: {len(cities)} cities, {len(edges)} edges, {len(cascades)} cascades, {len(opportunities)} opportunities")
+    if cache is not None:
+        print(f"  Cache: {cache.hits} sections reused, {cache.misses} rebuilt")
 
-def main():
-    """Generate all three datasets."""
-    regions = ["europe", "world", "regions"]
+def generate_dataset(region: str, num_cities: Optional[int] = None, num_edges: Optional[int] = None,
+                     centrality_samples: Optional[int] = None, seed: int = BASE_SEED,
+                     cache: Optional[SectionCache] = None, trials: int = 0, trials_path: Optional[str] = None,
+                     trial_workers: Optional[int] = None, edge_sampler: str = "uniform", ftz_sweep: int = 0,
+                     ftz_sweep_path: Optional[str] = None) -> Dict:
+    """Generate complete dataset for a region (see iter_dataset)."""
+    return dict(iter_dataset(region, num_cities, num_edges, centrality_samples, seed, cache,
+                             trials, trials_path, trial_workers, edge_sampler, ftz_sweep, ftz_sweep_path))
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Generate synthetic AnalysisData datasets.")
+    parser.add_argument("--regions", nargs="+", choices=REGIONS, default=REGIONS,
+                        help="regions to generate (default: all)")
+    parser.add_argument("--cities", type=int, metavar="N",
+                        help="scale mode: synthesize N cities per region from the region template")
+    parser.add_argument("--edges", type=int, metavar="M",
+                        help=f"scale mode: number of edges (default: {DEFAULT_EDGES_PER_CITY} per city)")
+    parser.add_argument("--edge-sampler", choices=EDGE_SAMPLERS,
+                        help="how edge endpoints are drawn: uniform pairs, or a gravity model over "
+                             "population, GDP per capita and distance (default: gravity in scale mode, "
+                             "else uniform)")
+    parser.add_argument("--centrality-samples", type=int, metavar="K",
+                        help="BFS sources sampled for betweenness/closeness "
+                             "(0 = exact; default: exact up to 2000 cities, else 32)")
+    parser.add_argument("--seed", type=int, default=BASE_SEED,
+                        help=f"base seed every region derives its own seed from (default: {BASE_SEED})")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="reuse sections whose seed, inputs and code are unchanged from DIR, "
+                             "rebuilding (and caching) only the rest")
+    parser.add_argument("--cascade-trials", type=int, metavar="T",
+                        help="Monte Carlo trials per cascade template, adding percentile bands to the "
+                             f"cascades section (default: {DEFAULT_CASCADE_TRIALS}, or 0 in scale mode)")
+    parser.add_argument("--trials-dir", metavar="DIR",
+                        help="directory the per-trial <dataset>-cascade-trials.jsonl files are streamed to "
+                             "(default: --out-dir; not rewritten when the cascades come from the cache)")
+    parser.add_argument("--trial-workers", type=int, metavar="W",
+                        help="worker processes per region for the cascade trials and the opportunity "
+                             "bootstrap (default: the CPU count divided among the regions built at once)")
+    parser.add_argument("--ftz-sweep", type=int, default=0, metavar="V",
+                        help="rank every city under V FTZ weight vectors drawn around the default weights and "
+                             "write how robustly each reaches the top to <dataset>-ftz-sweep.json in --out-dir "
+                             "(not rewritten when the FTZ scores come from the cache)")
+    parser.add_argument("--workers", type=int, metavar="W",
+                        help="worker processes (default: one per region, up to the CPU count)")
+    layout = parser.add_mutually_exclusive_group()
+    layout.add_argument("--compact", dest="compact", action="store_true", default=None,
+                        help="write JSON without indentation (default in scale mode)")
+    layout.add_argument("--pretty", dest="compact", action="store_false",
+                        help="write JSON indented by 2 spaces (default otherwise)")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR,
+                        help="directory the *-data.json files are written to (default: lib/)")
+    parser.add_argument("--shard-dir", metavar="DIR",
+                        help="directory per-section shards and index.json are written to "
+                             "(default: public/data/, or none in scale mode)")
+    parser.add_argument("--no-shards", action="store_true",
+                        help="do not write per-section shards")
+    parser.add_argument("--shard-encoding", choices=SHARD_ENCODINGS, default="json",
+                        help="shard layout: plain JSON (default), or dict, which stores strings once per "
+                             "section and edge descriptions as template + names (decoded by lib/codec.ts)")
+    parser.add_argument("--shard-compression", choices=sorted(SHARD_COMPRESSIONS),
+                        help="compress shards (gzip is decoded by every browser; brotli and zstd need the "
+                             "brotli / zstandard packages here and browser support)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record wall and CPU time, peak RSS and item counts per stage and region, write them "
+                             "to FILE as Chrome trace-event JSON and print a summary table")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also record each stage's peak tracemalloc allocation (slows the run several times)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="sample the stack during generation and write collapsed stacks (flamegraph.pl, "
+                             "speedscope) to FILE")
+    parser.add_argument("--profile-interval", type=float, default=tracing.DEFAULT_PROFILE_INTERVAL_MS, metavar="MS",
+                        help=f"stack sampling interval for --profile (default: {tracing.DEFAULT_PROFILE_INTERVAL_MS:g})")
+    parser.add_argument("--no-validate", dest="validate", action="store_false",
+                        help="skip checking each written dataset against lib/types.ts")
+    parser.add_argument("--delta", action="store_true",
+                        help="diff each dataset against the previous run's file and publish the patch "
+                             "and version chain next to the shards, for clients to update in place")
+    parser.add_argument("--shard-existing", action="append", default=[], metavar="REGION=FILE",
+                        help="shard an existing dataset file (e.g. west-africa=lib/analysis-data.json) "
+                             "into the shard directory instead of generating; may be repeated")
+    parser.add_argument("--columnar-dir", metavar="DIR",
+                        help="also export each region's tables as columnar files under DIR/<region>/ "
+                             "(requires pyarrow)")
+    parser.add_argument("--columnar-format", choices=sorted(COLUMNAR_FORMATS), default="arrow",
+                        help="columnar file format: memory-mappable Arrow IPC (default) or Parquet")
+    args = parser.parse_args(argv)
+    if args.edges is not None and args.cities is None:
+        parser.error("--edges requires --cities")
+    if args.edge_sampler is None:
+        args.edge_sampler = "gravity" if args.cities is not None else "uniform"
+    if args.cascade_trials is None:
+        args.cascade_trials = DEFAULT_CASCADE_TRIALS if args.cities is None else 0
+    elif args.cascade_trials < 0:
+        parser.error("--cascade-trials must not be negative")
+    if args.ftz_sweep < 0:
+        parser.error("--ftz-sweep must not be negative")
+    if args.cities is not None and args.cities < 2:
+        parser.error("--cities must be at least 2")
+    if args.columnar_dir:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--columnar-dir requires pyarrow (pip install pyarrow)")
+    if args.shard_compression == "brotli" and brotli is None:
+        parser.error("--shard-compression brotli requires brotli (pip install brotli)")
+    if args.shard_compression == "zstd" and zstandard is None:
+        parser.error("--shard-compression zstd requires zstandard (pip install zstandard)")
+    for spec in args.shard_existing:
+        if "=" not in spec:
+            parser.error(f"--shard-existing expects REGION=FILE, got {spec!r}")
+    if args.no_shards:
+        args.shard_dir = None
+    elif args.shard_dir is None and (args.cities is None or args.shard_existing):
+        args.shard_dir = DEFAULT_SHARD_DIR
+    if args.delta and not args.shard_dir:
+        parser.error("--delta publishes patches next to the shards and needs a shard directory")
+    return args
+
+def build_region(region: str, args: argparse.Namespace) -> Tuple[str, str, Optional[Dict], int, Optional[Dict]]:
+    """Generate and save one region's dataset.
     
-    for region in regions:
-        dataset = generate_dataset(region)
-        
-        # Save to file
-        filename = f"/Users/meuge/Coding/unified-dashboard/lib/{region}-data.json"
-        with open(filename, "w") as f:
-            json.dump(dataset, f, indent=2)
-        
+    Runs inside pool workers, so the dataset itself never crosses a process boundary;
+    sections are streamed to disk as they are generated. Returns the dataset name,
+    the output filename, the region's shard index entry (None without shards), the
+    number of schema violations in the written file (see dataset_schema) and the
+    run's trace (None unless --trace or --profile is given; see tracing).
+    """
+    # Scaled datasets never overwrite the dashboard's data
+    suffix = "-scale" if args.cities is not None else ""
+    name = f"{region}{suffix}"
+    
+    if args.trace or args.profile:
+        tracing.start(name, args.trace_memory, args.profile_interval if args.profile else None)
+    try:
+        with tracing.stage(name, "dataset"):
+            result = write_region(name, region, args)
+    finally:
+        trace = tracing.stop()
+    return (*result, trace)
+
+def write_region(name: str, region: str, args: argparse.Namespace) -> Tuple[str, str, Optional[Dict], int]:
+    """Generate, write and check one dataset (see build_region)."""
+    cache = SectionCache(args.cache_dir) if args.cache_dir else None
+    trials_path = None
+    if args.cascade_trials:
+        trials_dir = args.trials_dir or args.out_dir
+        os.makedirs(trials_dir, exist_ok=True)
+        trials_path = os.path.join(trials_dir, f"{name}-cascade-trials.jsonl")
+    sweep_path = None
+    if args.ftz_sweep:
+        os.makedirs(args.out_dir, exist_ok=True)
+        sweep_path = os.path.join(args.out_dir, f"{name}-ftz-sweep.json")
+    sections = iter_dataset(region, args.cities, args.edges, args.centrality_samples, args.seed, cache,
+                            args.cascade_trials, trials_path, args.trial_workers, args.edge_sampler,
+                            args.ftz_sweep, sweep_path)
+    
+    filename = os.path.join(args.out_dir, f"{name}-data.json")
+    compact = args.compact if args.compact is not None else args.cities is not None
+    previous = load_previous(filename) if args.delta else None
+    
+    # Shard and export each section as it streams past; only the map tiles need sections afterwards
+    captured = {}
+    shards = {"generated_at": None, "sections": {}}
+    columnar = None
+    if args.columnar_dir:
+        columnar = ColumnarExport(os.path.join(args.columnar_dir, name), args.columnar_format)
+    def tap(pairs):
+        for key, value in pairs:
+            if args.shard_dir:
+                if key in ("cities", "edges"):
+                    captured[key] = value
+                if key == "generated_at":
+                    shards["generated_at"] = value
+                with tracing.stage(key, "shard"):
+                    shards["sections"][key] = write_shard(args.shard_dir, name, key, value, args.shard_encoding,
+                                                          args.shard_compression, DESCRIPTION_TEMPLATES)
+            if columnar is not None:
+                with tracing.stage(key, "export"):
+                    columnar.add(key, value)
+            # The consumer serializes the section before asking for the next one
+            with tracing.stage(key, "write") as span:
+                span.items = tracing.item_count(value)
+                yield key, value
+    
+    write_dataset(tap(sections), filename, indent=None if compact else 2)
+    
+    violations = 0
+    if args.validate:
+        with tracing.stage("schema", "validate"):
+            report = validate_file(filename)
+        violations = report.count
+        if violations:
+            print(format_violations(filename, report))
+        else:
+            print(f"  Schema: {name} matches lib/types.ts")
+    
+    if args.shard_dir:
+        with tracing.stage("tiles", "publish"):
+            shards["tiles"] = write_map_tiles(args.shard_dir, name, captured["cities"], captured["edges"])
+    
+    if args.delta:
+        with tracing.stage("delta", "publish"):
+            with open(filename) as f:
+                dataset = json.load(f)
+            chain = load_shard_index(args.shard_dir)["regions"].get(name)
+            shards.update(publish_patch(args.shard_dir, name, previous, dataset, chain))
+        if previous is None:
+            print(f"  Delta: {name} starts a version chain at {shards['version']}")
+        elif dataset_version(previous) == shards["version"]:
+            print(f"  Delta: {name} unchanged at version {shards['version']}")
+        else:
+            patch = shards["patches"][-1]
+            print(f"  Delta: {name} {patch['from']} -> {patch['to']}, {patch['bytes']} byte patch")
+    
+    if columnar is not None:
+        manifest = columnar.close()
+        print(f"  Columnar export: {manifest}")
+    
+    return name, filename, shards if args.shard_dir else None, violations
+
+def load_previous(filename: str) -> Optional[Dict]:
+    """The dataset a previous run wrote to filename, or None if there is no readable one."""
+    try:
+        with open(filename) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_map_tiles(shard_dir: str, region: str, cities: List[Dict], edges: EdgeTable) -> Dict:
+    """Write the region's map tile pyramid to shard_dir/<region>/tiles; returns its shard index entry."""
+    tiles = write_tiles(os.path.join(shard_dir, region, "tiles"), cities, edges.source, edges.target,
+                        edges.edge_type, edges.edge_types, edges.volume, edges.weight, edges.is_active)
+    print(f"  Map tiles: {len(tiles['tiles'])} up to zoom {tiles['max_zoom']}")
+    return {"index": f"{region}/tiles/index.json", "tiles": len(tiles["tiles"]), "max_zoom": tiles["max_zoom"]}
+
+def shard_existing(specs: List[str], shard_dir: str, encoding: str = "json",
+                   compression: Optional[str] = None) -> Dict[str, Dict]:
+    """Shard already generated dataset files given as REGION=FILE; returns their index entries.
+    
+    Datasets without a route index or table indexes get them built from their
+    sections, and every dataset gets its map tiles.
+    """
+    entries = {}
+    for spec in specs:
+        region, path = spec.split("=", 1)
+        with open(path) as f:
+            dataset = json.load(f)
+        index = CityIndex(dataset["cities"])
+        edges = EdgeTable.from_records(index, dataset["edges"])
+        if "route_index" not in dataset:
+            dataset["route_index"] = generate_route_index(index, edges, region)
+        if "trade_routes_index" not in dataset:
+            dataset["trade_routes_index"] = generate_trade_routes_index(dataset["trade_routes"])
+        if "opportunities_index" not in dataset:
+            dataset["opportunities_index"] = generate_opportunities_index(dataset["opportunities"])
+        entries[region] = shard_dataset(dataset, shard_dir, region, encoding, compression, DESCRIPTION_TEMPLATES)
+        entries[region]["tiles"] = write_map_tiles(shard_dir, region, dataset["cities"], edges)
+        print(f"  Sharded {path} as {region}")
+    return entries
+
+def main(argv: Optional[List[str]] = None):
+    """Generate all requested datasets, one region per worker process."""
+    args = parse_args(argv)
+    
+    if args.shard_existing:
+        entries = shard_existing(args.shard_existing, args.shard_dir, args.shard_encoding, args.shard_compression)
+        index = update_shard_index(args.shard_dir, entries)
+        print(f"  Shard index: {index}")
+        return
+    
+    os.makedirs(args.out_dir, exist_ok=True)
+    
+    regions = list(dict.fromkeys(args.regions))
+    cpus = os.cpu_count() or 1
+    workers = min(args.workers or cpus, len(regions))
+    if args.trial_workers is None:
+        # Regions built at once share the CPUs rather than each starting a CPU-sized pool of its own
+        args.trial_workers = max(1, cpus // max(1, workers))
+    if workers <= 1:
+        results = [build_region(region, args) for region in regions]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(build_region, regions, [args] * len(regions)))
+    
+    for _, filename, _, _, _ in results:
         print(f"  Saved to: {filename}")
     
+    if args.shard_dir:
+        index = update_shard_index(args.shard_dir, {name: shards for name, _, shards, _, _ in results})
+        print(f"  Shard index: {index}")
+    
+    traces = [trace for *_, trace in results if trace is not None]
+    if traces:
+        print("\n" + tracing.summary_table(traces))
+    if args.trace:
+        with open(args.trace, "w") as f:
+            json.dump(tracing.chrome_trace(traces), f)
+        print(f"  Trace: {args.trace}")
+    if args.profile:
+        with open(args.profile, "w") as f:
+            f.write(tracing.folded_stacks(traces))
+        print(f"  Profile: {args.profile}")
+    
+    invalid = [name for name, _, _, violations, _ in results if violations]
+    if invalid:
+        print(f"\nSchema violations in: {', '.join(invalid)}")
+        sys.exit(1)
     print("\nAll datasets generated successfully!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
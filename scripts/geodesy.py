@@ -0,0 +1,168 @@
+"""
+Great-circle distances between cities.
+
+Cities are turned once into unit vectors on the sphere (UnitVectors), after
+which the distance of a pair is 2R * asin(chord / 2) of the straight chord
+between their vectors: one math.dist (in C) and one asin per pair, with no
+per-pair trigonometry on latitudes and longitudes. The chord form is exact for
+the sphere, well conditioned for nearby cities and needs no special case at
+the antimeridian.
+
+distances_km runs the kernel over whole source/target columns. For dense
+graphs on a few thousand cities, DistanceMatrix precomputes every pair once
+so each edge's distance is a single lookup. PointTree answers nearest-city
+queries, since the nearest point by chord is also the nearest by great circle.
+"""
+
+import math
+from array import array
+from typing import List, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Largest city count a pairwise distance matrix is built for (n^2 float32 cells)
+DISTANCE_MATRIX_MAX_CITIES = 4096
+
+# Edges per city pair above which a graph counts as dense
+DENSE_EDGE_FRACTION = 0.25
+
+# Points per PointTree leaf
+TREE_LEAF_SIZE = 16
+
+
+def great_circle_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Haversine distance in km between two points given in degrees."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class UnitVectors:
+    """(x, y, z) unit vectors of points given by lat/lng columns in degrees."""
+
+    def __init__(self, lat: Sequence[float], lng: Sequence[float]):
+        rad = math.pi / 180.0
+        cos, sin = math.cos, math.sin
+        self.points: List[Tuple[float, float, float]] = [
+            (cos(a * rad) * cos(b * rad), cos(a * rad) * sin(b * rad), sin(a * rad)) for a, b in zip(lat, lng)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+
+def chord_to_km(chord: float) -> float:
+    """Great-circle distance in km of a chord between unit vectors."""
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(1.0, 0.5 * chord))
+
+
+def distances_km(vectors: UnitVectors, sources: Sequence[int], targets: Sequence[int]) -> List[float]:
+    """Great-circle distance in km of every (sources[i], targets[i]) pair."""
+    points = vectors.points
+    diameter = 2.0 * EARTH_RADIUS_KM
+    dist, asin = math.dist, math.asin
+    return [diameter * asin(min(1.0, 0.5 * dist(points[s], points[t]))) for s, t in zip(sources, targets)]
+
+
+def is_dense(num_cities: int, num_edges: int) -> bool:
+    """Whether a graph is dense and small enough to be served from a DistanceMatrix."""
+    pairs = num_cities * (num_cities - 1) // 2
+    return 1 < num_cities <= DISTANCE_MATRIX_MAX_CITIES and num_edges >= DENSE_EDGE_FRACTION * pairs
+
+
+class DistanceMatrix:
+    """All pairwise great-circle distances (km, float32) of a set of points, row-major."""
+
+    def __init__(self, vectors: UnitVectors):
+        n = len(vectors)
+        self.size = n
+        self.values = array("f")
+        everyone = range(n)
+        for i in everyone:
+            self.values.extend(distances_km(vectors, [i] * n, everyone))
+
+    def lookup(self, sources: Sequence[int], targets: Sequence[int]) -> List[float]:
+        """Distances of every (sources[i], targets[i]) pair."""
+        values, n = self.values, self.size
+        return [values[s * n + t] for s, t in zip(sources, targets)]
+
+
+class PointTree:
+    """k-d tree over some of the points of a UnitVectors, for nearest-point queries.
+
+    Nodes are stored flat: a leaf is (-1, start, end) into the member order, an
+    inner node (axis, -1, right child), its left child following it. Every node
+    keeps the bounding box of its points (lows[node], highs[node]); queries skip
+    a node whose box is no nearer than the best point so far, which prunes a
+    tight cluster of points as a whole rather than one split plane at a time.
+    """
+
+    def __init__(self, vectors: UnitVectors, members: Sequence[int]):
+        self.points = vectors.points
+        self.order = list(members)
+        self.nodes: List[Tuple[int, int, int]] = []
+        self.lows: List[Tuple[float, float, float]] = []
+        self.highs: List[Tuple[float, float, float]] = []
+        if self.order:
+            self._build(0, len(self.order))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _build(self, start: int, end: int) -> None:
+        points, order = self.points, self.order
+        members = [points[v] for v in order[start:end]]
+        low = tuple(map(min, zip(*members)))
+        high = tuple(map(max, zip(*members)))
+        node = len(self.nodes)
+        self.nodes.append(None)
+        self.lows.append(low)
+        self.highs.append(high)
+        if end - start <= TREE_LEAF_SIZE:
+            self.nodes[node] = (-1, start, end)
+            return
+        spans = [h - l for l, h in zip(low, high)]
+        axis = spans.index(max(spans))
+        order[start:end] = sorted(order[start:end], key=lambda v: points[v][axis])
+        middle = (start + end) // 2
+        self._build(start, middle)
+        self.nodes[node] = (axis, -1, len(self.nodes))
+        self._build(middle, end)
+
+    def nearest(self, point: Tuple[float, float, float], bound: float = math.inf) -> Tuple[float, int]:
+        """(chord, member) of the member nearest to point, or (bound, -1) if none is nearer than bound."""
+        best, found = bound, -1
+        if not self.nodes:
+            return best, found
+        points, order, nodes, lows, highs, dist = self.points, self.order, self.nodes, self.lows, self.highs, math.dist
+        x, y, z = point
+        # Squared chords from here on; a node's gap is its bounding box's nearest corner, edge or face
+        best_sq = best * best
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            lx, ly, lz = lows[node]
+            hx, hy, hz = highs[node]
+            dx = lx - x if x < lx else (x - hx if x > hx else 0.0)
+            dy = ly - y if y < ly else (y - hy if y > hy else 0.0)
+            dz = lz - z if z < lz else (z - hz if z > hz else 0.0)
+            if dx * dx + dy * dy + dz * dz >= best_sq:
+                continue
+            axis, a, b = nodes[node]
+            if axis < 0:
+                for v in order[a:b]:
+                    d = dist(point, points[v])
+                    if d < best:
+                        best, found = d, v
+                        best_sq = d * d
+                continue
+            # Nearer child (the one on the point's side of the split) on top of the stack
+            if point[axis] - highs[node + 1][axis] > lows[b][axis] - point[axis]:
+                stack.append(node + 1)
+                stack.append(b)
+            else:
+                stack.append(b)
+                stack.append(node + 1)
+        return best, found
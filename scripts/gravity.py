@@ -0,0 +1,136 @@
+"""
+Gravity-model sampling of edge endpoints.
+
+An edge leaves city s with probability proportional to its mass (population x
+GDP per capita) and lands on city t with probability proportional to
+mass(t) / distance(s, t)^GRAVITY_EXPONENT, so trade links are mostly local and
+between large economies. Drawing t exactly would cost O(N) per edge; instead
+cities are bucketed into a lat/lng grid and the gravity pull is evaluated
+between cells: each source cell gets an alias table over the target cells
+(weighted by cell mass over centroid distance) and each cell an alias table
+over its own cities (weighted by mass). A draw is then a handful of O(1)
+alias lookups, and the tables cost O(cells^2 + N) to build, with the grid
+coarsened until it has at most MAX_GRAVITY_CELLS cells.
+"""
+
+import math
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from geodesy import UnitVectors, distances_km
+
+# Distance decay of the gravity pull
+GRAVITY_EXPONENT = 2.0
+
+# Initial grid cell size in degrees, doubled until the grid is small enough
+GRAVITY_CELL_DEG = 0.5
+
+# Most non-empty cells the cell-to-cell tables are built for
+MAX_GRAVITY_CELLS = 1024
+
+# Distance floor in km, so a city's own cell does not get an infinite pull
+GRAVITY_MIN_KM = 25.0
+
+# Target draws that land on the source itself before falling back to a uniform target
+MAX_SELF_DRAWS = 8
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted draw."""
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0:
+            raise ValueError("alias table needs at least one weight")
+        if total <= 0:
+            weights, total = [1.0] * n, float(n)
+        scaled = [w * n / total for w in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        self.size = n
+
+    def draw(self, rand) -> int:
+        """One index drawn with probability proportional to its weight (rand() in [0, 1))."""
+        i = int(rand() * self.size)
+        return i if rand() < self.prob[i] else self.alias[i]
+
+
+class GravitySampler:
+    """Draws (source, target) city pairs from the gravity model.
+
+    mass is per city; lat/lng in degrees. Tables for a source cell are built
+    the first time a source in it is drawn.
+    """
+
+    def __init__(self, lat: Sequence[float], lng: Sequence[float], mass: Sequence[float]):
+        self.num_cities = len(mass)
+        self.sources = AliasTable(mass)
+
+        size = GRAVITY_CELL_DEG
+        while True:
+            cells: Dict[Tuple[int, int], List[int]] = {}
+            for v, (a, b) in enumerate(zip(lat, lng)):
+                cells.setdefault((int(math.floor(a / size)), int(math.floor(b / size))), []).append(v)
+            if len(cells) <= MAX_GRAVITY_CELLS or size >= 180.0:
+                break
+            size *= 2
+        self.cell_deg = size
+
+        self.members = list(cells.values())
+        self.cell_of = [0] * self.num_cities
+        cell_mass, centroid_lat, centroid_lng = [], [], []
+        for c, members in enumerate(self.members):
+            for v in members:
+                self.cell_of[v] = c
+            cell_mass.append(sum(mass[v] for v in members))
+            # Longitudes are averaged on the unit circle so cells at the antimeridian stay put
+            centroid_lat.append(sum(lat[v] for v in members) / len(members))
+            x = sum(math.cos(math.radians(lng[v])) for v in members)
+            y = sum(math.sin(math.radians(lng[v])) for v in members)
+            centroid_lng.append(math.degrees(math.atan2(y, x)))
+        self.cell_mass = cell_mass
+        self.centroids = UnitVectors(centroid_lat, centroid_lng)
+        self.within = [AliasTable([mass[v] for v in members]) for members in self.members]
+        self.targets: List[Optional[AliasTable]] = [None] * len(self.members)
+
+    def _target_table(self, cell: int) -> AliasTable:
+        table = self.targets[cell]
+        if table is None:
+            k = len(self.members)
+            distance = distances_km(self.centroids, [cell] * k, range(k))
+            table = AliasTable([m / max(GRAVITY_MIN_KM, d) ** GRAVITY_EXPONENT
+                                for m, d in zip(self.cell_mass, distance)])
+            self.targets[cell] = table
+        return table
+
+    def sample(self, rng: random.Random, count: int) -> Tuple[List[int], List[int]]:
+        """count (source, target) pairs with source != target, as two columns."""
+        rand = rng.random
+        members, within, cell_of = self.members, self.within, self.cell_of
+        sources, targets = [], []
+        if self.num_cities < 2:
+            return sources, targets
+        n = self.num_cities
+        for _ in range(count):
+            s = self.sources.draw(rand)
+            table = self._target_table(cell_of[s])
+            for _ in range(MAX_SELF_DRAWS):
+                cell = table.draw(rand)
+                t = members[cell][within[cell].draw(rand)]
+                if t != s:
+                    break
+            else:
+                # s holds nearly all of its neighborhood's mass; fall back to a uniform target
+                t = (s + 1 + int(rand() * (n - 1))) % n
+            sources.append(s)
+            targets.append(t)
+        return sources, targets
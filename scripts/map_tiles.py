@@ -0,0 +1,237 @@
+"""
+Level-of-detail map tiles for the dashboard's map.
+
+Cities are placed in a Web Mercator quadtree: a tile holding more than
+LEAF_CITIES cities is split into its four children at the next zoom, down to
+MAX_ZOOM. Split tiles carry clusters instead of cities (every city in the same
+CLUSTER_CELL_PX grid cell merged into one marker) and their edges bundled
+between clusters, summed by volume per edge type and cut to the
+MAX_TILE_EDGES heaviest bundles; leaf tiles carry the cities themselves and
+their edges, parallel edges of one type merged. An edge is stored in the
+tiles of both its endpoints, with an id the map uses to draw it once.
+
+Tiles are written to <tile_dir>/<z>/<x>/<y>.json next to an index.json that
+maps every tile to its city count, from which the map works out which tiles
+cover its viewport without requesting tiles that do not exist.
+"""
+
+import json
+import math
+import os
+import shutil
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Cities above which a tile is split into its four children
+LEAF_CITIES = 64
+
+# Deepest zoom level; tiles there are leaves whatever their size
+MAX_ZOOM = 16
+
+# Tile and cluster cell sizes in screen pixels
+TILE_PX = 256
+CLUSTER_CELL_PX = 32
+
+# Heaviest edge bundles kept per split tile
+MAX_TILE_EDGES = 512
+
+# Web Mercator latitude limit
+MAX_LATITUDE = 85.05112878
+
+CELLS_PER_TILE = TILE_PX // CLUSTER_CELL_PX
+
+
+def project(lat: float, lng: float) -> Tuple[float, float]:
+    """Web Mercator position as fractions of the world width and height, in [0, 1)."""
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    x = (lng + 180.0) / 360.0
+    s = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)
+    return min(max(x, 0.0), 1.0 - 1e-12), min(max(y, 0.0), 1.0 - 1e-12)
+
+
+def _cell(fx: float, fy: float, zoom: int) -> Tuple[int, int]:
+    scale = (1 << zoom) * CELLS_PER_TILE
+    return int(fx * scale), int(fy * scale)
+
+
+def _point(lat: float, lng: float) -> List[float]:
+    return [round(lat, 4), round(lng, 4)]
+
+
+class _Clusters:
+    """Grid clusters of every city at one zoom, built on first use of each cell."""
+
+    def __init__(self, cities: Sequence[Dict], fx: Sequence[float], fy: Sequence[float], zoom: int,
+                 type_names: Sequence[str]):
+        self.zoom = zoom
+        self.type_names = type_names
+        self.cell = [_cell(x, y, zoom) for x, y in zip(fx, fy)]
+        self.members: Dict[Tuple[int, int], List[int]] = {}
+        for v, cell in enumerate(self.cell):
+            self.members.setdefault(cell, []).append(v)
+        self.cities = cities
+        self.centers: Dict[Tuple[int, int], List[float]] = {}
+
+    def key(self, cell: Tuple[int, int]) -> str:
+        return f"{self.zoom}/{cell[0]}/{cell[1]}"
+
+    def center(self, cell: Tuple[int, int]) -> List[float]:
+        center = self.centers.get(cell)
+        if center is None:
+            members = self.members[cell]
+            center = _point(sum(self.cities[v]["lat"] for v in members) / len(members),
+                            sum(self.cities[v]["lng"] for v in members) / len(members))
+            self.centers[cell] = center
+        return center
+
+    def describe(self, key: Tuple) -> Tuple:
+        """Bundle description (see _finish) of a (cell, cell, edge type code) key."""
+        a, b, code = key
+        edge_type = self.type_names[code]
+        return (f"{self.key(a)}|{self.key(b)}|{edge_type}", self.center(a), self.center(b), edge_type)
+
+    def record(self, cell: Tuple[int, int]) -> Dict:
+        members = self.members[cell]
+        top = self.cities[max(members, key=lambda v: self.cities[v]["population"])]
+        return {
+            "id": self.key(cell),
+            "lat": self.center(cell)[0],
+            "lng": self.center(cell)[1],
+            "count": len(members),
+            "population": sum(self.cities[v]["population"] for v in members),
+            "ftz_targets": sum(1 for v in members if self.cities[v]["is_ftz_target"]),
+            "city": top["id"],
+            "name": top["name"],
+            "bloc": top["bloc"],
+        }
+
+
+def _incidence(num_nodes: int, sources: Sequence[int], targets: Sequence[int],
+               active: Sequence[int]) -> Tuple[List[int], List[int]]:
+    """Active edge ids per city in CSR form (offsets, edge ids)."""
+    counts = [0] * (num_nodes + 1)
+    for s, t, a in zip(sources, targets, active):
+        if a and s != t:
+            counts[s + 1] += 1
+            counts[t + 1] += 1
+    for v in range(num_nodes):
+        counts[v + 1] += counts[v]
+    cursor = counts[:-1]
+    incident = [0] * counts[-1]
+    for e, (s, t, a) in enumerate(zip(sources, targets, active)):
+        if a and s != t:
+            for v in (s, t):
+                incident[cursor[v]] = e
+                cursor[v] += 1
+    return counts, incident
+
+
+def _bundle(bundles: Dict[Tuple, List], key: Tuple, volume: int, weight: float) -> None:
+    bundle = bundles.get(key)
+    if bundle is None:
+        bundles[key] = [1, volume, weight]
+    else:
+        bundle[0] += 1
+        bundle[1] += volume
+        bundle[2] += weight
+
+
+def _finish(bundles: Dict[Tuple, List], describe: Callable[[Tuple], Tuple], limit: int = 0) -> List[Dict]:
+    """Edge records of the bundles, heaviest first; describe maps a key to (id, from, to, edge_type)."""
+    keys = sorted(bundles, key=lambda k: (-bundles[k][1], k))
+    if limit:
+        keys = keys[:limit]
+    edges = []
+    for key in keys:
+        count, volume, weight = bundles[key]
+        edge_id, start, end, edge_type = describe(key)
+        edges.append({"id": edge_id, "from": start, "to": end, "edge_type": edge_type,
+                      "count": count, "volume": volume, "weight": round(weight / count, 3)})
+    return edges
+
+
+def write_tiles(tile_dir: str, cities: Sequence[Dict], sources: Sequence[int], targets: Sequence[int],
+                edge_types: Sequence[int], type_names: Sequence[str], volumes: Sequence[int],
+                weights: Sequence[float], active: Sequence[int]) -> Dict:
+    """Build the tile pyramid of a dataset into tile_dir (replacing any previous one).
+
+    The edge columns use city positions and edge type codes (type_names maps
+    codes to names); only active edges are drawn. Returns the tile index.
+    """
+    n = len(cities)
+    fx, fy = [], []
+    for city in cities:
+        x, y = project(city["lat"], city["lng"])
+        fx.append(x)
+        fy.append(y)
+    offsets, incident = _incidence(n, sources, targets, active)
+
+    def describe_cities(key):
+        a, b, code = cities[key[0]], cities[key[1]], key[2]
+        return (f"{a['id']}|{b['id']}|{type_names[code]}", _point(a["lat"], a["lng"]),
+                _point(b["lat"], b["lng"]), type_names[code])
+
+    shutil.rmtree(tile_dir, ignore_errors=True)
+    tiles: Dict[str, int] = {}
+    max_zoom = 0
+    level = [(0, 0, list(range(n)))] if n else []
+    zoom = 0
+    while level:
+        max_zoom = zoom
+        clusters = None
+        children: Dict[Tuple[int, int], List[int]] = {}
+        for x, y, members in level:
+            leaf = len(members) <= LEAF_CITIES or zoom == MAX_ZOOM
+            tile = {"zoom": zoom, "x": x, "y": y, "leaf": leaf}
+            bundles: Dict[Tuple, List] = {}
+            inside = set(members)
+            if leaf:
+                tile["cities"] = [cities[v] for v in members]
+                for v in members:
+                    for e in incident[offsets[v]:offsets[v + 1]]:
+                        s, t = sources[e], targets[e]
+                        w = t if s == v else s
+                        if w in inside and w < v:
+                            continue  # drawn from its other endpoint
+                        key = (v, w, edge_types[e]) if v < w else (w, v, edge_types[e])
+                        _bundle(bundles, key, volumes[e], weights[e])
+                tile["edges"] = _finish(bundles, describe_cities)
+            else:
+                if clusters is None:
+                    clusters = _Clusters(cities, fx, fy, zoom, type_names)
+                cells = sorted({clusters.cell[v] for v in members})
+                tile["clusters"] = [clusters.record(cell) for cell in cells]
+                for v in members:
+                    cv = clusters.cell[v]
+                    for e in incident[offsets[v]:offsets[v + 1]]:
+                        s, t = sources[e], targets[e]
+                        w = t if s == v else s
+                        cw = clusters.cell[w]
+                        if cw == cv or (w in inside and w < v):
+                            continue
+                        key = (cv, cw, edge_types[e]) if cv < cw else (cw, cv, edge_types[e])
+                        _bundle(bundles, key, volumes[e], weights[e])
+                tile["edges"] = _finish(bundles, clusters.describe, MAX_TILE_EDGES)
+                for v in members:
+                    child = (int(fx[v] * (2 << zoom)), int(fy[v] * (2 << zoom)))
+                    children.setdefault(child, []).append(v)
+
+            path = os.path.join(tile_dir, str(zoom), str(x))
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, f"{y}.json"), "w") as f:
+                f.write(json.dumps(tile, separators=(",", ":")))
+            tiles[f"{zoom}/{x}/{y}"] = len(members)
+
+        level = [(x, y, members) for (x, y), members in sorted(children.items())]
+        zoom += 1
+
+    index = {
+        "tile_px": TILE_PX,
+        "cell_px": CLUSTER_CELL_PX,
+        "leaf_cities": LEAF_CITIES,
+        "max_zoom": max_zoom,
+        "tiles": tiles,
+    }
+    with open(os.path.join(tile_dir, "index.json"), "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    return index
@@ -0,0 +1,236 @@
+"""
+Opportunity signals from a ridge regression of trade on city fundamentals.
+
+fit_signals explains every city's trade, as its percentile rank (0 to 1) by the
+summed volume of its active edges, from its fundamentals: log population, log
+GDP per capita, trade openness, ease of business and network degree
+(standardized, plus an intercept). One ridge fit on all cities gives each
+city's model_score; the residual actual - model is its gap, positive where a
+city trades more than its fundamentals predict.
+
+Confidence comes from a bootstrap of the fit. Cities are dealt at random into
+BOOTSTRAP_BLOCKS blocks whose sufficient statistics (X'X, X'y) are summed once,
+so a resample draws blocks with replacement and refits from their summed
+statistics without touching the cities again. The resampled coefficients give
+the spread of each city's model score, and its confidence is the probability,
+under that spread, that its gap has the sign it was observed with. Resamples
+run in chunks across a process pool, each from its own seed, so results do not
+depend on the number of workers.
+
+A city is an OPPORTUNITY when its gap is at least SIGNAL_SD residual standard
+deviations, a RISK at most -SIGNAL_SD, and NEUTRAL (on watch) when |gap| is at
+least WATCH_SD; cities closer to their fundamentals get no signal.
+"""
+
+import math
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from operator import mul
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Ridge penalty on the standardized feature coefficients (the intercept is not penalized)
+RIDGE_ALPHA = 1.0
+
+# Bootstrap resamples of the fit
+BOOTSTRAP_RESAMPLES = 200
+
+# Blocks the cities are dealt into for the bootstrap
+BOOTSTRAP_BLOCKS = 256
+
+# Resamples handed to a worker at a time
+BOOTSTRAP_CHUNK_SIZE = 50
+
+# Gap, in residual standard deviations, of an OPPORTUNITY or RISK signal
+SIGNAL_SD = 1.0
+
+# Gap, in residual standard deviations, from which a city is on watch (NEUTRAL)
+WATCH_SD = 0.5
+
+_blocks: Optional[List[Tuple[List[float], List[float]]]] = None
+
+
+def _init_worker(blocks: List[Tuple[List[float], List[float]]]) -> None:
+    global _blocks
+    _blocks = blocks
+
+
+def _standardized(values: Sequence[float]) -> List[float]:
+    n = len(values)
+    mean = sum(values) / n
+    sd = math.sqrt(sum((v - mean) ** 2 for v in values) / n)
+    return [(v - mean) / sd for v in values] if sd > 0 else [0.0] * n
+
+
+def design_columns(cities: Sequence[Dict], degree: Sequence[float]) -> List[List[float]]:
+    """Intercept and standardized feature columns of the regression, one value per city."""
+    raw = [
+        [math.log(max(1, c["population"])) for c in cities],
+        [math.log(max(1.0, c["gdp_per_capita"])) for c in cities],
+        [c["trade_openness"] for c in cities],
+        [c["ease_of_business"] for c in cities],
+        list(degree),
+    ]
+    return [[1.0] * len(cities)] + [_standardized(column) for column in raw]
+
+
+def trade_outcome(n: int, sources: Sequence[int], targets: Sequence[int], volumes: Sequence[int],
+                  active: Sequence[int]) -> List[float]:
+    """Percentile rank of every city by active edge volume (ties share their mean rank)."""
+    volume = [0.0] * n
+    for s, t, vol, a in zip(sources, targets, volumes, active):
+        if a and s != t:
+            volume[s] += vol
+            volume[t] += vol
+    order = sorted(range(n), key=volume.__getitem__)
+    ranks = [0.0] * n
+    start = 0
+    while start < n:
+        end = start
+        while end + 1 < n and volume[order[end + 1]] == volume[order[start]]:
+            end += 1
+        for i in order[start:end + 1]:
+            ranks[i] = (start + end) / 2 / max(1, n - 1)
+        start = end + 1
+    return ranks
+
+
+def block_statistics(columns: List[List[float]], outcome: Sequence[float],
+                     blocks: Sequence[Sequence[int]]) -> List[Tuple[List[float], List[float]]]:
+    """(X'X upper triangle row by row, X'y) of every block of city positions."""
+    p = len(columns)
+    stats = []
+    for block in blocks:
+        cols = [[column[i] for i in block] for column in columns]
+        y = [outcome[i] for i in block]
+        xtx = [sum(map(mul, cols[j], cols[k])) for j in range(p) for k in range(j, p)]
+        stats.append((xtx, [sum(map(mul, col, y)) for col in cols]))
+    return stats
+
+
+def solve_ridge(xtx: Sequence[float], xty: Sequence[float], alpha: float = RIDGE_ALPHA) -> List[float]:
+    """Coefficients minimizing |y - Xb|^2 + alpha |b[1:]|^2 from X'X (upper triangle) and X'y."""
+    p = len(xty)
+    a = [[0.0] * p for _ in range(p)]
+    pos = 0
+    for j in range(p):
+        for k in range(j, p):
+            a[j][k] = a[k][j] = xtx[pos]
+            pos += 1
+        if j:
+            a[j][j] += alpha
+    b = list(xty)
+    # Gaussian elimination with partial pivoting
+    for col in range(p):
+        pivot = max(range(col, p), key=lambda r: abs(a[r][col]))
+        if abs(a[pivot][col]) < 1e-12:
+            continue
+        a[col], a[pivot] = a[pivot], a[col]
+        b[col], b[pivot] = b[pivot], b[col]
+        for r in range(col + 1, p):
+            f = a[r][col] / a[col][col]
+            if f:
+                for c in range(col, p):
+                    a[r][c] -= f * a[col][c]
+                b[r] -= f * b[col]
+    coef = [0.0] * p
+    for r in range(p - 1, -1, -1):
+        if abs(a[r][r]) >= 1e-12:
+            coef[r] = (b[r] - sum(a[r][c] * coef[c] for c in range(r + 1, p))) / a[r][r]
+    return coef
+
+
+def _resample_chunk(seeds: Sequence[int]) -> List[List[float]]:
+    """Coefficients of one bootstrap resample per seed, from the worker's block statistics."""
+    size = len(_blocks[0][0])
+    p = len(_blocks[0][1])
+    results = []
+    for seed in seeds:
+        rng = random.Random(seed)
+        counts = [0] * len(_blocks)
+        for b in rng.choices(range(len(_blocks)), k=len(_blocks)):
+            counts[b] += 1
+        xtx, xty = [0.0] * size, [0.0] * p
+        for count, (block_xtx, block_xty) in zip(counts, _blocks):
+            if count:
+                for i, v in enumerate(block_xtx):
+                    xtx[i] += count * v
+                for i, v in enumerate(block_xty):
+                    xty[i] += count * v
+        results.append(solve_ridge(xtx, xty))
+    return results
+
+
+def bootstrap_coefficients(blocks: List[Tuple[List[float], List[float]]], seeds: Sequence[int],
+                           workers: Optional[int] = None) -> List[List[float]]:
+    """Ridge coefficients of one block bootstrap resample per seed, in seed order.
+
+    workers defaults to the CPU count, or to 1 inside a worker process, where a
+    pool per caller would multiply into CPU count squared processes.
+    """
+    chunks = [seeds[i:i + BOOTSTRAP_CHUNK_SIZE] for i in range(0, len(seeds), BOOTSTRAP_CHUNK_SIZE)]
+    if not workers:
+        workers = 1 if multiprocessing.parent_process() else os.cpu_count() or 1
+    workers = min(max(1, workers), max(1, len(chunks)))
+    if workers == 1:
+        _init_worker(blocks)
+        results = [_resample_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(blocks,)) as pool:
+            results = list(pool.map(_resample_chunk, chunks))
+    return [coef for chunk in results for coef in chunk]
+
+
+def _normal_cdf(z: float) -> float:
+    return 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+
+
+def fit_signals(cities: Sequence[Dict], degree: Sequence[float], sources: Sequence[int], targets: Sequence[int],
+                volumes: Sequence[int], active: Sequence[int], rng: random.Random,
+                resamples: int = BOOTSTRAP_RESAMPLES, workers: Optional[int] = None) -> List[Dict]:
+    """Signal of every city with one (see the module docstring), in city order.
+
+    Each signal has the city position and its signal_type, gap, model_score,
+    actual_score and confidence (unrounded).
+    """
+    n = len(cities)
+    if n == 0:
+        return []
+    columns = design_columns(cities, degree)
+    outcome = trade_outcome(n, sources, targets, volumes, active)
+
+    coef = solve_ridge(*block_statistics(columns, outcome, [range(n)])[0])
+    rows = list(zip(*columns))
+    model = [sum(map(mul, row, coef)) for row in rows]
+    gaps = [y - m for y, m in zip(outcome, model)]
+    dof = max(1, n - len(columns))
+    sigma = math.sqrt(sum(g * g for g in gaps) / dof)
+    if sigma == 0:
+        return []
+
+    # Bootstrap covariance of the coefficients
+    order = list(range(n))
+    rng.shuffle(order)
+    count = min(n, BOOTSTRAP_BLOCKS)
+    blocks = block_statistics(columns, outcome, [order[b::count] for b in range(count)])
+    samples = bootstrap_coefficients(blocks, [rng.getrandbits(64) for _ in range(resamples)], workers)
+    p = len(coef)
+    means = [sum(s[j] for s in samples) / len(samples) for j in range(p)]
+    cov = [[sum((s[j] - means[j]) * (s[k] - means[k]) for s in samples) / max(1, len(samples) - 1)
+            for k in range(p)] for j in range(p)]
+
+    signals = []
+    for v, (row, gap, m, y) in enumerate(zip(rows, gaps, model, outcome)):
+        z = abs(gap) / sigma
+        if z < WATCH_SD:
+            continue
+        if z >= SIGNAL_SD:
+            signal_type = "OPPORTUNITY" if gap > 0 else "RISK"
+        else:
+            signal_type = "NEUTRAL"
+        spread = math.sqrt(max(0.0, sum(row[j] * sum(map(mul, cov[j], row)) for j in range(p))))
+        confidence = _normal_cdf(abs(gap) / spread) if spread > 0 else 1.0
+        signals.append({"city": v, "signal_type": signal_type, "gap": gap, "model_score": m,
+                        "actual_score": y, "confidence": confidence})
+    return signals
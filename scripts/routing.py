@@ -0,0 +1,535 @@
+"""
+Route queries over the active trade edges.
+
+RouteGraph is a weighted CSR of the active edges: each neighbor entry keeps the
+cheapest parallel edge's cost (distance_km scaled by the tariff) and how many
+parallel edges there are. On top of it:
+
+- shortest_paths answers a batch of origin-destination pairs, running one
+  Dijkstra per origin that stops once all of that origin's destinations are
+  settled, and A* with a great-circle heuristic for origins with a single
+  destination;
+- min_vertex_cut and edge_disjoint_paths are unit-capacity max-flows whose
+  augmenting paths are found by bidirectional BFS over the implicit residual
+  graph, so each query only explores the neighborhoods of its two endpoints
+  instead of the whole graph. Queries from one source share a HopTree (its
+  breadth-first levels) that seeds each flow with paths walked down it, and
+  stop once the flow reaches the smaller endpoint degree, so in practice few
+  searches remain per query;
+- build_route_index precomputes an ALT (A*, landmarks, triangle inequality)
+  index that the dashboard ships with each region: the weighted CSR plus
+  Dijkstra distances from a few landmarks picked by farthest-point selection,
+  so any origin-destination query runs a goal-directed A* without touching
+  the edge list.
+"""
+
+import heapq
+import math
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from geodesy import great_circle_km
+
+# Landmarks in the shipped route index (one distance table each)
+NUM_LANDMARKS = 8
+
+
+def route_cost(distance_km: float, tariff_rate: float) -> float:
+    """Cost of moving goods along one edge: its length, marked up by its tariff."""
+    return distance_km * (1.0 + tariff_rate)
+
+
+class RouteGraph:
+    """Undirected weighted CSR of the active edges.
+
+    Node v's neighbors are neighbors[offsets[v]:offsets[v + 1]] (sorted), with
+    the cheapest cost and the multiplicity of the parallel edges at the same
+    index in cost and multiplicity. lat/lng (degrees) feed the A* heuristic,
+    which great-circle distances are scaled by heuristic_scale, the smallest
+    cost per great-circle km of any edge, so it never overestimates.
+    """
+
+    def __init__(self, num_nodes: int, sources: Sequence[int], targets: Sequence[int],
+                 costs: Sequence[float], active: Sequence[int], lat: Sequence[float], lng: Sequence[float]):
+        self.num_nodes = num_nodes
+        self.lat = lat
+        self.lng = lng
+
+        rows: List[Dict[int, List[float]]] = [{} for _ in range(num_nodes)]
+        for s, t, c, a in zip(sources, targets, costs, active):
+            if not a or s == t:
+                continue
+            for u, w in ((s, t), (t, s)):
+                entry = rows[u].get(w)
+                if entry is None:
+                    rows[u][w] = [c, 1]
+                else:
+                    entry[0] = min(entry[0], c)
+                    entry[1] += 1
+
+        self.offsets = array("l", [0])
+        self.neighbors = array("l")
+        self.cost = array("d")
+        self.multiplicity = array("l")
+        for row in rows:
+            for w in sorted(row):
+                c, m = row[w]
+                self.neighbors.append(w)
+                self.cost.append(c)
+                self.multiplicity.append(m)
+            self.offsets.append(len(self.neighbors))
+
+        scale = 1.0
+        for u in range(num_nodes):
+            for i in range(self.offsets[u], self.offsets[u + 1]):
+                w = self.neighbors[i]
+                if u < w:
+                    gc = great_circle_km(lat[u], lng[u], lat[w], lng[w])
+                    if gc > 0:
+                        scale = min(scale, self.cost[i] / gc)
+        self.heuristic_scale = max(0.0, scale)
+
+    def is_adjacent(self, u: int, w: int) -> bool:
+        row = self.neighbors[self.offsets[u]:self.offsets[u + 1]]
+        lo, hi = 0, len(row)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if row[mid] < w:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < len(row) and row[lo] == w
+
+
+def _walk_back(parent: Dict[int, int], target: int) -> List[int]:
+    path = [target]
+    while parent[path[-1]] != path[-1]:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
+
+
+def dijkstra(graph: RouteGraph, source: int, targets: Optional[Set[int]] = None) -> Tuple[Dict[int, float], Dict[int, int]]:
+    """Single-source shortest paths; stops early once every node in targets is settled.
+
+    Returns settled distances and the shortest-path tree (parent of the source
+    is itself).
+    """
+    offsets, neighbors, cost = graph.offsets, graph.neighbors, graph.cost
+    dist = {source: 0.0}
+    parent = {source: source}
+    settled = {}
+    remaining = set(targets) if targets is not None else None
+    heap = [(0.0, source)]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if v in settled:
+            continue
+        settled[v] = d
+        if remaining is not None:
+            remaining.discard(v)
+            if not remaining:
+                break
+        for i in range(offsets[v], offsets[v + 1]):
+            w = neighbors[i]
+            nd = d + cost[i]
+            if w not in settled and nd < dist.get(w, math.inf):
+                dist[w] = nd
+                parent[w] = v
+                heapq.heappush(heap, (nd, w))
+    return settled, parent
+
+
+def astar(graph: RouteGraph, source: int, target: int) -> Optional[Tuple[float, List[int]]]:
+    """Cheapest path from source to target guided by the great-circle heuristic, or None."""
+    offsets, neighbors, cost = graph.offsets, graph.neighbors, graph.cost
+    lat, lng, scale = graph.lat, graph.lng, graph.heuristic_scale
+    t_lat, t_lng = lat[target], lng[target]
+
+    def h(v):
+        return scale * great_circle_km(lat[v], lng[v], t_lat, t_lng)
+
+    dist = {source: 0.0}
+    parent = {source: source}
+    closed = set()
+    heap = [(h(source), 0.0, source)]
+    while heap:
+        _, d, v = heapq.heappop(heap)
+        if v in closed:
+            continue
+        if v == target:
+            return d, _walk_back(parent, target)
+        closed.add(v)
+        for i in range(offsets[v], offsets[v + 1]):
+            w = neighbors[i]
+            nd = d + cost[i]
+            if w not in closed and nd < dist.get(w, math.inf):
+                dist[w] = nd
+                parent[w] = v
+                heapq.heappush(heap, (nd + h(w), nd, w))
+    return None
+
+
+def shortest_paths(graph: RouteGraph, pairs: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Optional[Tuple[float, List[int]]]]:
+    """Answer a batch of (origin, destination) queries with (cost, path) or None if unreachable.
+
+    Queries sharing an origin share one early-stopping Dijkstra; lone queries
+    use A*.
+    """
+    by_origin: Dict[int, Set[int]] = {}
+    for s, t in pairs:
+        by_origin.setdefault(s, set()).add(t)
+
+    results = {}
+    for s, destinations in by_origin.items():
+        if len(destinations) == 1:
+            t = next(iter(destinations))
+            results[(s, t)] = astar(graph, s, t)
+            continue
+        settled, parent = dijkstra(graph, s, destinations)
+        for t in destinations:
+            results[(s, t)] = (settled[t], _walk_back(parent, t)) if t in settled else None
+    return results
+
+
+def _augmenting_path(source: int, sink: int, forward: Callable[[int], Iterable[int]],
+                     backward: Callable[[int], Iterable[int]]):
+    """Bidirectional BFS from source and (backwards) from sink over residual arcs.
+
+    Expands the smaller frontier each step. Returns (path, None, None) when the
+    searches meet; otherwise (None, side, reached) where side is "source" or
+    "sink" and reached is the full set of nodes that side's search found.
+    """
+    pred = {source: None}
+    succ = {sink: None}
+    front, back = [source], [sink]
+    while front and back:
+        if len(front) <= len(back):
+            grown = []
+            for x in front:
+                for y in forward(x):
+                    if y in pred:
+                        continue
+                    pred[y] = x
+                    if y in succ:
+                        return _join(pred, succ, y), None, None
+                    grown.append(y)
+            front = grown
+        else:
+            grown = []
+            for y in back:
+                for x in backward(y):
+                    if x in succ:
+                        continue
+                    succ[x] = y
+                    if x in pred:
+                        return _join(pred, succ, x), None, None
+                    grown.append(x)
+            back = grown
+    if not front:
+        return None, "source", pred
+    return None, "sink", succ
+
+
+def _join(pred: Dict, succ: Dict, meet: int) -> List[int]:
+    path = []
+    x = meet
+    while x is not None:
+        path.append(x)
+        x = pred[x]
+    path.reverse()
+    x = succ[meet]
+    while x is not None:
+        path.append(x)
+        x = succ[x]
+    return path
+
+
+class HopTree:
+    """Hop distances of every node from one root, to seed flows from that root.
+
+    level[v] is v's breadth-first level (0 for the root, -1 if unreachable).
+    A depth-first walk that takes edges to lower levels first, and otherwise
+    at most one edge within a level in a row, mostly runs straight down
+    shortest paths, so it finds flow paths to the root without a search of the
+    residual graph.
+    """
+
+    def __init__(self, graph: RouteGraph, root: int):
+        offsets, neighbors = graph.offsets, graph.neighbors
+        self.graph = graph
+        self.root = root
+        self.edges: Dict[int, Tuple[List[int], List[int]]] = {}  # downhill edges of the nodes walked so far
+        self.level = array("l", [-1]) * graph.num_nodes
+        level = self.level
+        level[root] = 0
+        front, depth = [root], 0
+        while front:
+            depth += 1
+            grown = []
+            for v in front:
+                for w in neighbors[offsets[v]:offsets[v + 1]]:
+                    if level[w] < 0:
+                        level[w] = depth
+                        grown.append(w)
+            front = grown
+
+    def downhill(self, v: int, sideways: bool) -> Iterator[int]:
+        """Indices of v's edges to lower levels (and its own, if sideways), nearest the root first."""
+        edges = self.edges.get(v)
+        if edges is None:
+            offsets, neighbors, level = self.graph.offsets, self.graph.neighbors, self.level
+            here = level[v]
+            lower = sorted((i for i in range(offsets[v], offsets[v + 1]) if 0 <= level[neighbors[i]] < here),
+                           key=lambda i: level[neighbors[i]])
+            same = [i for i in range(offsets[v], offsets[v + 1]) if level[neighbors[i]] == here]
+            edges = self.edges[v] = (lower, lower + same)
+        return iter(edges[sideways])
+
+
+def _walk_down(tree: HopTree, start: int, stop: Callable[[int], bool], usable: Callable[[int, int], bool],
+               dead: Set[int]) -> Tuple[List[int], List[int]]:
+    """Depth-first walk from start over tree.downhill edges until stop(node).
+
+    usable(node, i) says whether edge i out of node may be taken. Returns the
+    nodes walked and the edge taken into each (edges[k] leads from path[k] to
+    path[k + 1]), or empty lists; nodes the walk backs out of are added to dead
+    and never entered again. A walk never revisits its own nodes, so a node can
+    be given up on that another walk could still use: that only costs the flow
+    seeded here, which augmenting searches complete.
+    """
+    neighbors, level = tree.graph.neighbors, tree.level
+    path, edges, pending = [start], [], [tree.downhill(start, True)]
+    on_path = {start}
+    while path and not stop(path[-1]):
+        v = path[-1]
+        i = next((i for i in pending[-1] if neighbors[i] not in dead and neighbors[i] not in on_path and usable(v, i)),
+                 None)
+        if i is None:
+            on_path.discard(v)
+            dead.add(path.pop())
+            pending.pop()
+            if edges:
+                edges.pop()
+        else:
+            w = neighbors[i]
+            path.append(w)
+            on_path.add(w)
+            edges.append(i)
+            pending.append(tree.downhill(w, level[w] < level[v]))
+    return path, edges
+
+
+def edge_disjoint_paths(graph: RouteGraph, s: int, t: int, tree: Optional[HopTree] = None) -> int:
+    """Maximum number of edge-disjoint s-t paths (parallel edges count separately).
+
+    With a HopTree rooted at s (shared by all queries from s), the flow starts
+    from walks down it from each of t's edges over edges with spare capacity,
+    so the augmenting searches only look for the paths those miss. No more
+    paths than the edges at either end can exist, so the search stops once it
+    has found that many instead of proving there are no more.
+    """
+    if s == t:
+        return 0
+    offsets, neighbors, multiplicity = graph.offsets, graph.neighbors, graph.multiplicity
+    bound = min(sum(multiplicity[offsets[s]:offsets[s + 1]]), sum(multiplicity[offsets[t]:offsets[t + 1]]))
+    flow: Dict[Tuple[int, int], int] = {}
+
+    def push(path, amount):
+        for a, b in zip(path, path[1:]):
+            flow[(a, b)] = flow.get((a, b), 0) + amount
+            flow[(b, a)] = flow.get((b, a), 0) - amount
+
+    count = 0
+    if tree is not None:
+        dead = {t}
+
+        def spare(v, i):
+            return flow.get((neighbors[i], v), 0) < multiplicity[i]
+
+        for i in range(offsets[t], offsets[t + 1]):
+            x = neighbors[i]
+            while count < bound and x not in dead and flow.get((x, t), 0) < multiplicity[i]:
+                path, edges = _walk_down(tree, x, s.__eq__, spare, dead)
+                if not path:
+                    break
+                amount = min([multiplicity[i] - flow.get((x, t), 0)]
+                             + [multiplicity[j] - flow.get((w, v), 0) for v, w, j in zip(path, path[1:], edges)])
+                push(path[::-1] + [t], amount)
+                count += amount
+
+    def forward(x):
+        for i in range(offsets[x], offsets[x + 1]):
+            y = neighbors[i]
+            if flow.get((x, y), 0) < multiplicity[i]:
+                yield y
+
+    def backward(y):
+        for i in range(offsets[y], offsets[y + 1]):
+            x = neighbors[i]
+            if flow.get((x, y), 0) < multiplicity[i]:
+                yield x
+
+    while count < bound:
+        path, _, _ = _augmenting_path(s, t, forward, backward)
+        if path is None:
+            return count
+        push(path, 1)
+        count += 1
+    return count
+
+
+def min_vertex_cut(graph: RouteGraph, s: int, t: int, tree: Optional[HopTree] = None) -> List[int]:
+    """Smallest set of cities whose removal disconnects s from t.
+
+    Direct s-t edges are ignored (no set of cities can cut them), so for
+    adjacent pairs this is the cut of every indirect route. Vertex capacities
+    are modeled by splitting each city v into in-node 2v and out-node 2v + 1.
+    With a HopTree rooted at s, the flow starts from walks down it from each of
+    t's neighbors through unused cities. An endpoint's other neighbors always
+    form a cut, so once as many routes as the smaller such set are found, that
+    set is returned without the final search that would prove it minimal.
+    """
+    if s == t:
+        return []
+    offsets, neighbors = graph.offsets, graph.neighbors
+    ends = [[w for w in neighbors[offsets[v]:offsets[v + 1]] if w != other] for v, other in ((t, s), (s, t))]
+    smallest = min(ends, key=len)
+    routes = 0
+    through = set()  # cities whose unit capacity is used
+    carried: Dict[Tuple[int, int], int] = {}  # flow from out(u) to in(w)
+
+    def row(v):
+        return neighbors[offsets[v]:offsets[v + 1]]
+
+    if tree is not None:
+        level = tree.level
+        dead = {t, s}
+
+        def free(v, i):
+            return neighbors[i] not in through
+
+        for x in ends[0]:
+            if routes == len(smallest):
+                return smallest
+            if x in through or x in dead:
+                continue
+            # Routes end at a neighbor of s (level 1), which continues to s itself
+            path, _ = _walk_down(tree, x, lambda v: level[v] == 1, free, dead)
+            if not path:
+                continue
+            through.update(path)
+            path = [s] + path[::-1] + [t]
+            for u, w in zip(path, path[1:]):
+                carried[(u, w)] = 1
+            routes += 1
+
+    def forward(x):
+        v = x >> 1
+        if x & 1:  # out(v)
+            for w in row(v):
+                if w != s and not (v == s and w == t):
+                    yield 2 * w
+            if v in through:
+                yield 2 * v
+        else:  # in(v)
+            if v != t and v not in through:
+                yield 2 * v + 1
+            for u in row(v):
+                if carried.get((u, v), 0) > 0:
+                    yield 2 * u + 1
+
+    def backward(y):
+        v = y >> 1
+        if y & 1:  # out(v): from in(v) or, undoing flow, from in(w)
+            if v != s and v not in through:
+                yield 2 * v
+            for w in row(v):
+                if carried.get((v, w), 0) > 0:
+                    yield 2 * w
+        else:  # in(v): from out(u) of any neighbor, or undoing flow, from out(v)
+            for u in row(v):
+                if u != t and not (u == s and v == t):
+                    yield 2 * u + 1
+            if v in through:
+                yield 2 * v + 1
+
+    while routes < len(smallest):
+        path, side, reached = _augmenting_path(2 * s + 1, 2 * t, forward, backward)
+        if path is None:
+            break
+        routes += 1
+        for a, b in zip(path, path[1:]):
+            u, w = a >> 1, b >> 1
+            if u == w:
+                if a & 1:
+                    through.discard(u)  # out(v) -> in(v) cancels the internal arc
+                else:
+                    through.add(u)
+            elif a & 1:
+                carried[(u, w)] = carried.get((u, w), 0) + 1
+            else:
+                carried[(w, u)] -= 1
+    else:
+        return smallest
+
+    # Cities cut by the exhausted side: in- but not out-node reachable (or the reverse)
+    cut = set()
+    for x in reached:
+        v = x >> 1
+        if side == "source" and not x & 1 and 2 * v + 1 not in reached:
+            cut.add(v)
+        elif side == "sink" and x & 1 and 2 * v not in reached:
+            cut.add(v)
+    cut.discard(s)
+    cut.discard(t)
+    return sorted(cut)
+
+
+def select_landmarks(graph: RouteGraph, count: int = NUM_LANDMARKS) -> Tuple[List[int], List[Dict[int, float]]]:
+    """Pick up to count landmarks by farthest-point selection; returns them with their distance tables.
+
+    Starts from the farthest node from the best-connected city, then repeatedly
+    adds the node whose distance to the nearest landmark is largest, so the
+    landmarks spread to the edges of that city's component.
+    """
+    if graph.num_nodes == 0 or count <= 0:
+        return [], []
+    degree = [graph.offsets[v + 1] - graph.offsets[v] for v in range(graph.num_nodes)]
+    start = max(range(graph.num_nodes), key=degree.__getitem__)
+    settled, _ = dijkstra(graph, start)
+    nearest = dict(settled)
+
+    landmarks, tables = [], []
+    while len(landmarks) < count:
+        candidate = max(nearest, key=nearest.__getitem__)
+        if candidate in landmarks:
+            break
+        distances, _ = dijkstra(graph, candidate)
+        landmarks.append(candidate)
+        tables.append(distances)
+        for v, d in distances.items():
+            if d < nearest[v]:
+                nearest[v] = d
+    return landmarks, tables
+
+
+def build_route_index(graph: RouteGraph, node_ids: Sequence[str], count: int = NUM_LANDMARKS) -> Dict:
+    """Compact ALT routing index for the dashboard.
+
+    nodes are the ids of the graph's nodes and offsets/neighbors/costs its CSR;
+    distances[i][v] is the cost from landmarks[i] to node v, or -1 if v is out
+    of the landmark's reach. A client's A* heuristic is the max over landmarks
+    of |distances[i][t] - distances[i][v]|. Build the graph from whole-unit
+    costs so every cost and distance ships as an integer.
+    """
+    landmarks, tables = select_landmarks(graph, count)
+    return {
+        "nodes": list(node_ids),
+        "offsets": list(graph.offsets),
+        "neighbors": list(graph.neighbors),
+        "costs": [round(c) for c in graph.cost],
+        "landmarks": [node_ids[v] for v in landmarks],
+        "distances": [[round(table[v]) if v in table else -1 for v in range(graph.num_nodes)]
+                      for table in tables],
+    }
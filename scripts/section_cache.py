@@ -0,0 +1,174 @@
+"""
+Content-addressed cache of generated dataset sections.
+
+Every section is stored under a key that hashes everything it was built from:
+its derived seed, its parameters, the source of the code that builds it and the
+content digests of the sections it reads. Editing one generator (or changing one
+input) therefore changes only the keys of the sections downstream of it, and a
+rerun loads every other section from disk instead of recomputing it.
+
+code_closure finds that code from a section's entry points: everything their
+code refers to by name, transitively, that is defined in this directory.
+Functions and classes of the entry points' own module count one by one, along
+with the constants they name; anything they reach in another module brings in
+that whole module and, in turn, the modules it imports from.
+"""
+
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+from types import CodeType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Modules whose code can be part of a section's key: the generator's own
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Types of the constants whose values are part of a key when code names them
+_SCALAR_TYPES = (bool, int, float, str, bytes, type(None))
+
+# Bump to invalidate every cached section (e.g. after changing the pickled layout)
+CACHE_FORMAT = 1
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hex digest of parts; functions, classes and modules contribute their source."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if inspect.isfunction(part) or inspect.isclass(part) or inspect.ismodule(part):
+            text = inspect.getsource(part)
+        elif isinstance(part, (list, tuple)):
+            text = fingerprint(*part)
+        else:
+            text = repr(part)
+        digest.update(text.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _project_file(obj: Any) -> Optional[str]:
+    """The file under PROJECT_DIR defining obj, or None for anything else (builtins, libraries)."""
+    try:
+        path = inspect.getsourcefile(obj)
+    except TypeError:
+        return None
+    if path is None or os.path.dirname(os.path.abspath(path)) != PROJECT_DIR:
+        return None
+    return os.path.abspath(path)
+
+
+def _constant_text(value: Any) -> Optional[str]:
+    """Stable text of a plain-data value (sets sorted), or None if it holds anything else."""
+    if isinstance(value, _SCALAR_TYPES):
+        return repr(value)
+    if isinstance(value, (tuple, list, set, frozenset)):
+        items = [_constant_text(item) for item in value]
+        if None in items:
+            return None
+        if isinstance(value, (set, frozenset)):
+            items.sort()
+        return f"{type(value).__name__}({', '.join(items)})"
+    if isinstance(value, dict):
+        items = [(_constant_text(k), _constant_text(v)) for k, v in value.items()]
+        if any(k is None or v is None for k, v in items):
+            return None
+        return "{" + ", ".join(f"{k}: {v}" for k, v in items) + "}"
+    return None
+
+
+def _named_globals(obj: Any) -> Iterator[Tuple[str, Any]]:
+    """(name, value) of every global a function's or class's code (nested code included) names."""
+    if inspect.isclass(obj):
+        members = [getattr(m, "__func__", getattr(m, "fget", m)) for m in vars(obj).values()]
+        functions = [m for m in members if inspect.isfunction(m)]
+    else:
+        functions = [obj]
+    for function in functions:
+        namespace = function.__globals__
+        codes = [function.__code__]
+        while codes:
+            code = codes.pop()
+            for name in code.co_names:
+                if name in namespace:
+                    yield name, namespace[name]
+            codes.extend(const for const in code.co_consts if isinstance(const, CodeType))
+
+
+def code_closure(*roots: Any) -> List[Any]:
+    """roots and the project code and constants they reach, in a stable order (see the module docstring)."""
+    found: Dict[Tuple, Any] = {}
+    pending = list(roots)
+    while pending:
+        obj = pending.pop()
+        if inspect.ismodule(obj):
+            path = _project_file(obj)
+            key = ("module", os.path.basename(path or ""))
+            if path is None or key in found:
+                continue
+            found[key] = obj
+            for value in vars(obj).values():
+                if inspect.ismodule(value):
+                    pending.append(value)
+                elif inspect.isfunction(value) or inspect.isclass(value):
+                    pending.append(sys.modules.get(value.__module__))
+            continue
+        path = _project_file(obj)
+        key = ("code", os.path.basename(path or ""), obj.__qualname__)
+        if path is None or key in found:
+            continue
+        found[key] = obj
+        for name, value in _named_globals(obj):
+            if inspect.ismodule(value):
+                pending.append(value)
+            elif inspect.isfunction(value) or inspect.isclass(value):
+                # Code of the same module counts one by one, other modules whole
+                pending.append(value if value.__module__ == obj.__module__ else sys.modules.get(value.__module__))
+            else:
+                text = _constant_text(value)
+                if text is not None:
+                    found[("constant", os.path.basename(path), name)] = f"{name} = {text}"
+    return [found[key] for key in sorted(found)]
+
+
+class SectionCache:
+    """Pickled sections on disk, one file per (dataset, section) holding the latest key.
+
+    load/store return the section's content digest (SHA-256 of the pickled bytes),
+    which downstream sections fold into their own keys.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, dataset: str, section: str, key: str) -> str:
+        return os.path.join(self.cache_dir, dataset, f"{section}.{key}.pickle")
+
+    def load(self, dataset: str, section: str, key: str) -> Optional[Tuple[Any, str]]:
+        """Return (value, digest) if the section is cached under key, else None."""
+        try:
+            with open(self._path(dataset, section, key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(data), hashlib.sha256(data).hexdigest()
+
+    def store(self, dataset: str, section: str, key: str, value: Any) -> str:
+        """Cache value under key, replacing older entries of the section; returns its digest."""
+        directory = os.path.join(self.cache_dir, dataset)
+        os.makedirs(directory, exist_ok=True)
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        path = self._path(dataset, section, key)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+        prefix = section + "."
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name.endswith(".pickle") and os.path.join(directory, name) != path:
+                os.remove(os.path.join(directory, name))
+        return hashlib.sha256(data).hexdigest()
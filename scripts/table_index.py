@@ -0,0 +1,42 @@
+"""
+Precomputed sort and filter indexes for the dashboard's tables.
+
+For a list of row records, build_table_index stores, per sortable column, the
+permutation of row positions that sorts the column in descending order (ties
+keep row order, missing values last); reading it backwards gives the
+ascending order. Per category of a column (e.g. signal_type) it stores a
+bitmap of the rows in that category, base64 encoded with row i at bit i % 8 of
+byte i // 8. A table can then page through any sort and filter by walking a
+permutation, without copying or sorting the rows.
+"""
+
+import base64
+from typing import Dict, List, Optional, Sequence
+
+
+def sort_order(values: Sequence) -> List[int]:
+    """Row positions sorted by descending value (stable, None last)."""
+    return sorted(range(len(values)), key=lambda i: (values[i] is not None, values[i] if values[i] is not None else 0),
+                  reverse=True)
+
+
+def bitmap(flags: Sequence[bool]) -> str:
+    """Base64 bitmap with bit i set for every true flag."""
+    bits = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bits)).decode("ascii")
+
+
+def build_table_index(rows: Sequence[Dict], columns: Sequence[str], category: Optional[str] = None) -> Dict:
+    """Sort permutations of columns and, if category is given, a bitmap and count per category value."""
+    index = {
+        "rows": len(rows),
+        "order": {column: sort_order([row[column] for row in rows]) for column in columns},
+    }
+    if category is not None:
+        values = [row[category] for row in rows]
+        index["bitmaps"] = {value: bitmap([v == value for v in values]) for value in sorted(set(values))}
+        index["counts"] = {value: values.count(value) for value in sorted(set(values))}
+    return index
@@ -0,0 +1,67 @@
+"""
+Tests of the streaming reader behind dataset_schema.validate_file.
+
+    python -m pytest scripts/test_dataset_schema.py
+"""
+
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import dataset_schema
+
+WORLD_DATA = os.path.join(os.path.dirname(dataset_schema.DEFAULT_TYPES_PATH), "world-data.json")
+
+
+class _Chunked:
+    """A text file that returns at most size characters per read, whatever is asked for."""
+
+    def __init__(self, text: str, size: int):
+        self.f = io.StringIO(text)
+        self.size = size
+
+    def read(self, size: int = -1) -> str:
+        return self.f.read(self.size)
+
+
+class ReaderTest(unittest.TestCase):
+    def test_numbers_split_at_every_position(self):
+        numbers = [0, 0.0, -0.5, 12.25, 1e-05, -2.5e+30, 7, 100, 3.0e10]
+        text = json.dumps({"values": numbers, "named": {"a": 0.0, "b": 1e-07, "c": -12}})
+        for size in range(1, len(text) + 1):
+            reader = dataset_schema._Reader(_Chunked(text, size))
+            self.assertEqual(reader.value(), json.loads(text), f"read size {size}")
+            self.assertEqual(reader.peek(), "")
+
+    def test_entries_split_after_fraction_point(self):
+        text = '{"lagos-718":0.0,"accra-1":1.5e-3}'
+        for size in range(1, 8):
+            reader = dataset_schema._Reader(_Chunked(text, size))
+            read = {}
+            for key in reader.entries(True):
+                read[key] = reader.value()
+            self.assertEqual(read, {"lagos-718": 0.0, "accra-1": 1.5e-3}, f"read size {size}")
+
+    def test_world_dataset_in_small_chunks(self):
+        with open(WORLD_DATA, encoding="utf-8") as f:
+            text = f.read()
+        schema = dataset_schema.load_schema()
+        for size in range(1, 8):
+            violations = dataset_schema.validate_stream(_Chunked(text, size), schema)
+            self.assertEqual(violations.messages, [], f"read size {size}")
+
+    def test_malformed_number_still_reported(self):
+        schema = dataset_schema.load_schema()
+        with open(WORLD_DATA, encoding="utf-8") as f:
+            text = f.read().replace('"lat":', '"lat":1.e', 1)
+        for size in (1, 3, 7, dataset_schema.READ_SIZE):
+            violations = dataset_schema.validate_stream(_Chunked(text, size), schema)
+            self.assertTrue(violations.count, f"read size {size}")
+
+
+if __name__ == "__main__":
+    unittest.main()
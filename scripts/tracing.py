@@ -0,0 +1,267 @@
+"""
+Per-stage tracing of a generation run.
+
+Code marks its stages with
+
+    with tracing.stage("edges", "build") as span:
+        edges = generate_edges(...)
+        span.items = len(edges)
+
+which costs one global lookup while no tracer is active (stage returns a
+shared no-op span). Between start and stop, every stage becomes a span
+recording wall time, CPU time, the process's peak RSS and how much the stage
+raised it, and, with trace_memory, the peak tracemalloc allocation above the
+stage's starting point (tracemalloc slows allocation several times, so it is
+opt-in). Spans nest: a stage inside another counts towards both.
+
+With profile_interval set, a sampling thread records the main thread's stack
+at that interval, prefixed by the open stages, as collapsed stacks
+("stage;frame;frame count" lines, readable by flamegraph.pl and speedscope).
+
+A tracer lives in one process; stop returns its spans and samples as plain data
+so pool workers can hand them back. chrome_trace merges them into Chrome
+trace-event JSON (chrome://tracing, Perfetto) with one track per dataset, and
+summary_table lays them out as text.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+# ru_maxrss is in kilobytes on Linux and bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+# Default sampling interval of the stack profiler, in milliseconds
+DEFAULT_PROFILE_INTERVAL_MS = 5.0
+
+# Innermost frames kept per profiler sample
+MAX_SAMPLE_DEPTH = 64
+
+_MB = 2 ** 20
+
+
+def _peak_rss() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT if resource else 0
+
+
+class _NullSpan:
+    """Stands in for a span while tracing is off; attributes set on it are dropped."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+    @property
+    def args(self) -> Dict:
+        return {}
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One traced stage; set items (and any args) while it is open."""
+
+    __slots__ = ("tracer", "name", "category", "args", "items", "depth", "start_ns", "cpu_ns", "rss",
+                 "traced_start", "traced_peak")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.items = None
+
+    def __enter__(self):
+        tracer = self.tracer
+        self.depth = len(tracer.stack)
+        if tracer.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Hand the peak so far to the enclosing span before resetting it
+            if tracer.stack:
+                parent = tracer.stack[-1]
+                parent.traced_peak = max(parent.traced_peak, peak)
+            tracemalloc.reset_peak()
+            self.traced_start = current
+            self.traced_peak = current
+        tracer.stack.append(self)
+        self.rss = _peak_rss()
+        self.cpu_ns = time.process_time_ns()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end_ns = time.perf_counter_ns()
+        cpu_ns = time.process_time_ns() - self.cpu_ns
+        tracer = self.tracer
+        tracer.stack.pop()
+        rss = _peak_rss()
+        args = {
+            "cpu_ms": round(cpu_ns / 1e6, 3),
+            "rss_peak_mb": round(rss / _MB, 1),
+            "rss_growth_mb": round((rss - self.rss) / _MB, 1),
+        }
+        if tracer.trace_memory:
+            peak = max(self.traced_peak, tracemalloc.get_traced_memory()[1])
+            args["traced_peak_mb"] = round((peak - self.traced_start) / _MB, 2)
+            if tracer.stack:
+                parent = tracer.stack[-1]
+                parent.traced_peak = max(parent.traced_peak, peak)
+        if self.items is not None:
+            args["items"] = self.items
+        args["depth"] = self.depth
+        args.update(self.args)
+        tracer.events.append({
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": (tracer.epoch_ns + self.start_ns - tracer.start_ns) // 1000,
+            "dur": (end_ns - self.start_ns) // 1000,
+            "args": args,
+        })
+        return False
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's stack every interval seconds into collapsed-stack counts."""
+
+    def __init__(self, tracer: "Tracer", thread_id: int, interval: float):
+        super().__init__(name="tracing-sampler", daemon=True)
+        self.tracer = tracer
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.done = threading.Event()
+
+    def run(self) -> None:
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            frames = []
+            while frame is not None and len(frames) < MAX_SAMPLE_DEPTH:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stages = [self.tracer.label] + [f"{span.category}:{span.name}" for span in list(self.tracer.stack)]
+            self.samples[";".join(stages + frames[::-1])] += 1
+
+
+class Tracer:
+    """Spans (and optional stack samples) of one dataset's run in this process."""
+
+    def __init__(self, label: str, trace_memory: bool = False, profile_interval: Optional[float] = None):
+        self.label = label
+        self.trace_memory = trace_memory
+        self.events: List[Dict] = []
+        self.stack: List[Span] = []
+        self.epoch_ns = time.time_ns()
+        self.start_ns = time.perf_counter_ns()
+        self.started_tracemalloc = trace_memory and not tracemalloc.is_tracing()
+        if self.started_tracemalloc:
+            tracemalloc.start()
+        self.sampler = None
+        if profile_interval:
+            self.sampler = _Sampler(self, threading.get_ident(), profile_interval / 1000)
+            self.sampler.start()
+
+    def stage(self, name: str, category: str = "stage", **args) -> Span:
+        return Span(self, name, category, args)
+
+    def close(self) -> Dict:
+        """Stop sampling and memory tracing; the recorded spans and samples."""
+        samples = {}
+        if self.sampler is not None:
+            self.sampler.done.set()
+            self.sampler.join()
+            samples = dict(self.sampler.samples)
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        return {"label": self.label, "pid": os.getpid(), "events": self.events, "samples": samples}
+
+
+_active: Optional[Tracer] = None
+
+
+def stage(name: str, category: str = "stage", **args):
+    """Context manager tracing a stage under the active tracer (a no-op without one)."""
+    if _active is None:
+        return _NULL_SPAN
+    return _active.stage(name, category, **args)
+
+
+def start(label: str, trace_memory: bool = False, profile_interval: Optional[float] = None) -> Tracer:
+    """Trace this process's stages under label until stop (profile_interval in milliseconds)."""
+    global _active
+    if _active is not None:
+        stop()
+    _active = Tracer(label, trace_memory, profile_interval)
+    return _active
+
+
+def stop() -> Optional[Dict]:
+    """End tracing; the trace (see Tracer.close) or None if none was active."""
+    global _active
+    tracer, _active = _active, None
+    return tracer.close() if tracer is not None else None
+
+
+def chrome_trace(traces: Iterable[Dict]) -> Dict:
+    """Chrome trace-event JSON of several traces, one process track per label."""
+    traces = list(traces)
+    origin = min((event["ts"] for trace in traces for event in trace["events"]), default=0)
+    events = []
+    for track, trace in enumerate(traces, 1):
+        events.append({"name": "process_name", "ph": "M", "pid": track, "tid": 0,
+                       "args": {"name": f"{trace['label']} (pid {trace['pid']})"}})
+        for event in trace["events"]:
+            events.append({**event, "ts": event["ts"] - origin, "pid": track, "tid": 0})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def folded_stacks(traces: Iterable[Dict]) -> str:
+    """Collapsed-stack lines of the profiler samples of several traces."""
+    counts: Counter = Counter()
+    for trace in traces:
+        counts.update(trace["samples"])
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+
+def summary_table(traces: Iterable[Dict]) -> str:
+    """Plain-text table of every span, nested stages indented under their parents."""
+    lines = [f"{'dataset':<14} {'stage':<28} {'wall s':>8} {'cpu s':>8} {'rss MB':>8} {'+rss MB':>8} "
+             f"{'traced MB':>9} {'items':>9}"]
+    for trace in traces:
+        # Spans are recorded as they end; list them in start order instead
+        for event in sorted(trace["events"], key=lambda e: (e["ts"], e["args"]["depth"])):
+            args = event["args"]
+            name = "  " * args["depth"] + f"{event['cat']}:{event['name']}"
+            traced = "-" if "traced_peak_mb" not in args else f"{args['traced_peak_mb']:.2f}"
+            items = "-" if "items" not in args else str(args["items"])
+            lines.append(f"{trace['label']:<14} {name:<28} {event['dur'] / 1e6:>8.3f} {args['cpu_ms'] / 1e3:>8.3f} "
+                         f"{args['rss_peak_mb']:>8.1f} {args['rss_growth_mb']:>8.1f} {traced:>9} {items:>9}")
+    return "\n".join(lines)
+
+
+def item_count(value: Any) -> Optional[int]:
+    """len(value) for sized values, else None."""
+    try:
+        return len(value)
+    except TypeError:
+        return None